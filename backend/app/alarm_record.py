@@ -0,0 +1,89 @@
+"""
+Registro compacto de alarma con esquema fijo.
+Sustituye al diccionario {'id', 'time', 'label', 'active'} usando __slots__,
+de modo que cada alarma ocupa una fracción de la memoria de un dict.
+"""
+
+import sys
+
+ALARM_FIELDS = ('id', 'time', 'label', 'active')
+
+
+class AlarmRecord:
+    """
+    Alarma con campos fijos almacenados en slots.
+    
+    Expone la parte de la interfaz de dict que usa la lista circular
+    (get, update, [] y to_dict). Las claves fuera del esquema se ignoran.
+    """
+    __slots__ = ALARM_FIELDS
+    
+    def __init__(self, id, time=None, label='', active=True):
+        self.id = id
+        # Solo existen 1440 horas 'HH:MM' distintas: internarlas las comparte
+        self.time = sys.intern(time) if isinstance(time, str) else time
+        self.label = label
+        self.active = active
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Crea un registro a partir de un diccionario de alarma"""
+        return cls(
+            data.get('id'),
+            data.get('time'),
+            data.get('label', ''),
+            data.get('active', True)
+        )
+    
+    def get(self, key, default=None):
+        """Equivalente a dict.get para los campos del esquema"""
+        if key in ALARM_FIELDS:
+            return getattr(self, key)
+        return default
+    
+    def __getitem__(self, key):
+        if key not in ALARM_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        if key not in ALARM_FIELDS:
+            raise KeyError(key)
+        if key == 'time' and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in ALARM_FIELDS
+    
+    def update(self, data):
+        """Actualiza los campos conocidos, ignorando claves fuera del esquema"""
+        for key, value in data.items():
+            if key in ALARM_FIELDS:
+                self[key] = value
+    
+    def copy(self):
+        """Copia superficial del registro"""
+        return AlarmRecord(self.id, self.time, self.label, self.active)
+    
+    def to_dict(self):
+        """Convierte el registro a dict (formato JSON de la API)"""
+        return {
+            'id': self.id,
+            'time': self.time,
+            'label': self.label,
+            'active': self.active
+        }
+    
+    def __eq__(self, other):
+        if isinstance(other, AlarmRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        # Misma representación que el dict para no alterar /structure
+        return repr(self.to_dict())
@@ -0,0 +1,191 @@
+"""
+Motor de disparo de alarmas en el servidor basado en una rueda de tiempo.
+La rueda tiene una ranura por minuto del día (1440); cada ranura guarda los
+IDs de las alarmas activas programadas para ese minuto, de modo que encontrar
+las alarmas que vencen cuesta O(vencidas) en lugar de recorrer todas.
+"""
+
+import datetime
+import re
+import threading
+import time
+from collections import deque
+
+MINUTES_PER_DAY = 24 * 60
+TIME_RE = re.compile(r'([0-9]{2}):([0-9]{2})(?::([0-9]{2}))?')
+# Máximo de minutos pendientes que un tick recupera (hilo dormido o con
+# retraso). Un salto mayor, o un reloj que retrocede (cambio de horario,
+# corrección NTP), se trata como resincronización y no dispara nada.
+CATCH_UP_MINUTES = 5
+
+
+def parse_minute_of_day(time_str):
+    """
+    Convierte 'HH:MM' (o 'HH:MM:SS') a minuto del día.
+    Retorna None si el formato no es exactamente ese (dos dígitos por campo)
+    o si la hora, los minutos o los segundos están fuera de rango.
+    """
+    match = TIME_RE.fullmatch(time_str) if isinstance(time_str, str) else None
+    if match is None:
+        return None
+    hours, minutes, seconds = (int(value or 0) for value in match.groups())
+    if hours > 23 or minutes > 59 or seconds > 59:
+        return None
+    return hours * 60 + minutes
+
+
+class AlarmScheduler:
+    """
+    Rueda de tiempo de 1440 ranuras con hilo de fondo.
+
+    - schedule(alarm): (re)programa una alarma según su 'time' y 'active'
+    - unschedule(id): la quita de la rueda
+    - due(minute): IDs que vencen en ese minuto, en O(vencidas)
+    - fired(since): eventos disparados con secuencia mayor a 'since'
+    """
+
+    def __init__(self, lookup, history=1000, catch_up=CATCH_UP_MINUTES):
+        self._lookup = lookup  # id -> dict de la alarma (o None)
+        self.catch_up = catch_up
+        self._wheel = [set() for _ in range(MINUTES_PER_DAY)]
+        self._slot_of = {}  # id -> minuto programado
+        self._fired = deque(maxlen=history)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_minute = None
+        # Ganchos opcionales (modo multi-proceso): sincronizar antes de cada
+        # tick y publicar los eventos disparados fuera del proceso
+        self.before_tick = None
+        self.on_fired = None
+
+    def schedule(self, alarm):
+        """Programa (o reprograma) una alarma; las inactivas se retiran"""
+        alarm_id = alarm.get('id')
+        minute = parse_minute_of_day(alarm.get('time'))
+        with self._lock:
+            self._remove(alarm_id)
+            if minute is not None and alarm.get('active', True):
+                self._wheel[minute].add(alarm_id)
+                self._slot_of[alarm_id] = minute
+
+    def unschedule(self, alarm_id):
+        """Quita una alarma de la rueda"""
+        with self._lock:
+            self._remove(alarm_id)
+
+    def clear(self):
+        """Vacía la rueda por completo"""
+        with self._lock:
+            for slot in self._wheel:
+                slot.clear()
+            self._slot_of.clear()
+
+    def rebuild(self, alarms):
+        """Reconstruye la rueda completa con un solo bloqueo (cargas masivas)"""
+        with self._lock:
+            for slot in self._wheel:
+                slot.clear()
+            self._slot_of.clear()
+            for alarm in alarms:
+                minute = parse_minute_of_day(alarm.get('time'))
+                if minute is not None and alarm.get('active', True):
+                    self._wheel[minute].add(alarm.get('id'))
+                    self._slot_of[alarm.get('id')] = minute
+
+    def _remove(self, alarm_id):
+        minute = self._slot_of.pop(alarm_id, None)
+        if minute is not None:
+            self._wheel[minute].discard(alarm_id)
+
+    def due(self, minute):
+        """Retorna los IDs de las alarmas activas para un minuto del día"""
+        with self._lock:
+            return list(self._wheel[minute % MINUTES_PER_DAY])
+
+    def fire_minute(self, minute, now=None):
+        """
+        Dispara las alarmas de un minuto y registra los eventos.
+        Retorna la lista de eventos generados.
+        """
+        fired_at = (now or datetime.datetime.now()).isoformat(timespec='seconds')
+        events = []
+        for alarm_id in self.due(minute):
+            alarm = self._lookup(alarm_id)
+            if not alarm or not alarm.get('active', True):
+                continue
+            with self._lock:
+                self._seq += 1
+                event = {
+                    'seq': self._seq,
+                    'id': alarm_id,
+                    'time': alarm.get('time'),
+                    'label': alarm.get('label', ''),
+                    'fired_at': fired_at
+                }
+                self._fired.append(event)
+            events.append(event)
+        return events
+
+    def fired(self, since=0):
+        """Retorna los eventos disparados con secuencia mayor a 'since'"""
+        with self._lock:
+            return [event for event in self._fired if event['seq'] > since]
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+    def tick(self, now=None):
+        """
+        Procesa los minutos transcurridos desde el último tick.
+        Si el hilo estuvo dormido unos minutos, dispara los pendientes (como
+        máximo 'catch_up'). Si el reloj retrocedió o saltó más que eso, solo
+        se resincroniza: no se dispara nada.
+        """
+        # La hora se toma antes del gancho: si este espera (carga inicial),
+        # el siguiente tick recupera los minutos transcurridos
+        now = now or datetime.datetime.now()
+        if self.before_tick is not None:
+            self.before_tick()
+        minute = now.hour * 60 + now.minute
+        if self._last_minute is None:
+            self._last_minute = minute
+            return []
+
+        events = []
+        pending = (minute - self._last_minute) % MINUTES_PER_DAY
+        if pending > self.catch_up:
+            # Un retroceso de reloj da un salto de casi un día: resincronizar
+            print(f"⚠️ Salto de reloj en el motor de alarmas "
+                  f"({self._last_minute} -> {minute}); se resincroniza sin disparar")
+            pending = 0
+        for step in range(1, pending + 1):
+            events.extend(self.fire_minute(self._last_minute + step, now))
+        self._last_minute = minute
+        if events and self.on_fired is not None:
+            self.on_fired(events)
+        return events
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.tick()
+            # Despertar al inicio del siguiente segundo
+            self._stop.wait(1 - (time.time() % 1))
+
+    def start(self):
+        """Inicia el hilo de fondo (idempotente)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._last_minute = None
+        self._thread = threading.Thread(target=self._run, name='alarm-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de fondo"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._thread = None
@@ -1,37 +1,204 @@
 
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+from ..alarm_scheduler import parse_minute_of_day
 from ..storage import (
     get_alarms, add_alarm, update_alarm, delete_alarm,
     next_alarm, prev_alarm, get_current_alarm, reset_alarm_navigation,
-    get_alarms_count, display_alarms_structure
+    get_alarms_count, display_alarms_structure,
+    get_due_alarms, get_fired_alarms, get_fired_last_seq,
+    get_upcoming_alarms, get_alarms_between, is_loading,
+    new_alarm_id, apply_batch, get_alarms_page, iter_alarms
 )
-import time
+from ..config import Config
+import datetime
+import json
 
 bp = Blueprint('alarms', __name__, url_prefix='/api/alarms')
 
+STREAM_CHUNK = 500
+
+def _stream_alarms(fmt):
+    """Genera la lista de alarmas por trozos (JSON o NDJSON)"""
+    dumps = json.dumps
+    if fmt == 'ndjson':
+        chunk = []
+        for alarm in iter_alarms():
+            chunk.append(dumps(alarm, ensure_ascii=False))
+            if len(chunk) >= STREAM_CHUNK:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+        return
+
+    yield '['
+    chunk = []
+    first = True
+    for alarm in iter_alarms():
+        chunk.append(dumps(alarm, ensure_ascii=False))
+        if len(chunk) >= STREAM_CHUNK:
+            yield ('' if first else ',') + ','.join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield ('' if first else ',') + ','.join(chunk)
+    yield ']'
+
 @bp.route('/', methods=['GET'])
 def list_alarms():
-    """Retorna todas las alarmas en la lista circular"""
-    return jsonify(get_alarms())
+    """
+    Retorna todas las alarmas en la lista circular.
 
-@bp.route('/', methods=['POST'])
-def create_alarm():
-    """Crea una nueva alarma y la añade a la lista circular"""
-    data = request.json
-    alarm = {
-        'id': int(time.time() * 1000),
+    - ?after=<id>&limit=n: paginación por cursor; solo recorre n nodos
+      desde la alarma 'after'. Retorna {'alarms', 'next_cursor'}.
+    - ?stream=json|ndjson: envía la lista por trozos sin cargarla entera.
+
+    Durante la carga inicial se sirven desde el estado en disco (snapshot
+    más la cola del log) y la respuesta lo indica con X-Alarms-Loading.
+    """
+    stream = request.args.get('stream')
+    if stream in ('json', 'ndjson'):
+        mimetype = 'application/x-ndjson' if stream == 'ndjson' else 'application/json'
+        return Response(_stream_alarms(stream), mimetype=mimetype)
+
+    if 'after' in request.args or 'limit' in request.args:
+        try:
+            limit = min(max(1, int(request.args.get('limit', 50))), 1000)
+            after = request.args.get('after')
+            after = None if after is None else int(after)
+        except ValueError:
+            return jsonify({'error': 'Parámetros after y limit deben ser enteros'}), 400
+        page = get_alarms_page(after, limit)
+        if page is None:
+            return jsonify({'error': 'Cursor no encontrado'}), 404
+        items, next_cursor = page
+        return jsonify({'alarms': items, 'next_cursor': next_cursor})
+
+    response = jsonify(get_alarms())
+    if is_loading():
+        response.headers['X-Alarms-Loading'] = '1'
+    return response
+
+def validate_alarm_data(data, creating=False):
+    """
+    Revisa los campos de una alarma recibida (alta o edición).
+    Retorna un mensaje de error o None si son válidos.
+    """
+    if not isinstance(data, dict):
+        return 'Se requiere un objeto JSON'
+    if creating or 'time' in data:
+        # HH:MM o HH:MM:SS estrictos (caben en los 8 bytes ASCII del snapshot)
+        if parse_minute_of_day(data.get('time')) is None:
+            return 'Formato de hora inválido, usa HH:MM'
+    if not isinstance(data.get('label', ''), str):
+        return 'La etiqueta debe ser texto'
+    if not isinstance(data.get('active', True), bool):
+        return "'active' debe ser true o false"
+    return None
+
+def build_alarm(data):
+    """Construye una alarma nueva a partir de datos ya validados"""
+    return {
+        'id': new_alarm_id(),
         'time': data.get('time'),
         'label': data.get('label', ''),
         'active': True
     }
+
+@bp.route('/', methods=['POST'])
+def create_alarm():
+    """Crea una nueva alarma y la añade a la lista circular"""
+    data = request.get_json(silent=True)
+    error = validate_alarm_data(data, creating=True)
+    if error:
+        return jsonify({'error': error}), 400
+    alarm = build_alarm(data)
     add_alarm(alarm)
     return jsonify(alarm), 201
 
+def _batch_error(kind, item):
+    """Mensaje de error de una operación del lote, o None si es válida"""
+    if kind == 'create':
+        return validate_alarm_data(item, creating=True)
+    if kind not in ('update', 'delete'):
+        return 'Operación inválida'
+    alarm_id = item.get('id')
+    if not isinstance(alarm_id, int) or isinstance(alarm_id, bool):
+        return 'Se requiere un "id" entero'
+    if kind == 'update':
+        data = item.get('data', {})
+        if not isinstance(data, dict):
+            return '"data" debe ser un objeto'
+        if data.get('id', alarm_id) != alarm_id:
+            return 'No se puede cambiar el id de una alarma'
+        return validate_alarm_data(data)
+    return None
+
+@bp.route('/batch', methods=['POST'])
+def batch_alarms():
+    """
+    Aplica un lote de altas, ediciones y borrados en una sola petición.
+
+    Cuerpo: {"operations": [
+        {"op": "create", "time": "07:00", "label": "..."},
+        {"op": "update", "id": 123, "data": {"active": false}},
+        {"op": "delete", "id": 456}
+    ]}
+
+    Todas las operaciones se aplican bajo un único bloqueo de escritura.
+    Retorna un resultado por operación, en el mismo orden; las inválidas
+    (400) se detectan antes de aplicar nada y no se ejecutan.
+    """
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list):
+        return jsonify({'error': 'Se requiere una lista "operations"'}), 400
+    if len(operations) > Config.ALARM_BATCH_LIMIT:
+        return jsonify({'error': f'Máximo {Config.ALARM_BATCH_LIMIT} operaciones por lote'}), 413
+
+    # Validar y normalizar antes de tocar el almacenamiento: una operación
+    # inválida recibe su 400 y no impide aplicar las demás
+    results = [None] * len(operations)
+    pending = []  # (posición, operación normalizada)
+    for i, item in enumerate(operations):
+        kind = item.get('op') if isinstance(item, dict) else None
+        error = _batch_error(kind, item)
+        if error:
+            results[i] = {'op': kind, 'status': 400, 'error': error}
+        elif kind == 'create':
+            pending.append((i, ('add', build_alarm(item))))
+        elif kind == 'update':
+            pending.append((i, ('update', item['id'], item.get('data', {}))))
+        else:
+            pending.append((i, ('delete', item['id'])))
+
+    applied = apply_batch([op for _, op in pending])
+    for (i, op), outcome in zip(pending, applied):
+        kind = operations[i]['op']
+        if kind == 'create':
+            results[i] = {'op': kind, 'status': 201, 'alarm': outcome}
+        elif kind == 'update' and outcome:
+            results[i] = {'op': kind, 'status': 200, 'alarm': outcome}
+        elif kind == 'delete' and outcome:
+            results[i] = {'op': kind, 'status': 204, 'id': op[1]}
+        else:
+            results[i] = {'op': kind, 'status': 404, 'id': op[1], 'error': 'No encontrada'}
+
+    return jsonify({'results': results})
+
 @bp.route('/<int:alarm_id>', methods=['PUT'])
 def edit_alarm(alarm_id):
-    """Actualiza una alarma existente en la lista circular"""
-    data = request.json
+    """
+    Actualiza una alarma existente en la lista circular.
+    El ID de una alarma no se puede cambiar: un 'id' distinto en el cuerpo da 400.
+    """
+    data = request.get_json(silent=True)
+    error = validate_alarm_data(data)
+    if error:
+        return jsonify({'error': error}), 400
+    if data.get('id', alarm_id) != alarm_id:
+        return jsonify({'error': 'No se puede cambiar el id de una alarma'}), 400
     alarm = update_alarm(alarm_id, data)
     if alarm:
         return jsonify(alarm)
@@ -104,3 +271,72 @@ def get_structure():
     """
     return jsonify(display_alarms_structure())
 
+# ========== CONSULTAS POR HORA DEL DÍA ==========
+
+def _current_minute():
+    now = datetime.datetime.now()
+    return now.hour * 60 + now.minute
+
+@bp.route('/upcoming', methods=['GET'])
+def get_upcoming():
+    """
+    Retorna las próximas ?limit=k alarmas activas a partir de ahora
+    (o de ?from=HH:MM), dando la vuelta a medianoche.
+    """
+    limit = request.args.get('limit', 5, type=int)
+    from_param = request.args.get('from')
+    if from_param:
+        minute = parse_minute_of_day(from_param)
+        if minute is None:
+            return jsonify({'error': 'Formato de hora inválido, usa HH:MM'}), 400
+    else:
+        minute = _current_minute()
+    return jsonify(get_upcoming_alarms(minute, max(0, limit)))
+
+@bp.route('/range', methods=['GET'])
+def get_range():
+    """
+    Retorna las alarmas activas entre ?start=HH:MM y ?end=HH:MM (inclusive).
+    Si start es posterior a end, el rango cruza la medianoche.
+    """
+    start = parse_minute_of_day(request.args.get('start'))
+    end = parse_minute_of_day(request.args.get('end'))
+    if start is None or end is None:
+        return jsonify({'error': 'Parámetros start y end requeridos en formato HH:MM'}), 400
+    return jsonify(get_alarms_between(start, end))
+
+# ========== DISPARO DE ALARMAS EN EL SERVIDOR ==========
+
+@bp.route('/due', methods=['GET'])
+def get_due():
+    """
+    Retorna las alarmas activas que vencen en el minuto actual
+    (o en ?time=HH:MM). Consulta la rueda de tiempo, sin recorrer la lista.
+    """
+    time_param = request.args.get('time')
+    if time_param:
+        minute = parse_minute_of_day(time_param)
+        if minute is None:
+            return jsonify({'error': 'Formato de hora inválido, usa HH:MM'}), 400
+    else:
+        minute = _current_minute()
+    return jsonify(get_due_alarms(minute))
+
+@bp.route('/fired', methods=['GET'])
+def get_fired():
+    """
+    Retorna las alarmas disparadas por el servidor desde ?since=<seq>.
+    El cliente guarda 'last_seq' y lo envía en la siguiente consulta.
+
+    'last_seq' sale de los eventos devueltos (o es 'since' si no hay): leerlo
+    aparte podría adelantarlo a un evento disparado entre las dos lecturas,
+    que el cliente se saltaría. Si la secuencia del servidor es menor que
+    'since' (reinicio) se devuelve esa, para que el cliente reinicie su cursor.
+    """
+    since = request.args.get('since', 0, type=int)
+    events = get_fired_alarms(since)
+    if events:
+        last_seq = events[-1]['seq']
+    else:
+        last_seq = min(since, get_fired_last_seq())
+    return jsonify({'events': events, 'last_seq': last_seq})
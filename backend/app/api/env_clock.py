@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
-from ..utils import get_env_data
+from ..utils import get_env_data, get_env_data_batch, normalize_cities, get_cache_stats
+from ..config import Config
 
 bp = Blueprint('env_clock', __name__, url_prefix='/api/envclock')
 
@@ -8,6 +9,32 @@ def get_env():
     """Obtiene datos ambientales de la ciudad por defecto (Madrid)"""
     return jsonify(get_env_data())
 
+@bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Estadísticas de aciertos, fallos y desalojos de los caches"""
+    return jsonify(get_cache_stats())
+
+@bp.route('/batch', methods=['POST'])
+def get_env_batch():
+    """
+    Obtiene datos ambientales de varias ciudades en una sola petición.
+
+    Cuerpo: {"cities": ["Madrid", "Tokyo", "madrid", ...]}
+
+    Las ciudades repetidas se agrupan; las consultas pendientes se hacen en
+    paralelo. Retorna un resultado por ciudad única, en el orden recibido.
+    """
+    data = request.get_json(silent=True)
+    cities = data.get('cities') if isinstance(data, dict) else None
+    if not isinstance(cities, list):
+        return jsonify({'error': 'Se requiere una lista "cities"'}), 400
+    cities = normalize_cities(cities)
+    if len(cities) > Config.ENV_BATCH_LIMIT:
+        return jsonify({'error': f'Máximo {Config.ENV_BATCH_LIMIT} ciudades por lote'}), 413
+
+    results = get_env_data_batch(cities)
+    return jsonify({'results': results, 'count': len(results)})
+
 @bp.route('/<city>', methods=['GET'])
 def get_env_by_city(city):
     """Obtiene datos ambientales de una ciudad específica"""
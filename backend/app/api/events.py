@@ -0,0 +1,42 @@
+from flask import Blueprint, Response, request, stream_with_context
+from ..events import hub
+from .world_clock import build_times
+
+bp = Blueprint('events', __name__, url_prefix='/api/events')
+
+AVAILABLE_TOPICS = ('stopwatch', 'worldclock')
+HEARTBEAT_SECONDS = 15
+
+# La hora mundial se calcula una vez por segundo para todos los clientes
+hub.add_ticker('worldclock', build_times, interval=1.0)
+
+@bp.route('/', methods=['GET'])
+def stream():
+    """
+    Stream SSE con eventos de cronómetro y reloj mundial.
+    Usa ?topics=stopwatch,worldclock para elegir los temas (por defecto todos).
+    Un cronómetro con nombre se sigue con el tema 'stopwatch:<id>'.
+    """
+    requested = request.args.get('topics')
+    if requested:
+        topics = [t for t in requested.split(',') if t in AVAILABLE_TOPICS or t.startswith('stopwatch:')]
+    else:
+        topics = list(AVAILABLE_TOPICS)
+    sub = hub.subscribe(topics)
+
+    def generate():
+        try:
+            # Indicar al navegador cuánto esperar antes de reconectar
+            yield b"retry: 3000\n\n"
+            while True:
+                message = sub.get(timeout=HEARTBEAT_SECONDS)
+                # Comentario SSE como heartbeat para mantener viva la conexión
+                yield message if message is not None else b": ping\n\n"
+        finally:
+            hub.unsubscribe(sub)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
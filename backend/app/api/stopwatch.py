@@ -1,36 +1,107 @@
 from flask import Blueprint, jsonify, request
+import threading
 import time
+from ..config import Config
+from ..events import hub
+from ..instances import (DEFAULT_ID, InstanceLimitError, UnknownInstanceError,
+                         SharedStopwatchRegistry, StopwatchRegistry)
 
 bp = Blueprint('stopwatch', __name__, url_prefix='/api/stopwatch')
 
-# Estado simple en memoria
-state = {'running': False, 'start': None, 'elapsed': 0}
-
-@bp.route('/', methods=['GET'])
-def get_state():
-    if state['running']:
-        elapsed = state['elapsed'] + (time.time() - state['start'])
-    else:
-        elapsed = state['elapsed']
-    return jsonify({'running': state['running'], 'elapsed': elapsed})
-
-@bp.route('/start', methods=['POST'])
-def start():
-    if not state['running']:
-        state['start'] = time.time()
-        state['running'] = True
-    return get_state()
-
-@bp.route('/stop', methods=['POST'])
-def stop():
-    if state['running']:
-        state['elapsed'] += time.time() - state['start']
-        state['running'] = False
-    return get_state()
-
-@bp.route('/reset', methods=['POST'])
-def reset():
-    state['running'] = False
-    state['start'] = None
-    state['elapsed'] = 0
-    return get_state()
+# Cronómetros indexados por ID ('default' para las rutas sin ID): en memoria,
+# o en el almacén compartido cuando hay varios workers
+if Config.SHARED_STATE:
+    from ..shared_state import get_store
+    stopwatches = SharedStopwatchRegistry(get_store(), lap_capacity=Config.STOPWATCH_LAP_CAPACITY,
+                                          max_instances=Config.MAX_NAMED_INSTANCES)
+else:
+    stopwatches = StopwatchRegistry(lap_capacity=Config.STOPWATCH_LAP_CAPACITY,
+                                    max_instances=Config.MAX_NAMED_INSTANCES)
+
+SHARED_POLL_SECONDS = 0.25
+
+def event_topic(sw_id):
+    """Tema SSE de un cronómetro"""
+    return 'stopwatch' if sw_id == DEFAULT_ID else f'stopwatch:{sw_id}'
+
+def publish_state(data):
+    """Notifica el cambio de estado a los clientes suscritos por SSE"""
+    hub.publish(event_topic(data['id']), data)
+    return jsonify(data)
+
+def _watch_shared_changes():
+    """
+    Con varios workers, un cambio hecho en otro proceso no pasa por este
+    hub: se consulta el almacén y se publican los cronómetros modificados
+    (solo mientras haya clientes SSE conectados a este worker).
+    """
+    last = stopwatches.last_change_seq()
+    while True:
+        time.sleep(SHARED_POLL_SECONDS)
+        if not hub.subscriber_count():
+            continue
+        try:
+            changed, last = stopwatches.changes(last)
+            for data in changed:
+                hub.publish(event_topic(data['id']), data)
+        except Exception as e:
+            print(f"❌ Error leyendo cronómetros compartidos: {e}")
+
+if Config.SHARED_STATE:
+    threading.Thread(target=_watch_shared_changes, name='stopwatch-watcher', daemon=True).start()
+
+@bp.errorhandler(UnknownInstanceError)
+def unknown_instance(error):
+    """Solo /start crea cronómetros con nombre; el resto responde 404 si no existen"""
+    return jsonify({'error': 'No encontrado', 'id': error.args[0]}), 404
+
+@bp.errorhandler(InstanceLimitError)
+def instance_limit(error):
+    return jsonify({'error': f'Máximo de {error.args[0]} cronómetros con nombre'}), 429
+
+@bp.route('/', methods=['GET'], defaults={'sw_id': DEFAULT_ID})
+@bp.route('/<sw_id>/', methods=['GET'])
+def get_state(sw_id):
+    return jsonify(stopwatches.snapshot(sw_id))
+
+@bp.route('/start', methods=['POST'], defaults={'sw_id': DEFAULT_ID})
+@bp.route('/<sw_id>/start', methods=['POST'])
+def start(sw_id):
+    return publish_state(stopwatches.start(sw_id))
+
+@bp.route('/stop', methods=['POST'], defaults={'sw_id': DEFAULT_ID})
+@bp.route('/<sw_id>/stop', methods=['POST'])
+def stop(sw_id):
+    return publish_state(stopwatches.stop(sw_id))
+
+@bp.route('/reset', methods=['POST'], defaults={'sw_id': DEFAULT_ID})
+@bp.route('/<sw_id>/reset', methods=['POST'])
+def reset(sw_id):
+    return publish_state(stopwatches.reset(sw_id))
+
+@bp.route('/lap', methods=['POST'], defaults={'sw_id': DEFAULT_ID})
+@bp.route('/<sw_id>/lap', methods=['POST'])
+def lap(sw_id):
+    """Registra una vuelta con el tiempo parcial actual"""
+    lap_data = stopwatches.lap(sw_id)
+    if lap_data is None:
+        return jsonify({'error': 'El cronómetro no está en marcha'}), 409
+    return jsonify(lap_data), 201
+
+@bp.route('/laps', methods=['GET'], defaults={'sw_id': DEFAULT_ID})
+@bp.route('/<sw_id>/laps', methods=['GET'])
+def list_laps(sw_id):
+    """
+    Retorna las vueltas retenidas paginadas con ?offset=&limit=
+    (offset 0 = la vuelta más antigua que sigue en el buffer).
+    """
+    offset = request.args.get('offset', 0, type=int)
+    limit = min(request.args.get('limit', 50, type=int), 1000)
+    return jsonify(stopwatches.laps(sw_id, offset, limit))
+
+@bp.route('/<sw_id>/', methods=['DELETE'])
+def delete(sw_id):
+    """Elimina un cronómetro con nombre"""
+    if stopwatches.delete(sw_id):
+        return '', 204
+    return jsonify({'error': 'No encontrado'}), 404
@@ -1,44 +1,62 @@
 from flask import Blueprint, jsonify, request
-import time
+from ..config import Config
+from ..instances import (DEFAULT_ID, InstanceLimitError, UnknownInstanceError,
+                         SharedTimerRegistry, TimerRegistry)
 
 bp = Blueprint('timer', __name__, url_prefix='/api/timer')
 
-# Estado simple en memoria
-state = {'running': False, 'start': None, 'duration': 0, 'remaining': 0}
-
-@bp.route('/', methods=['GET'])
-def get_state():
-    if state['running']:
-        elapsed = time.time() - state['start']
-        remaining = max(0, state['duration'] - elapsed)
-        if remaining == 0:
-            state['running'] = False
-        state['remaining'] = remaining
-    return jsonify({'running': state['running'], 'remaining': state['remaining']})
-
-@bp.route('/start', methods=['POST'])
-def start():
+# Temporizadores indexados por ID ('default' para las rutas sin ID).
+# En memoria los vencimientos comparten un único min-heap; con varios
+# workers se guardan en el almacén compartido.
+if Config.SHARED_STATE:
+    from ..shared_state import get_store
+    timers = SharedTimerRegistry(get_store(), max_instances=Config.MAX_NAMED_INSTANCES)
+else:
+    timers = TimerRegistry(max_instances=Config.MAX_NAMED_INSTANCES)
+
+@bp.errorhandler(UnknownInstanceError)
+def unknown_instance(error):
+    """Solo /start crea temporizadores con nombre; el resto responde 404 si no existen"""
+    return jsonify({'error': 'No encontrado', 'id': error.args[0]}), 404
+
+@bp.errorhandler(InstanceLimitError)
+def instance_limit(error):
+    return jsonify({'error': f'Máximo de {error.args[0]} temporizadores con nombre'}), 429
+
+@bp.route('/', methods=['GET'], defaults={'timer_id': DEFAULT_ID})
+@bp.route('/<timer_id>/', methods=['GET'])
+def get_state(timer_id):
+    return jsonify(timers.snapshot(timer_id))
+
+@bp.route('/start', methods=['POST'], defaults={'timer_id': DEFAULT_ID})
+@bp.route('/<timer_id>/start', methods=['POST'])
+def start(timer_id):
     data = request.json
     duration = data.get('duration', 0)
-    if duration > 0:
-        state['duration'] = duration
-        state['start'] = time.time()
-        state['running'] = True
-        state['remaining'] = duration
-    return get_state()
-
-@bp.route('/stop', methods=['POST'])
-def stop():
-    if state['running']:
-        elapsed = time.time() - state['start']
-        state['remaining'] = max(0, state['duration'] - elapsed)
-        state['running'] = False
-    return get_state()
-
-@bp.route('/reset', methods=['POST'])
-def reset():
-    state['running'] = False
-    state['start'] = None
-    state['duration'] = 0
-    state['remaining'] = 0
-    return get_state()
+    return jsonify(timers.start(timer_id, duration))
+
+@bp.route('/stop', methods=['POST'], defaults={'timer_id': DEFAULT_ID})
+@bp.route('/<timer_id>/stop', methods=['POST'])
+def stop(timer_id):
+    return jsonify(timers.stop(timer_id))
+
+@bp.route('/reset', methods=['POST'], defaults={'timer_id': DEFAULT_ID})
+@bp.route('/<timer_id>/reset', methods=['POST'])
+def reset(timer_id):
+    return jsonify(timers.reset(timer_id))
+
+@bp.route('/<timer_id>/', methods=['DELETE'])
+def delete(timer_id):
+    """Elimina un temporizador con nombre"""
+    if timers.delete(timer_id):
+        return '', 204
+    return jsonify({'error': 'No encontrado'}), 404
+
+@bp.route('/expired', methods=['GET'])
+def get_expired():
+    """
+    Retorna los temporizadores que terminaron desde ?since=<seq>.
+    Se obtienen del heap de vencimientos, sin recorrer las instancias.
+    """
+    since = request.args.get('since', 0, type=int)
+    return jsonify({'events': timers.expired(since), 'last_seq': timers.last_seq})
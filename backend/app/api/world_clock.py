@@ -1,87 +1,102 @@
-from flask import Blueprint, jsonify, request
-from datetime import datetime
-from zoneinfo import ZoneInfo
+from flask import Blueprint, Response, jsonify, request
+from datetime import datetime, timezone
+import json
+import time
 
-bp = Blueprint('world_clock', __name__, url_prefix='/api/worldclock')
+from ..timezones import CITY_TIMEZONES, format_utc_offset, get_zone, local_time, resolve_timezone
+from ..zone_catalog import get_catalog
 
-# Ciudades disponibles con sus zonas horarias
-CITY_TIMEZONES = {
-    'Madrid': 'Europe/Madrid',
-    'Buenos Aires': 'America/Argentina/Buenos_Aires', 
-    'New York': 'America/New_York',
-    'Tokyo': 'Asia/Tokyo',
-    'London': 'Europe/London',
-    'Paris': 'Europe/Paris',
-    'Los Angeles': 'America/Los_Angeles',
-    'Sydney': 'Australia/Sydney',
-    'Mexico City': 'America/Mexico_City',
-    'Cairo': 'Africa/Cairo'
-}
+bp = Blueprint('world_clock', __name__, url_prefix='/api/worldclock')
 
 AVAILABLE_CITIES = list(CITY_TIMEZONES.keys())
 
-def format_utc_offset(offset):
-    """Formatea un desplazamiento UTC como ±HH:MM"""
-    if offset is None:
-        return '+00:00'
-    total_minutes = int(offset.total_seconds() // 60)
-    hours, minutes = divmod(abs(total_minutes), 60)
-    sign = '+' if total_minutes >= 0 else '-'
-    return f"{sign}{hours:02d}:{minutes:02d}"
+SEARCH_LIMIT = 50
+DATE_FORMAT = '%m/%d/%Y'
+TIME_FIELDS = ('city', 'time', 'date', 'timezone', 'utc_offset', 'success')
+
+# Respuesta de GET / memorizada por segundo: (segundo, dict, bytes JSON)
+_times_memo = (None, None, None)
 
-def get_city_time_fast(city):
+def get_city_time_fast(city, now=None):
     """Obtiene la hora de una ciudad usando zoneinfo (rápido y offline)"""
     try:
-        timezone_name = CITY_TIMEZONES.get(city, 'UTC')
-        timezone = ZoneInfo(timezone_name)
-        now = datetime.now(timezone)
-        
-        return {
-            'city': city,
-            'time': now.strftime('%H:%M:%S'),
-            'date': now.strftime('%m/%d/%Y'),
-            'timezone': timezone_name,
-            'utc_offset': format_utc_offset(now.utcoffset()),
-            'success': True
-        }
+        time_data = local_time(city, now, DATE_FORMAT)
+        return {field: time_data[field] for field in TIME_FIELDS}
     except Exception as e:
         # Fallback con hora local
         now = datetime.now()
         return {
             'city': city,
             'time': now.strftime('%H:%M:%S'),
-            'date': now.strftime('%m/%d/%Y'),
+            'date': now.strftime(DATE_FORMAT),
             'timezone': 'Local',
             'utc_offset': '+00:00',
             'success': False,
             'error': str(e)
         }
 
-@bp.route('/', methods=['GET'])
-def get_times():
-    """Obtiene las horas de todas las ciudades disponibles"""
+def _times_for_second(second):
+    """
+    Calcula la hora de todas las ciudades sobre un mismo instante UTC y la
+    guarda junto a su JSON codificado; dentro del mismo segundo se reutiliza.
+    """
+    global _times_memo
+    memo = _times_memo
+    if memo[0] == second:
+        return memo
     result = {}
-    
     for city in AVAILABLE_CITIES:
-        time_data = get_city_time_fast(city)
+        time_data = get_city_time_fast(city, second)
         result[city] = {
             'time': time_data['time'],
             'date': time_data['date'],
             'timezone': time_data['timezone'],
             'utc_offset': time_data['utc_offset']
         }
-    
-    return jsonify(result)
+    body = json.dumps(result, sort_keys=True, separators=(',', ':')).encode() + b'\n'
+    memo = _times_memo = (second, result, body)
+    return memo
+
+def build_times():
+    """Construye el diccionario con la hora de todas las ciudades disponibles"""
+    return _times_for_second(int(time.time()))[1]
+
+@bp.route('/', methods=['GET'])
+def get_times():
+    """Obtiene las horas de todas las ciudades disponibles"""
+    return Response(_times_for_second(int(time.time()))[2], mimetype='application/json')
 
 @bp.route('/cities', methods=['GET'])
 def get_cities():
     """Obtiene la lista de ciudades disponibles"""
     return jsonify({'cities': AVAILABLE_CITIES})
 
-@bp.route('/<city>', methods=['GET'])
+@bp.route('/search', methods=['GET'])
+def search_cities():
+    """
+    Autocompletado de ciudades sobre el catálogo IANA completo.
+    Usa ?q=<prefijo>&limit=<n>; cada resultado incluye su desplazamiento actual.
+    El desplazamiento se pide directamente a zoneinfo: cada búsqueda toca
+    zonas distintas y no compensa construir sus tablas de transiciones.
+    """
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', 10, type=int), 1), SEARCH_LIMIT)
+    now = datetime.now(timezone.utc)
+    results = []
+    for name, timezone_name in get_catalog().search(query, limit):
+        local = now.astimezone(get_zone(timezone_name) or timezone.utc)
+        results.append({
+            'city': name,
+            'timezone': timezone_name,
+            'utc_offset': format_utc_offset(local.utcoffset()),
+            'is_dst': bool(local.dst())
+        })
+    return jsonify({'query': query, 'results': results, 'count': len(results)})
+
+@bp.route('/<path:city>', methods=['GET'])
 def get_city_time(city):
-    """Obtiene la hora de una ciudad específica"""
-    if city not in AVAILABLE_CITIES:
+    """Obtiene la hora de una ciudad específica (o de cualquier zona del catálogo)"""
+    if city not in AVAILABLE_CITIES and resolve_timezone(city) is None:
         return jsonify({'error': f'Ciudad {city} no disponible'}), 404
     
     time_data = get_city_time_fast(city)
@@ -0,0 +1,166 @@
+"""
+Formato binario de snapshot de alarmas, legible con mmap.
+
+Estructura del archivo (little-endian):
+
+    Cabecera (16 bytes):   magic b'RLJA' | versión u16 | reservado u16 | total u64
+    Registros (28 bytes):  id i64 | time 8s | active u8 | 3 bytes relleno |
+                           offset u32 | longitud u32
+    Etiquetas:             bytes UTF-8 concatenados; cada registro apunta a
+                           su etiqueta con (offset, longitud) relativos a esta zona
+
+Como los registros tienen ancho fijo, el registro i está en
+16 + i * 28 y se decodifica bajo demanda sin leer el resto del archivo.
+
+La hora ocupa 8 bytes ASCII ('HH:MM' o 'HH:MM:SS'); un valor que no cabe
+se rechaza con ValueError en lugar de truncarse.
+"""
+
+import mmap
+import os
+import struct
+
+MAGIC = b'RLJA'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+RECORD = struct.Struct('<q8s?3xII')
+
+
+def _encode_time(value):
+    if value is None:
+        return b''
+    if not isinstance(value, str) or not value.isascii() or len(value) > 8:
+        raise ValueError(f'Hora no representable en el snapshot: {value!r}')
+    return value.encode('ascii')
+
+
+def _encode_record(alarm, labels_size):
+    """Registro binario y etiqueta UTF-8 de una alarma; ValueError si no es válida"""
+    alarm_id = alarm.get('id')
+    if type(alarm_id) is not int:
+        raise ValueError(f'ID de alarma no entero: {alarm_id!r}')
+    label = alarm.get('label')
+    label = ('' if label is None else str(label)).encode('utf-8')
+    try:
+        record = RECORD.pack(
+            alarm_id,
+            _encode_time(alarm.get('time')),
+            bool(alarm.get('active', True)),
+            labels_size,
+            len(label)
+        )
+    except struct.error as e:
+        raise ValueError(f'Alarma {alarm_id} no representable en el snapshot: {e}')
+    return record, label
+
+
+def _decode_time(raw):
+    value = raw.rstrip(b'\0').decode('ascii')
+    return value or None
+
+
+def write_snapshot(path, alarms):
+    """
+    Escribe un snapshot binario con las alarmas dadas (iterable de dicts).
+    Escribe en un archivo temporal y lo reemplaza de forma atómica.
+    Las etiquetas que no son texto se convierten con str(); un ID no entero
+    o una hora que no cabe lanzan ValueError y el snapshot anterior se
+    conserva. Retorna el número de alarmas escritas.
+    """
+    tmp_path = path + '.tmp'
+    labels = bytearray()
+    count = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+            for alarm in alarms:
+                record, label = _encode_record(alarm, len(labels))
+                f.write(record)
+                labels += label
+                count += 1
+            f.write(labels)
+            # Completar la cabecera con el total de registros
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, 0, count))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+class MappedAlarmSnapshot:
+    """
+    Vista de solo lectura sobre un snapshot binario mapeado en memoria.
+    Los registros se decodifican al acceder a ellos (carga perezosa).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Archivo vacío: no se puede mapear
+            self._file.close()
+            raise ValueError(f'Snapshot vacío: {path}')
+        magic, version, _, count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'Formato de snapshot no reconocido: {path}')
+        self._count = count
+        self._labels_offset = HEADER.size + count * RECORD.size
+
+    def __len__(self):
+        return self._count
+
+    def _decode(self, fields):
+        alarm_id, time_raw, active, offset, length = fields
+        start = self._labels_offset + offset
+        return {
+            'id': alarm_id,
+            'time': _decode_time(time_raw),
+            'label': self._map[start:start + length].decode('utf-8'),
+            'active': active
+        }
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._decode(RECORD.unpack_from(self._map, HEADER.size + index * RECORD.size))
+
+    def __iter__(self):
+        records = memoryview(self._map)[HEADER.size:self._labels_offset]
+        try:
+            for fields in RECORD.iter_unpack(records):
+                yield self._decode(fields)
+        finally:
+            records.release()
+
+    def select(self, ids):
+        """
+        Alarmas del snapshot cuyo ID está en 'ids', en orden. Recorre los
+        registros sin decodificar las etiquetas de los demás.
+        """
+        records = memoryview(self._map)[HEADER.size:self._labels_offset]
+        try:
+            return [self._decode(fields) for fields in RECORD.iter_unpack(records) if fields[0] in ids]
+        finally:
+            records.release()
+
+    def slice(self, start, stop):
+        """Decodifica solo los registros [start, stop)"""
+        return [self[i] for i in range(max(0, start), min(stop, self._count))]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
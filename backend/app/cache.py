@@ -0,0 +1,196 @@
+"""
+Cache acotado con expiración (TTL), desalojo LRU y coalescencia de peticiones.
+
+Si varias peticiones piden a la vez una clave que no está en el cache, solo
+la primera ejecuta la carga (single-flight); las demás esperan su resultado.
+
+Con max_stale > 0 aplica stale-while-revalidate: una entrada vencida hace
+menos de max_stale segundos se sirve al instante y se refresca en segundo
+plano en un pool de hilos, de modo que nadie espera a los proveedores.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class _Flight:
+    """Carga en curso compartida por todos los que esperan la misma clave"""
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Cache LRU con tamaño máximo y TTL por entrada.
+
+    - get(key): valor vigente o None
+    - set(key, value): guarda y desaloja la entrada menos usada si está lleno
+    - get_or_load(key, loader): retorna el valor vigente o ejecuta loader()
+      una sola vez aunque haya varios llamadores concurrentes
+    - stats(): aciertos, fallos, desalojos, expiraciones y coalescencias
+
+    Las entradas se guardan como (valor, fresco_hasta, caduca_en); sin
+    stale-while-revalidate ambos instantes coinciden.
+    """
+
+    def __init__(self, maxsize=256, ttl=300, name='cache', max_stale=0, executor=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.max_stale = max_stale
+        self._executor = executor  # Pool para refrescos en segundo plano
+        self._data = OrderedDict()  # key -> (value, fresh_until, expires_at)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._coalesced = 0
+        self._stale_hits = 0
+        self._refreshes = 0
+        self._refresh_errors = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def _lookup(self, key, now):
+        """
+        Busca una entrada no caducada, fresca o aún servible como obsoleta
+        (llamar con el bloqueo tomado)
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= now:
+            del self._data[key]
+            self._expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        """Retorna el valor solo si está fresco"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(key, now)
+            if entry is None or entry[1] <= now:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def _store(self, key, value, ttl=None):
+        now = time.monotonic()
+        fresh_until = now + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, fresh_until, fresh_until + self.max_stale)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            old_key, (_, _, expires_at) = self._data.popitem(last=False)
+            if expires_at <= now:
+                self._expirations += 1
+            else:
+                self._evictions += 1
+
+    def get_or_load(self, key, loader, ttl=None):
+        """
+        Retorna el valor en cache o lo carga con loader().
+        Si ya hay una carga en curso para la clave, espera a esa carga.
+        Los errores de loader() se propagan a todos los que esperan y no se cachean.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._lookup(key, now)
+            if entry is not None and entry[1] > now:
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                # Obsoleta pero dentro de max_stale: servirla y refrescar aparte
+                self._stale_hits += 1
+                if key not in self._flights:
+                    flight = self._flights[key] = _Flight()
+                    self._refreshes += 1
+                    self._submit(key, loader, ttl, flight)
+                return entry[0]
+            self._misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+            with self._lock:
+                self._store(key, flight.value, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _submit(self, key, loader, ttl, flight):
+        """Programa un refresco en segundo plano (llamar con el bloqueo tomado)"""
+        if self._executor is not None:
+            self._executor.submit(self._refresh, key, loader, ttl, flight)
+        else:
+            threading.Thread(
+                target=self._refresh, args=(key, loader, ttl, flight), daemon=True
+            ).start()
+
+    def _refresh(self, key, loader, ttl, flight):
+        """Recarga una entrada obsoleta; si falla se sigue sirviendo la anterior"""
+        try:
+            flight.value = loader()
+            with self._lock:
+                self._store(key, flight.value, ttl)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._refresh_errors += 1
+            print(f"⚠️ Error refrescando {self.name} '{key}': {e}")
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'name': self.name,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'max_stale': self.max_stale,
+                'hits': self._hits,
+                'stale_hits': self._stale_hits,
+                'refreshes': self._refreshes,
+                'refresh_errors': self._refresh_errors,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'coalesced': self._coalesced
+            }
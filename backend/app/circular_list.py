@@ -7,7 +7,10 @@ class Node:
     """
     Nodo de la lista circular doblemente enlazada.
     Cada nodo contiene datos y referencias a los nodos siguiente y anterior.
+    Usa __slots__ para evitar un __dict__ por nodo y reducir memoria.
     """
+    __slots__ = ('data', 'next', 'prev')
+    
     def __init__(self, data):
         self.data = data
         self.next = None
@@ -26,12 +29,27 @@ class CircularDoublyLinkedList:
     - El primer nodo apunta al último (circular)
     - Navegación bidireccional (next y prev)
     - Sin necesidad de verificar None en los extremos
+    - Índice hash id -> nodo para búsquedas, actualizaciones y borrados O(1)
     """
     
     def __init__(self):
         self.head = None
         self.size = 0
         self.current = None  # Puntero para navegación
+        self._index = {}  # Índice: id -> Node
+        # Se incrementa al empezar y al terminar cada modificación: es impar
+        # mientras una está en curso, así un lector sin bloqueo detecta que
+        # recorrió la lista a medio modificar (como un seqlock)
+        self.version = 0
+    
+    def clear(self):
+        """Vacía la lista por completo"""
+        self.version += 1
+        self.head = None
+        self.size = 0
+        self.current = None
+        self._index = {}
+        self.version += 1
     
     def is_empty(self):
         """Verifica si la lista está vacía"""
@@ -41,11 +59,35 @@ class CircularDoublyLinkedList:
         """Retorna el tamaño de la lista"""
         return self.size
     
+    def __contains__(self, id_value):
+        """Verifica en O(1) si existe un nodo con el ID dado"""
+        return id_value in self._index
+    
+    def get_node(self, id_value):
+        """
+        Retorna el nodo asociado a un ID usando el índice hash.
+        Retorna None si no existe.
+        """
+        return self._index.get(id_value)
+    
+    def _index_node(self, node):
+        """Registra un nodo en el índice si sus datos tienen ID"""
+        id_value = node.data.get('id')
+        if id_value is not None:
+            self._index[id_value] = node
+    
     def insert_at_end(self, data):
         """
         Inserta un nuevo nodo al final de la lista.
         Mantiene las referencias circulares.
         """
+        self.version += 1
+        new_node = self._link_at_end(data)
+        self.version += 1
+        return new_node
+    
+    def _link_at_end(self, data):
+        """Enlaza un nodo nuevo antes del head (sin tocar la versión)"""
         new_node = Node(data)
         
         if self.is_empty():
@@ -64,6 +106,7 @@ class CircularDoublyLinkedList:
             new_node.next = self.head
             self.head.prev = new_node
         
+        self._index_node(new_node)
         self.size += 1
         return new_node
     
@@ -72,8 +115,10 @@ class CircularDoublyLinkedList:
         Inserta un nuevo nodo al inicio de la lista.
         El nuevo nodo se convierte en el head.
         """
-        new_node = self.insert_at_end(data)
+        self.version += 1
+        new_node = self._link_at_end(data)
         self.head = new_node
+        self.version += 1
         return new_node
     
     def delete_by_id(self, id_value):
@@ -81,21 +126,11 @@ class CircularDoublyLinkedList:
         Elimina un nodo por su ID.
         Retorna True si se eliminó, False si no se encontró.
         """
-        if self.is_empty():
-            return False
-        
-        current = self.head
-        found = False
-        
-        # Buscar el nodo a eliminar
-        for _ in range(self.size):
-            if current.data.get('id') == id_value:
-                found = True
-                break
-            current = current.next
-        
-        if not found:
+        # Buscar el nodo a eliminar en el índice (O(1))
+        current = self._index.pop(id_value, None)
+        if current is None:
             return False
+        self.version += 1
         
         # Caso especial: único nodo en la lista
         if self.size == 1:
@@ -115,6 +150,7 @@ class CircularDoublyLinkedList:
                 self.current = current.next
         
         self.size -= 1
+        self.version += 1
         return True
     
     def search_by_id(self, id_value):
@@ -122,34 +158,38 @@ class CircularDoublyLinkedList:
         Busca un nodo por su ID.
         Retorna los datos del nodo si se encuentra, None si no.
         """
-        if self.is_empty():
+        node = self._index.get(id_value)
+        if node is None:
             return None
-        
-        current = self.head
-        for _ in range(self.size):
-            if current.data.get('id') == id_value:
-                return current.data
-            current = current.next
-        
-        return None
+        return node.data
     
     def update_by_id(self, id_value, new_data):
         """
         Actualiza los datos de un nodo por su ID.
-        Retorna True si se actualizó, False si no se encontró.
+        Retorna True si se actualizó, False si no se encontró o si el nuevo
+        ID ya pertenece a otro nodo (en ese caso no se modifica nada).
         """
-        if self.is_empty():
+        node = self._index.get(id_value)
+        if node is None:
+            return False
+        new_id = new_data.get('id', id_value)
+        if new_id != id_value and new_id in self._index:
             return False
         
-        current = self.head
-        for _ in range(self.size):
-            if current.data.get('id') == id_value:
-                # Actualizar los datos manteniendo el ID original
-                current.data.update(new_data)
-                return True
-            current = current.next
+        # Copia al escribir: se reemplaza el objeto de datos completo en lugar
+        # de modificarlo, así un lector concurrente ve la versión anterior o
+        # la nueva, nunca una a medio actualizar.
+        data = node.data.copy()
+        data.update(new_data)
+        self.version += 1
+        node.data = data
         
-        return False
+        # Si la actualización cambió el ID, mantener el índice sincronizado
+        if new_id != id_value:
+            del self._index[id_value]
+            self._index[new_id] = node
+        self.version += 1
+        return True
     
     def to_list(self):
         """
@@ -167,6 +207,46 @@ class CircularDoublyLinkedList:
         
         return result
     
+    def iter_nodes(self, start=None):
+        """
+        Recorre los nodos hacia adelante desde 'start' (por defecto el head)
+        hasta volver al head, sin construir una lista intermedia.
+        """
+        if self.is_empty():
+            return
+        node = start or self.head
+        while True:
+            yield node
+            node = node.next
+            if node is self.head:
+                return
+    
+    def page_after(self, id_value=None, limit=50):
+        """
+        Retorna hasta 'limit' datos a continuación del nodo con ID 'id_value'
+        (o desde el head si es None), recorriendo solo esos nodos.
+        Retorna (datos, hay_mas) o None si el ID no existe.
+        """
+        if id_value is None:
+            start = self.head
+        else:
+            node = self._index.get(id_value)
+            if node is None:
+                return None
+            # El siguiente del último es el head: no hay más páginas
+            start = None if node.next is self.head else node.next
+        
+        items = []
+        if start is None or self.is_empty():
+            return items, False
+        node = start
+        while len(items) < limit:
+            items.append(node.data)
+            node = node.next
+            if node is self.head:
+                return items, False
+        return items, True
+    
     def next_item(self):
         """
         Navega al siguiente elemento de forma circular.
@@ -0,0 +1,100 @@
+"""
+Paquete de componentes HTML del frontend en una sola respuesta.
+
+El frontend carga fragmentos de frontend/public/components (alarmas,
+cronómetro, fondo animado, reloj analógico...) con un fetch por archivo.
+ComponentBundle los concatena en un JSON:
+
+    {"version": "<hash>", "components": {"alarm": "<div>...", ...}}
+
+El contenido sale de StaticAssets (ya en memoria), así que el paquete solo
+se reconstruye cuando cambia algún archivo (StaticAssets recarga por
+fecha de modificación). Cada combinación de componentes pedida se guarda
+ya serializada y comprimida, con su ETag; 'version' es el hash de todos
+los componentes y sirve como huella en '?v=' para cachearlo un año.
+"""
+
+import hashlib
+import json
+import threading
+
+from .static_assets import StaticAsset
+
+MAX_VARIANTS = 64  # Combinaciones de componentes memorizadas
+
+
+class ComponentBundle:
+    """
+    - names(): componentes disponibles
+    - get(names=None): StaticAsset con el JSON de esos componentes (o todos)
+    - version: hash del conjunto actual
+    """
+
+    def __init__(self, assets, prefix='components/', suffix='.html'):
+        self._assets = assets
+        self._prefix = prefix
+        self._suffix = suffix
+        self._lock = threading.Lock()
+        self._sources = None  # ruta -> StaticAsset usados en la última versión
+        # (versión, nombre -> html, tupla de nombres -> StaticAsset); se
+        # reemplaza entera para que los lectores vean siempre un estado coherente
+        self._state = (None, {}, {})
+
+    @property
+    def version(self):
+        self._refresh()
+        return self._state[0]
+
+    def _refresh(self):
+        """Reconstruye los componentes solo si cambió algún archivo"""
+        sources = {
+            path: asset for path, asset in self._assets.under(self._prefix).items()
+            if path.endswith(self._suffix) and '/' not in path[len(self._prefix):]
+        }
+        if sources == self._sources:
+            return
+        with self._lock:
+            if sources == self._sources:
+                return
+            digest = hashlib.sha256()
+            components = {}
+            for path in sorted(sources):
+                name = path[len(self._prefix):-len(self._suffix)]
+                components[name] = sources[path].read().decode('utf-8')
+                digest.update(name.encode() + b'\0' + sources[path].digest.encode())
+            self._state = (digest.hexdigest()[:16], components, {})
+            self._sources = sources
+
+    def names(self):
+        self._refresh()
+        return sorted(self._state[1])
+
+    def get(self, names=None):
+        """
+        Paquete con los componentes pedidos (todos si names es None).
+        Lanza KeyError con los nombres desconocidos.
+        """
+        self._refresh()
+        # Si se reconstruye a la vez, la variante calculada aquí queda en el
+        # diccionario de la versión anterior y no se mezcla con la nueva
+        version, components, variants = self._state
+        key = tuple(sorted(set(names))) if names else tuple(sorted(components))
+        asset = variants.get(key)
+        if asset is not None:
+            return asset
+        unknown = [name for name in key if name not in components]
+        if unknown:
+            raise KeyError(unknown)
+        payload = json.dumps(
+            {'version': version, 'components': {name: components[name] for name in key}},
+            ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+        asset = StaticAsset(
+            payload, 'application/json',
+            gzip_min_size=self._assets.gzip_min_size, gzip_level=self._assets.gzip_level
+        )
+        with self._lock:
+            if len(variants) >= MAX_VARIANTS:
+                variants.clear()
+            variants[key] = asset
+        return asset
@@ -1,5 +1,71 @@
 import os
+from pathlib import Path
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev')
     JSONIFY_PRETTYPRINT_REGULAR = True
+    # Almacenar alarmas como registros compactos (__slots__) en lugar de dicts
+    COMPACT_ALARMS = os.environ.get('COMPACT_ALARMS', '1') == '1'
+    # Máximo de vueltas retenidas por cronómetro (buffer circular)
+    STOPWATCH_LAP_CAPACITY = int(os.environ.get('STOPWATCH_LAP_CAPACITY', '1000'))
+    # Máximo de cronómetros y de temporizadores con nombre (0 = sin límite)
+    MAX_NAMED_INSTANCES = int(os.environ.get('MAX_NAMED_INSTANCES', '1000'))
+    # Persistencia de alarmas (log append-only + snapshots)
+    ALARM_PERSISTENCE = os.environ.get('ALARM_PERSISTENCE', '1') == '1'
+    ALARM_DATA_DIR = os.environ.get('ALARM_DATA_DIR', str(Path(__file__).parent.parent / 'data'))
+    ALARM_LOG_COMPACT_EVERY = int(os.environ.get('ALARM_LOG_COMPACT_EVERY', '50000'))
+    # Cargar la lista en segundo plano sirviendo lecturas desde el snapshot mapeado
+    ALARM_BACKGROUND_LOAD = os.environ.get('ALARM_BACKGROUND_LOAD', '1') == '1'
+    # Máximo de operaciones por petición en POST /api/alarms/batch
+    ALARM_BATCH_LIMIT = int(os.environ.get('ALARM_BATCH_LIMIT', '10000'))
+    # Máximo de ciudades en cada cache de clima/hora (LRU)
+    ENV_CACHE_SIZE = int(os.environ.get('ENV_CACHE_SIZE', '256'))
+    # Stale-while-revalidate del clima: segundos que se sirve un valor vencido
+    # mientras se refresca en segundo plano, y tamaño del pool de refresco
+    ENV_WEATHER_MAX_STALE = int(os.environ.get('ENV_WEATHER_MAX_STALE', '1800'))
+    ENV_REFRESH_WORKERS = int(os.environ.get('ENV_REFRESH_WORKERS', '4'))
+    # Cliente HTTP saliente: conexiones por host, reintentos y backoff
+    HTTP_POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', '16'))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', '16'))
+    HTTP_RETRIES = int(os.environ.get('HTTP_RETRIES', '1'))
+    HTTP_BACKOFF = float(os.environ.get('HTTP_BACKOFF', '0.2'))
+    # Proveedores de clima: orden, modo (sequential | race | hedge), retardo
+    # antes de lanzar el siguiente en modo hedge y paralelismo máximo por consulta
+    WEATHER_PROVIDERS = [name.strip() for name in os.environ.get(
+        'WEATHER_PROVIDERS', 'openweather,weatherapi,google').split(',') if name.strip()]
+    WEATHER_PROVIDER_MODE = os.environ.get('WEATHER_PROVIDER_MODE', 'hedge')
+    WEATHER_HEDGE_DELAY = float(os.environ.get('WEATHER_HEDGE_DELAY', '0.5'))
+    WEATHER_RACE_CONCURRENCY = int(os.environ.get('WEATHER_RACE_CONCURRENCY', '2'))
+    WEATHER_PROVIDER_WORKERS = int(os.environ.get('WEATHER_PROVIDER_WORKERS', '8'))
+    # /api/envclock/batch: ciudades máximas por petición e hilos de consulta
+    ENV_BATCH_LIMIT = int(os.environ.get('ENV_BATCH_LIMIT', '50'))
+    ENV_BATCH_WORKERS = int(os.environ.get('ENV_BATCH_WORKERS', '32'))
+    # La hora del reloj ambiental se calcula offline con zoneinfo; con
+    # ENV_TIME_VERIFY=1 se contrasta también con los proveedores de red
+    ENV_TIME_VERIFY = os.environ.get('ENV_TIME_VERIFY', '0') == '1'
+    ENV_TIME_VERIFY_TOLERANCE = int(os.environ.get('ENV_TIME_VERIFY_TOLERANCE', '120'))
+    # URLs base de los proveedores externos (se pueden apuntar a servidores
+    # locales, por ejemplo en benchmarks/load_test.py)
+    OPEN_METEO_URL = os.environ.get('OPEN_METEO_URL', 'https://archive-api.open-meteo.com/v1/archive')
+    WEATHERAPI_URL = os.environ.get('WEATHERAPI_URL', 'http://api.weatherapi.com/v1/current.json')
+    GOOGLE_SEARCH_URL = os.environ.get('GOOGLE_SEARCH_URL', 'https://www.google.com/search')
+    TIMEAPI_URL = os.environ.get('TIMEAPI_URL', 'http://timeapi.io/api/Time/current/zone')
+    # Modo multi-proceso (pre-fork): número de workers y estado compartido en
+    # SQLite. run_unified.py --workers N activa SHARED_STATE y asigna a cada
+    # worker su WORKER_INDEX (el 0 es el líder que dispara las alarmas).
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', '1'))
+    SHARED_STATE = os.environ.get('SHARED_STATE', '0') == '1'
+    SHARED_STATE_PATH = os.environ.get('SHARED_STATE_PATH', os.path.join(ALARM_DATA_DIR, 'shared_state.sqlite3'))
+    SHARED_OPS_RETAIN = int(os.environ.get('SHARED_OPS_RETAIN', '100000'))
+    WORKER_INDEX = int(os.environ.get('WORKER_INDEX', '0'))
+    # Archivos estáticos del frontend: presupuesto de memoria, tamaño máximo
+    # por archivo en memoria, compresión gzip, caché de recursos con huella y
+    # cada cuántos segundos se revisan cambios en disco en segundo plano
+    # (0 = solo al arrancar; por defecto 2 s con FLASK_DEBUG=1 y 0 si no)
+    STATIC_MEMORY_LIMIT = int(os.environ.get('STATIC_MEMORY_LIMIT', str(32 * 1024 * 1024)))
+    STATIC_MAX_FILE_SIZE = int(os.environ.get('STATIC_MAX_FILE_SIZE', str(2 * 1024 * 1024)))
+    STATIC_GZIP_MIN_SIZE = int(os.environ.get('STATIC_GZIP_MIN_SIZE', '512'))
+    STATIC_GZIP_LEVEL = int(os.environ.get('STATIC_GZIP_LEVEL', '9'))
+    STATIC_IMMUTABLE_MAX_AGE = int(os.environ.get('STATIC_IMMUTABLE_MAX_AGE', '31536000'))
+    STATIC_CHECK_INTERVAL = float(os.environ.get(
+        'STATIC_CHECK_INTERVAL', '2' if os.environ.get('FLASK_DEBUG') == '1' else '0'))
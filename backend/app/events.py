@@ -0,0 +1,138 @@
+"""
+Difusión de eventos en tiempo real (Server-Sent Events).
+Un único hilo calcula cada payload una vez por tick y lo reparte a todas
+las conexiones suscritas, en lugar de que cada cliente haga polling.
+"""
+
+import json
+import queue
+import threading
+import time
+
+
+def encode_event(topic, payload):
+    """Codifica un evento en formato SSE (una sola vez para todos los clientes)"""
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return f"event: {topic}\ndata: {data}\n\n".encode('utf-8')
+
+
+class Subscription:
+    """Cola de eventos de una conexión SSE"""
+
+    def __init__(self, topics, maxsize=64):
+        self.topics = set(topics)
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, message):
+        """Encola un mensaje; si el cliente va lento se descarta el más antiguo"""
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout):
+        """Espera el siguiente mensaje; retorna None si vence el timeout"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """
+    Distribuidor de eventos por tema.
+
+    - publish(topic, payload): codifica una vez y reparte a los suscriptores
+    - add_ticker(topic, producer, interval): publica producer() periódicamente,
+      solo mientras haya suscriptores de ese tema
+    - subscribe(topics) / unsubscribe(sub)
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._last = {}  # topic -> último mensaje codificado
+        self._tickers = {}  # topic -> (producer, interval)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+
+    def subscribe(self, topics):
+        """Registra una suscripción y le envía el último estado de cada tema"""
+        sub = Subscription(topics)
+        with self._lock:
+            self._subscribers.add(sub)
+            for topic in sub.topics:
+                if topic in self._last:
+                    sub.put(self._last[topic])
+            self._ensure_thread()
+            self._wakeup.notify()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def subscriber_count(self, topic=None):
+        with self._lock:
+            if topic is None:
+                return len(self._subscribers)
+            return sum(1 for sub in self._subscribers if topic in sub.topics)
+
+    def publish(self, topic, payload):
+        """Publica un payload en un tema"""
+        message = encode_event(topic, payload)
+        with self._lock:
+            self._last[topic] = message
+            targets = [sub for sub in self._subscribers if topic in sub.topics]
+        for sub in targets:
+            sub.put(message)
+
+    def add_ticker(self, topic, producer, interval=1.0):
+        """Registra un productor periódico para un tema"""
+        with self._lock:
+            self._tickers[topic] = (producer, interval)
+
+    def _has_subscribers(self, topic):
+        return any(topic in sub.topics for sub in self._subscribers)
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='event-ticker', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        next_run = {}
+        while True:
+            with self._lock:
+                # Dormir mientras nadie escuche
+                while not self._subscribers:
+                    self._wakeup.wait()
+                now = time.monotonic()
+                due = []
+                for topic, (producer, interval) in self._tickers.items():
+                    if not self._has_subscribers(topic):
+                        continue
+                    if next_run.get(topic, 0) <= now:
+                        next_run[topic] = now + interval
+                        due.append((topic, producer))
+                wait = min(
+                    (next_run[t] for t in self._tickers if t in next_run),
+                    default=now + 1.0
+                ) - now
+
+            for topic, producer in due:
+                try:
+                    self.publish(topic, producer())
+                except Exception as e:
+                    print(f"❌ Error generando evento {topic}: {e}")
+
+            time.sleep(max(0.01, min(wait, 1.0)))
+
+
+# Instancia compartida por toda la aplicación
+hub = EventHub()
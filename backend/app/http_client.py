@@ -0,0 +1,69 @@
+"""
+Cliente HTTP compartido para las llamadas a proveedores externos.
+
+Todas las peticiones salientes pasan por una única requests.Session con un
+pool de conexiones por host (keep-alive), de modo que las llamadas repetidas
+a un mismo proveedor reutilizan la conexión TCP/TLS en lugar de abrir una
+nueva cada vez. Los reintentos con backoff exponencial solo se aplican a
+errores de conexión y respuestas 429/5xx de peticiones GET; los timeouts
+de lectura no se reintentan.
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import Config
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_connections=None, pool_maxsize=None, retries=None, backoff=None):
+    """Crea una sesión con pools acotados y política de reintentos"""
+    retry = Retry(
+        total=Config.HTTP_RETRIES if retries is None else retries,
+        # Un timeout de lectura no se reintenta: el proveedor ya tardó el
+        # timeout entero y otro intento solo duplicaría la espera
+        read=0,
+        backoff_factor=Config.HTTP_BACKOFF if backoff is None else backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections or Config.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize or Config.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+        pool_block=False
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session():
+    """Retorna la sesión compartida, creándola la primera vez"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
+
+
+def http_get(url, **kwargs):
+    """GET a través del pool compartido (mismos argumentos que requests.get)"""
+    return get_session().get(url, **kwargs)
+
+
+def close_session():
+    """Cierra las conexiones abiertas del pool"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,561 @@
+"""
+Registros de múltiples cronómetros y temporizadores identificados por ID.
+Cada instancia es un registro compacto con __slots__; los vencimientos de
+todos los temporizadores viven en un único min-heap, de modo que iniciar,
+detener y vencer cuestan O(log n) sin recorrer las instancias.
+
+Solo start() crea instancias con nombre; el resto de operaciones lanzan
+UnknownInstanceError si el ID no existe. La instancia 'default' (rutas sin
+ID) siempre está disponible. Con 'max_instances' se limita cuántas con
+nombre pueden existir a la vez (InstanceLimitError al superarlo), para que
+un cliente no pueda hacer crecer la memoria sin límite.
+
+En el modo multi-proceso se usan SharedStopwatchRegistry y
+SharedTimerRegistry, con la misma interfaz pero guardados en SQLite.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+from .ring_buffer import NS_PER_SECOND, LapRingBuffer, describe_lap
+
+DEFAULT_ID = 'default'
+
+
+class UnknownInstanceError(KeyError):
+    """El cronómetro o temporizador pedido no existe"""
+
+
+class InstanceLimitError(Exception):
+    """Se alcanzó el máximo de cronómetros o temporizadores con nombre"""
+
+
+def _check_limit(named, max_instances):
+    """Lanza InstanceLimitError si ya hay 'max_instances' instancias con nombre"""
+    if max_instances and named >= max_instances:
+        raise InstanceLimitError(max_instances)
+
+
+class StopwatchRecord:
+    """
+    Estado compacto de un cronómetro.
+    Los tiempos se miden con time.perf_counter_ns (monótono, no salta con NTP)
+    y se guardan en nanosegundos. El buffer de vueltas se crea al primer lap.
+    """
+    __slots__ = ('running', 'start', 'elapsed', 'laps')
+
+    def __init__(self):
+        self.running = False
+        self.start = None
+        self.elapsed = 0
+        self.laps = None
+
+
+class TimerRecord:
+    """
+    Estado compacto de un temporizador.
+    'version' identifica su entrada vigente en el heap; las demás son obsoletas.
+    """
+    __slots__ = ('running', 'deadline', 'duration', 'remaining', 'version')
+
+    def __init__(self):
+        self.running = False
+        self.deadline = None
+        self.duration = 0
+        self.remaining = 0
+        self.version = 0
+
+
+class StopwatchRegistry:
+    """Cronómetros independientes indexados por ID"""
+
+    def __init__(self, lap_capacity=1000, max_instances=None):
+        self._records = {}
+        self._lock = threading.Lock()
+        self.lap_capacity = lap_capacity
+        self.max_instances = max_instances
+
+    def __len__(self):
+        return len(self._records)
+
+    def _get(self, sw_id, create=False):
+        record = self._records.get(sw_id)
+        if record is None:
+            if sw_id != DEFAULT_ID:
+                if not create:
+                    raise UnknownInstanceError(sw_id)
+                _check_limit(len(self._records) - (DEFAULT_ID in self._records), self.max_instances)
+            record = self._records[sw_id] = StopwatchRecord()
+        return record
+
+    @staticmethod
+    def _elapsed_ns(record):
+        if record.running:
+            return record.elapsed + (time.perf_counter_ns() - record.start)
+        return record.elapsed
+
+    def _snapshot(self, sw_id, record):
+        return {
+            'id': sw_id,
+            'running': record.running,
+            'elapsed': self._elapsed_ns(record) / NS_PER_SECOND,
+            'laps': record.laps.total if record.laps else 0
+        }
+
+    def snapshot(self, sw_id=DEFAULT_ID):
+        """Estado actual de un cronómetro"""
+        with self._lock:
+            return self._snapshot(sw_id, self._get(sw_id))
+
+    def start(self, sw_id=DEFAULT_ID):
+        with self._lock:
+            record = self._get(sw_id, create=True)
+            if not record.running:
+                record.start = time.perf_counter_ns()
+                record.running = True
+            return self._snapshot(sw_id, record)
+
+    def stop(self, sw_id=DEFAULT_ID):
+        with self._lock:
+            record = self._get(sw_id)
+            if record.running:
+                record.elapsed += time.perf_counter_ns() - record.start
+                record.running = False
+            return self._snapshot(sw_id, record)
+
+    def reset(self, sw_id=DEFAULT_ID):
+        with self._lock:
+            record = self._get(sw_id)
+            record.running = False
+            record.start = None
+            record.elapsed = 0
+            record.laps = None
+            return self._snapshot(sw_id, record)
+
+    def lap(self, sw_id=DEFAULT_ID):
+        """
+        Registra una vuelta en O(1) con el tiempo transcurrido actual.
+        Retorna None si el cronómetro no está en marcha.
+        """
+        with self._lock:
+            record = self._get(sw_id)
+            if not record.running:
+                return None
+            if record.laps is None:
+                record.laps = LapRingBuffer(self.lap_capacity)
+            return record.laps.append(self._elapsed_ns(record))
+
+    def laps(self, sw_id=DEFAULT_ID, offset=0, limit=50):
+        """Página de vueltas retenidas de un cronómetro"""
+        with self._lock:
+            record = self._get(sw_id)
+            buffer = record.laps
+            return {
+                'id': sw_id,
+                'laps': buffer.page(offset, limit) if buffer else [],
+                'total': buffer.total if buffer else 0,
+                'retained': len(buffer) if buffer else 0,
+                'capacity': self.lap_capacity
+            }
+
+    def delete(self, sw_id):
+        """Elimina un cronómetro. Retorna True si existía."""
+        with self._lock:
+            return self._records.pop(sw_id, None) is not None
+
+
+class TimerRegistry:
+    """
+    Temporizadores independientes con un min-heap compartido de vencimientos.
+
+    El heap guarda (deadline, version, id). Las versiones salen de un
+    contador único del registro, así que una entrada antigua nunca coincide
+    con un temporizador borrado y vuelto a crear con el mismo ID. Detener o
+    reiniciar solo cambia la versión (O(1)); las entradas obsoletas se
+    descartan al salir del heap y se compactan si se acumulan.
+    """
+
+    def __init__(self, history=1000, max_instances=None):
+        self._records = {}
+        self.max_instances = max_instances
+        self._heap = []
+        self._stale = 0
+        self._expired = deque(maxlen=history)
+        self._seq = 0
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._records)
+
+    def _get(self, timer_id, create=False):
+        record = self._records.get(timer_id)
+        if record is None:
+            if timer_id != DEFAULT_ID:
+                if not create:
+                    raise UnknownInstanceError(timer_id)
+                _check_limit(len(self._records) - (DEFAULT_ID in self._records), self.max_instances)
+            record = self._records[timer_id] = TimerRecord()
+        return record
+
+    def _invalidate(self, record):
+        """Invalida la entrada del heap de un temporizador en marcha"""
+        if record.running:
+            record.version = next(self._versions)
+            self._stale += 1
+            # Compactar cuando la mitad del heap son entradas obsoletas
+            if self._stale > 1024 and self._stale * 2 > len(self._heap):
+                self._heap = [
+                    (rec.deadline, rec.version, tid)
+                    for tid, rec in self._records.items() if rec.running
+                ]
+                heapq.heapify(self._heap)
+                self._stale = 0
+
+    def _expire(self, now):
+        """Marca como terminados los temporizadores vencidos (O(log n) cada uno)"""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, version, timer_id = heapq.heappop(heap)
+            record = self._records.get(timer_id)
+            if record is None or record.version != version or not record.running:
+                self._stale = max(0, self._stale - 1)
+                continue
+            record.running = False
+            record.remaining = 0
+            self._seq += 1
+            self._expired.append({'seq': self._seq, 'id': timer_id, 'duration': record.duration})
+
+    def _snapshot(self, timer_id, record, now):
+        if record.running:
+            record.remaining = max(0, record.deadline - now)
+        return {'id': timer_id, 'running': record.running, 'remaining': record.remaining}
+
+    def snapshot(self, timer_id=DEFAULT_ID):
+        """Estado actual de un temporizador"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return self._snapshot(timer_id, self._get(timer_id), now)
+
+    def start(self, timer_id=DEFAULT_ID, duration=0):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            record = self._get(timer_id, create=True)
+            if duration > 0:
+                self._invalidate(record)
+                record.version = next(self._versions)
+                record.duration = duration
+                record.deadline = now + duration
+                record.remaining = duration
+                record.running = True
+                heapq.heappush(self._heap, (record.deadline, record.version, timer_id))
+            return self._snapshot(timer_id, record, now)
+
+    def stop(self, timer_id=DEFAULT_ID):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            record = self._get(timer_id)
+            if record.running:
+                record.remaining = max(0, record.deadline - now)
+                self._invalidate(record)
+                record.running = False
+            return self._snapshot(timer_id, record, now)
+
+    def reset(self, timer_id=DEFAULT_ID):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            record = self._get(timer_id)
+            self._invalidate(record)
+            record.running = False
+            record.deadline = None
+            record.duration = 0
+            record.remaining = 0
+            return self._snapshot(timer_id, record, now)
+
+    def delete(self, timer_id):
+        """Elimina un temporizador. Retorna True si existía."""
+        with self._lock:
+            record = self._records.pop(timer_id, None)
+            if record is None:
+                return False
+            if record.running:
+                self._stale += 1
+            return True
+
+    def expired(self, since=0):
+        """
+        Retorna los temporizadores que terminaron con secuencia mayor a 'since'.
+        Antes procesa los vencimientos pendientes del heap.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            return [event for event in self._expired if event['seq'] > since]
+
+    @property
+    def last_seq(self):
+        return self._seq
+
+
+class SharedStopwatchRegistry:
+    """
+    Cronómetros guardados en el almacén SQLite compartido (modo multi-proceso).
+    Misma interfaz que StopwatchRegistry. Los inicios se guardan como hora
+    de pared (time.time_ns, época Unix): el archivo sobrevive a los procesos
+    y a reinicios de la máquina, donde un reloj monótono dejaría de valer.
+    Las vueltas se guardan por número; se conservan 'lap_capacity' más la
+    anterior a la más antigua, para calcular su tiempo de vuelta.
+    """
+
+    def __init__(self, store, lap_capacity=1000, max_instances=None):
+        self._store = store
+        self.lap_capacity = lap_capacity
+        self.max_instances = max_instances
+
+    def __len__(self):
+        return self._store.connection().execute('SELECT COUNT(*) FROM stopwatches').fetchone()[0]
+
+    def _get(self, conn, sw_id, create=False):
+        row = conn.execute(
+            'SELECT running, start, elapsed, lap_total FROM stopwatches WHERE id = ?', (sw_id,)
+        ).fetchone()
+        if row is None:
+            if sw_id != DEFAULT_ID:
+                if not create:
+                    raise UnknownInstanceError(sw_id)
+                _check_limit(conn.execute('SELECT COUNT(*) FROM stopwatches WHERE id != ?',
+                                          (DEFAULT_ID,)).fetchone()[0], self.max_instances)
+            conn.execute('INSERT OR IGNORE INTO stopwatches (id) VALUES (?)', (sw_id,))
+            row = (0, None, 0, 0)
+        return row
+
+    def _save(self, conn, sw_id, running, start, elapsed, lap_total):
+        seq = self._store.next_counter('stopwatch_seq')
+        conn.execute(
+            'UPDATE stopwatches SET running = ?, start = ?, elapsed = ?, lap_total = ?, seq = ? WHERE id = ?',
+            (int(running), start, elapsed, lap_total, seq, sw_id)
+        )
+
+    @staticmethod
+    def _elapsed_ns(running, start, elapsed):
+        if running:
+            # Si el reloj del sistema retrocede no se descuenta tiempo
+            return elapsed + max(0, time.time_ns() - start)
+        return elapsed
+
+    def _snapshot(self, sw_id, row):
+        running, start, elapsed, lap_total = row
+        return {
+            'id': sw_id,
+            'running': bool(running),
+            'elapsed': self._elapsed_ns(running, start, elapsed) / NS_PER_SECOND,
+            'laps': lap_total
+        }
+
+    def snapshot(self, sw_id=DEFAULT_ID):
+        return self._snapshot(sw_id, self._get(self._store.connection(), sw_id))
+
+    def start(self, sw_id=DEFAULT_ID):
+        with self._store.transaction() as conn:
+            running, start, elapsed, lap_total = self._get(conn, sw_id, create=True)
+            if not running:
+                running, start = 1, time.time_ns()
+                self._save(conn, sw_id, running, start, elapsed, lap_total)
+            return self._snapshot(sw_id, (running, start, elapsed, lap_total))
+
+    def stop(self, sw_id=DEFAULT_ID):
+        with self._store.transaction() as conn:
+            running, start, elapsed, lap_total = self._get(conn, sw_id)
+            if running:
+                running, elapsed = 0, elapsed + max(0, time.time_ns() - start)
+                self._save(conn, sw_id, running, start, elapsed, lap_total)
+            return self._snapshot(sw_id, (running, start, elapsed, lap_total))
+
+    def reset(self, sw_id=DEFAULT_ID):
+        with self._store.transaction() as conn:
+            self._get(conn, sw_id)
+            conn.execute('DELETE FROM stopwatch_laps WHERE sw_id = ?', (sw_id,))
+            self._save(conn, sw_id, 0, None, 0, 0)
+            return self._snapshot(sw_id, (0, None, 0, 0))
+
+    def lap(self, sw_id=DEFAULT_ID):
+        """Registra una vuelta; retorna None si el cronómetro no está en marcha"""
+        with self._store.transaction() as conn:
+            running, start, elapsed, lap_total = self._get(conn, sw_id)
+            if not running:
+                return None
+            split = self._elapsed_ns(running, start, elapsed)
+            row = conn.execute(
+                'SELECT split FROM stopwatch_laps WHERE sw_id = ? AND lap = ?', (sw_id, lap_total)
+            ).fetchone()
+            previous = row[0] if row else 0
+            lap_total += 1
+            conn.execute('INSERT INTO stopwatch_laps (sw_id, lap, split) VALUES (?, ?, ?)',
+                         (sw_id, lap_total, split))
+            conn.execute('DELETE FROM stopwatch_laps WHERE sw_id = ? AND lap < ?',
+                         (sw_id, lap_total - self.lap_capacity))
+            self._save(conn, sw_id, running, start, elapsed, lap_total)
+            return describe_lap(lap_total, split, previous)
+
+    def laps(self, sw_id=DEFAULT_ID, offset=0, limit=50):
+        """Página de vueltas retenidas (offset 0 = la más antigua)"""
+        conn = self._store.connection()
+        total = self._get(conn, sw_id)[3]
+        retained = min(total, self.lap_capacity)
+        first = total - retained + 1 + max(0, offset)
+        last = min(total, first + max(0, limit) - 1)
+        rows = conn.execute(
+            'SELECT lap, split FROM stopwatch_laps WHERE sw_id = ? AND lap BETWEEN ? AND ? ORDER BY lap',
+            (sw_id, first - 1, last)
+        ).fetchall()
+        splits = dict(rows)
+        return {
+            'id': sw_id,
+            'laps': [
+                describe_lap(number, splits[number], splits.get(number - 1, 0))
+                for number in range(first, last + 1) if number in splits
+            ],
+            'total': total,
+            'retained': retained,
+            'capacity': self.lap_capacity
+        }
+
+    def delete(self, sw_id):
+        with self._store.transaction() as conn:
+            conn.execute('DELETE FROM stopwatch_laps WHERE sw_id = ?', (sw_id,))
+            return conn.execute('DELETE FROM stopwatches WHERE id = ?', (sw_id,)).rowcount > 0
+
+    def last_change_seq(self):
+        """Secuencia del último cambio de cualquier cronómetro"""
+        return self._store.get_meta('stopwatch_seq') or 0
+
+    def changes(self, since=0):
+        """
+        Cronómetros modificados (en cualquier worker) después de la secuencia
+        'since'. Retorna (snapshots, última secuencia).
+        """
+        rows = self._store.connection().execute(
+            'SELECT id, running, start, elapsed, lap_total, seq FROM stopwatches WHERE seq > ? ORDER BY seq',
+            (since,)
+        ).fetchall()
+        last = rows[-1][5] if rows else since
+        return [self._snapshot(row[0], row[1:5]) for row in rows], last
+
+
+class SharedTimerRegistry:
+    """
+    Temporizadores guardados en el almacén SQLite compartido.
+    Misma interfaz que TimerRegistry; el índice (running, deadline) hace el
+    papel del min-heap para encontrar los vencidos. Los vencimientos son hora
+    de pared (time.time) por el mismo motivo que en SharedStopwatchRegistry.
+    """
+
+    def __init__(self, store, history=1000, max_instances=None):
+        self._store = store
+        self.history = history
+        self.max_instances = max_instances
+
+    def __len__(self):
+        return self._store.connection().execute('SELECT COUNT(*) FROM timers').fetchone()[0]
+
+    def _expire(self, conn, now):
+        """Marca como terminados los temporizadores vencidos (dentro de una transacción)"""
+        rows = conn.execute(
+            'SELECT id, duration FROM timers WHERE running = 1 AND deadline <= ? ORDER BY deadline', (now,)
+        ).fetchall()
+        seq = None
+        for timer_id, duration in rows:
+            conn.execute('UPDATE timers SET running = 0, remaining = 0 WHERE id = ?', (timer_id,))
+            seq = conn.execute('INSERT INTO timer_expired (id, duration) VALUES (?, ?)',
+                               (timer_id, duration)).lastrowid
+        if seq is not None:
+            conn.execute('DELETE FROM timer_expired WHERE seq <= ?', (seq - self.history,))
+
+    def _expire_pending(self, now):
+        """Procesa vencimientos solo si hay alguno (evita bloquear en lecturas)"""
+        conn = self._store.connection()
+        if conn.execute('SELECT 1 FROM timers WHERE running = 1 AND deadline <= ? LIMIT 1', (now,)).fetchone():
+            with self._store.transaction() as conn:
+                self._expire(conn, now)
+
+    def _get(self, conn, timer_id, create=False):
+        row = conn.execute(
+            'SELECT running, deadline, duration, remaining FROM timers WHERE id = ?', (timer_id,)
+        ).fetchone()
+        if row is None:
+            if timer_id != DEFAULT_ID:
+                if not create:
+                    raise UnknownInstanceError(timer_id)
+                _check_limit(conn.execute('SELECT COUNT(*) FROM timers WHERE id != ?',
+                                          (DEFAULT_ID,)).fetchone()[0], self.max_instances)
+            conn.execute('INSERT OR IGNORE INTO timers (id) VALUES (?)', (timer_id,))
+            row = (0, None, 0, 0)
+        return row
+
+    @staticmethod
+    def _snapshot(timer_id, row, now):
+        running, deadline, _, remaining = row
+        if running:
+            remaining = max(0, deadline - now)
+        return {'id': timer_id, 'running': bool(running), 'remaining': remaining}
+
+    def snapshot(self, timer_id=DEFAULT_ID):
+        now = time.time()
+        self._expire_pending(now)
+        return self._snapshot(timer_id, self._get(self._store.connection(), timer_id), now)
+
+    def start(self, timer_id=DEFAULT_ID, duration=0):
+        now = time.time()
+        with self._store.transaction() as conn:
+            self._expire(conn, now)
+            row = self._get(conn, timer_id, create=True)
+            if duration > 0:
+                row = (1, now + duration, duration, duration)
+                conn.execute(
+                    'UPDATE timers SET running = 1, deadline = ?, duration = ?, remaining = ? WHERE id = ?',
+                    (row[1], duration, duration, timer_id)
+                )
+            return self._snapshot(timer_id, row, now)
+
+    def stop(self, timer_id=DEFAULT_ID):
+        now = time.time()
+        with self._store.transaction() as conn:
+            self._expire(conn, now)
+            running, deadline, duration, remaining = self._get(conn, timer_id)
+            if running:
+                running, remaining = 0, max(0, deadline - now)
+                conn.execute('UPDATE timers SET running = 0, remaining = ? WHERE id = ?', (remaining, timer_id))
+            return self._snapshot(timer_id, (running, deadline, duration, remaining), now)
+
+    def reset(self, timer_id=DEFAULT_ID):
+        now = time.time()
+        with self._store.transaction() as conn:
+            self._expire(conn, now)
+            self._get(conn, timer_id)
+            conn.execute(
+                'UPDATE timers SET running = 0, deadline = NULL, duration = 0, remaining = 0 WHERE id = ?',
+                (timer_id,)
+            )
+            return self._snapshot(timer_id, (0, None, 0, 0), now)
+
+    def delete(self, timer_id):
+        with self._store.transaction() as conn:
+            return conn.execute('DELETE FROM timers WHERE id = ?', (timer_id,)).rowcount > 0
+
+    def expired(self, since=0):
+        """Temporizadores que terminaron con secuencia mayor a 'since'"""
+        self._expire_pending(time.time())
+        rows = self._store.connection().execute(
+            'SELECT seq, id, duration FROM timer_expired WHERE seq > ? ORDER BY seq', (since,))
+        return [{'seq': seq, 'id': timer_id, 'duration': duration} for seq, timer_id, duration in rows]
+
+    @property
+    def last_seq(self):
+        row = self._store.connection().execute('SELECT MAX(seq) FROM timer_expired').fetchone()
+        return row[0] or 0
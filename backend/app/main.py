@@ -1,5 +1,5 @@
 
-from flask import Flask, send_from_directory, send_file
+from flask import Flask, jsonify, request
 import os
 import sys
 from pathlib import Path
@@ -9,11 +9,16 @@ backend_dir = Path(__file__).parent.parent.absolute()
 sys.path.insert(0, str(backend_dir))
 
 from app.config import Config
-from app.api import alarms, stopwatch, timer, env_clock
+from app.api import alarms, stopwatch, timer, env_clock, world_clock, events
+from app import storage
+from app.storage import scheduler
+from app.static_assets import StaticAssets
+from app.component_bundle import ComponentBundle
+import atexit
 
-# Configurar Flask para servir archivos estáticos del frontend
+# El frontend lo sirve StaticAssets desde memoria (sin carpeta estática de Flask)
 frontend_folder = backend_dir.parent / 'frontend' / 'public'
-app = Flask(__name__, static_folder=str(frontend_folder), static_url_path='')
+app = Flask(__name__, static_folder=None)
 app.config.from_object(Config)
 
 # Registrar blueprints
@@ -21,20 +26,72 @@ app.register_blueprint(alarms.bp)
 app.register_blueprint(stopwatch.bp)
 app.register_blueprint(timer.bp)
 app.register_blueprint(env_clock.bp)
+app.register_blueprint(world_clock.bp)
+app.register_blueprint(events.bp)
+
+# Con varios workers las alarmas viven en el almacén compartido (SQLite);
+# en un solo proceso se cargan las guardadas y se activa el log de persistencia
+# (en segundo plano: mientras tanto la lista se sirve desde el snapshot mapeado)
+if Config.SHARED_STATE:
+    from app.shared_state import get_store
+    storage.enable_shared_state(get_store(), leader=Config.WORKER_INDEX == 0)
+elif Config.ALARM_PERSISTENCE:
+    from app.shared_state import reclaim_alarm_log
+    reclaimed = reclaim_alarm_log(Config.SHARED_STATE_PATH, Config.ALARM_DATA_DIR)
+    if reclaimed is not None:
+        print(f"💾 {reclaimed} alarmas recuperadas del estado compartido")
+    storage.enable_persistence(
+        Config.ALARM_DATA_DIR,
+        Config.ALARM_LOG_COMPACT_EVERY,
+        background=Config.ALARM_BACKGROUND_LOAD
+    )
+    atexit.register(storage.flush_persistence)
+
+# Iniciar el motor de disparo de alarmas en segundo plano
+# (con varios workers solo en el líder, para no disparar cada alarma N veces)
+if not Config.SHARED_STATE or Config.WORKER_INDEX == 0:
+    scheduler.start()
+
+# Frontend precargado en memoria (con gzip y ETags) al arrancar
+static_assets = StaticAssets(
+    frontend_folder,
+    memory_limit=Config.STATIC_MEMORY_LIMIT,
+    max_file_size=Config.STATIC_MAX_FILE_SIZE,
+    gzip_min_size=Config.STATIC_GZIP_MIN_SIZE,
+    gzip_level=Config.STATIC_GZIP_LEVEL,
+    immutable_max_age=Config.STATIC_IMMUTABLE_MAX_AGE,
+    check_interval=Config.STATIC_CHECK_INTERVAL
+)
+
+component_bundle = ComponentBundle(static_assets)
+
+@app.route('/api/components', methods=['GET'])
+def get_components():
+    """
+    Componentes HTML del frontend en una sola respuesta JSON.
+    ?names=alarm,timer limita el paquete; sin parámetro van todos.
+    Con ?v=<version> vigente se cachea como recurso inmutable.
+    """
+    names = [name.strip() for name in request.args.get('names', '').split(',') if name.strip()]
+    try:
+        asset = component_bundle.get(names or None)
+    except KeyError as e:
+        return jsonify({'error': 'Componentes desconocidos', 'unknown': e.args[0],
+                        'available': component_bundle.names()}), 404
+    return static_assets.respond(asset, immutable=request.args.get('v') == component_bundle.version)
 
 @app.route('/')
 def index():
     """Servir la página principal del frontend"""
-    return send_file(str(frontend_folder / 'index.html'))
+    return static_assets.response('index.html')
 
 @app.route('/<path:path>')
 def serve_static_files(path):
-    """Servir archivos estáticos del frontend"""
-    try:
-        return send_from_directory(str(frontend_folder), path)
-    except:
-        # Si el archivo no existe, servir index.html (para SPA routing)
-        return send_file(str(frontend_folder / 'index.html'))
+    """
+    Servir archivos estáticos del frontend desde memoria.
+    Las rutas que no son archivos devuelven index.html (SPA routing).
+    """
+    return static_assets.response(path)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000)
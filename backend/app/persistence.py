@@ -0,0 +1,346 @@
+"""
+Persistencia de alarmas con log de solo-anexado (append-only) y snapshots.
+
+- Cada alta, edición o borrado se encola y un hilo escritor lo añade al log
+  en lotes, con un único fsync por lote (group commit), fuera del camino
+  crítico de la petición.
+- Cuando el log crece demasiado se compacta: se escribe un snapshot con el
+  estado completo (archivo temporal + os.replace) y se vacía el log.
+- Al arrancar se reproduce el snapshot y luego la cola del log. Mientras
+  tanto LoadingView ofrece el estado en disco (snapshot + cola) para lecturas.
+
+Formato del snapshot: binario de ancho fijo legible con mmap (ver
+binary_snapshot.py).
+Log: JSON Lines, {"op": "add"|"update"|"delete", ...} por línea.
+
+Las operaciones son idempotentes al reproducirse (add = upsert, update sobre
+una alarma inexistente se ignora, delete de una inexistente también), por lo
+que reproducir operaciones ya incluidas en el snapshot no altera el estado final.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+from .alarm_record import ALARM_FIELDS, AlarmRecord
+from .binary_snapshot import MappedAlarmSnapshot, write_snapshot
+from .time_index import AlarmTimeIndex
+
+SNAPSHOT_FILE = 'alarms.snapshot.bin'
+LOG_FILE = 'alarms.log.jsonl'
+
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def _read_lines(path):
+    """Lee un archivo JSON Lines ignorando una última línea truncada"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # Escritura interrumpida por una caída: se descarta
+                print(f"⚠️ Línea corrupta ignorada en {os.path.basename(path)}")
+
+
+def _fields(data):
+    return {key: value for key, value in data.items() if key in ALARM_FIELDS}
+
+
+class LoadingView:
+    """
+    Estado en disco (snapshot + cola del log) de solo lectura, para servir
+    lecturas mientras la carga completa sigue en curso.
+
+    La cola es corta (el log se compacta cada 'compact_every' operaciones):
+    solo se materializan las alarmas que tocan sus operaciones, aplicadas con
+    la misma semántica que el replay. El resto se lee del snapshot al
+    recorrerlo. 'ops' guarda la cola ya leída para que la carga la reutilice.
+
+    - get_many(ids): alarmas por ID (un solo recorrido del snapshot)
+    - page_after(id, limit): página por cursor, como en la lista circular
+    - time_index(): índice por hora del día, construido una vez al pedirlo
+    """
+
+    def __init__(self, snapshot, ops):
+        self._snapshot = snapshot
+        self.ops = ops
+        self._time_index = None
+        self._time_index_lock = threading.Lock()
+        touched = set()
+        for op in ops:
+            if op.get('op') == 'add':
+                touched.add(op['alarm'].get('id'))
+            else:
+                touched.add(op.get('id'))
+                touched.add((op.get('data') or {}).get('id'))
+        touched.discard(None)
+
+        self._slots = []        # Alarmas tocadas por la cola (None si se borraron)
+        self._from_snapshot = {}  # ID en el snapshot -> posición en _slots
+        self._added = []        # Posiciones de las altas nuevas, en orden
+        live = {}               # ID actual -> posición en _slots
+        for alarm in snapshot.select(touched) if snapshot is not None and touched else ():
+            live[alarm['id']] = self._from_snapshot[alarm['id']] = len(self._slots)
+            self._slots.append(alarm)
+
+        for op in ops:
+            kind = op.get('op')
+            if kind == 'add':
+                alarm = AlarmRecord.from_dict(op['alarm']).to_dict()
+                if alarm.get('id') in live:
+                    self._slots[live[alarm['id']]] = dict(self._slots[live[alarm['id']]], **alarm)
+                else:
+                    live[alarm.get('id')] = len(self._slots)
+                    self._added.append(len(self._slots))
+                    self._slots.append(alarm)
+            elif kind == 'update':
+                position = live.get(op.get('id'))
+                new_id = op['data'].get('id', op['id'])
+                if position is None or (new_id != op['id'] and new_id in live):
+                    continue
+                self._slots[position] = dict(self._slots[position], **_fields(op['data']))
+                if new_id != op['id']:
+                    del live[op['id']]
+                    live[new_id] = position
+            elif kind == 'delete':
+                position = live.pop(op.get('id'), None)
+                if position is not None:
+                    self._slots[position] = None
+
+        self._touched = touched
+        self._live = live
+        deleted = sum(self._slots[i] is None for i in self._from_snapshot.values())
+        added = sum(self._slots[i] is not None for i in self._added)
+        self._len = (len(snapshot) if snapshot is not None else 0) - deleted + added
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        slots, from_snapshot = self._slots, self._from_snapshot
+        if self._snapshot is not None:
+            for alarm in self._snapshot:
+                position = from_snapshot.get(alarm['id'])
+                if position is None:
+                    yield alarm
+                elif slots[position] is not None:
+                    yield slots[position]
+        for position in self._added:
+            if slots[position] is not None:
+                yield slots[position]
+
+    def get_many(self, ids):
+        """Diccionario ID -> alarma de los 'ids' que existen"""
+        found = {}
+        untouched = set()
+        for alarm_id in ids:
+            if alarm_id not in self._touched:
+                untouched.add(alarm_id)
+            elif alarm_id in self._live:
+                found[alarm_id] = self._slots[self._live[alarm_id]]
+        if untouched and self._snapshot is not None:
+            for alarm in self._snapshot.select(untouched):
+                found[alarm['id']] = alarm
+        return found
+
+    def page_after(self, alarm_id=None, limit=50):
+        """
+        Hasta 'limit' alarmas a continuación de 'alarm_id' (o desde el
+        principio). Retorna (alarmas, hay_mas) o None si el ID no existe.
+        """
+        alarms = iter(self)
+        if alarm_id is not None:
+            for alarm in alarms:
+                if alarm['id'] == alarm_id:
+                    break
+            else:
+                return None
+        items = []
+        for alarm in alarms:
+            if len(items) == limit:
+                return items, True
+            items.append(alarm)
+        return items, False
+
+    def time_index(self):
+        """AlarmTimeIndex de la vista (la vista no cambia: se construye una vez)"""
+        with self._time_index_lock:
+            if self._time_index is None:
+                index = AlarmTimeIndex()
+                index.rebuild(self)
+                self._time_index = index
+            return self._time_index
+
+
+class AlarmLog:
+    """
+    Log de operaciones de alarmas con escritura en segundo plano.
+
+    - load(apply): reproduce snapshot + log llamando apply(op)
+    - append(op): encola una operación (no bloquea la petición)
+    - compact(): escribe un snapshot con snapshot_fn() y vacía el log
+    - flush(): espera a que todo lo encolado esté en disco
+    """
+
+    def __init__(self, directory, snapshot_fn, compact_every=50000, batch_size=1024):
+        self.directory = directory
+        self._snapshot_fn = snapshot_fn
+        self.compact_every = compact_every
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._log_ops = 0  # Operaciones en el log desde el último snapshot
+        self._log = None
+        self._thread = None
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def log_path(self):
+        return os.path.join(self.directory, LOG_FILE)
+
+    def open_snapshot(self):
+        """
+        Mapea el snapshot binario en memoria.
+        Retorna None si no existe o no es válido.
+        """
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            return MappedAlarmSnapshot(self.snapshot_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Snapshot binario ignorado: {e}")
+            return None
+
+    def loading_view(self, snapshot):
+        """LoadingView del estado en disco (snapshot ya mapeado + cola del log)"""
+        return LoadingView(snapshot, list(_read_lines(self.log_path)))
+
+    def load(self, apply, snapshot=None, ops=None):
+        """
+        Reproduce el snapshot y la cola del log.
+        Acepta un snapshot ya mapeado y la cola ya leída (de loading_view)
+        para no leerlos dos veces.
+        Retorna un dict con el número de alarmas y operaciones reproducidas.
+        """
+        started = time.perf_counter()
+        if snapshot is None:
+            snapshot = self.open_snapshot()
+        alarms = 0
+        for alarm in snapshot or ():
+            apply({'op': 'add', 'alarm': alarm})
+            alarms += 1
+        count = 0
+        for op in _read_lines(self.log_path) if ops is None else ops:
+            apply(op)
+            count += 1
+        self._log_ops = count
+        return {
+            'snapshot_alarms': alarms,
+            'log_ops': count,
+            'seconds': time.perf_counter() - started
+        }
+
+    def start(self):
+        """Abre el log e inicia el hilo escritor"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._log = open(self.log_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='alarm-log-writer', daemon=True)
+        self._thread.start()
+
+    def append(self, op):
+        """Encola una operación para escribirla en el log"""
+        self._queue.put(_dumps(op))
+
+    def flush(self):
+        """Bloquea hasta que todas las operaciones encoladas estén en disco"""
+        done = threading.Event()
+        self._queue.put(done)
+        if self._thread and self._thread.is_alive():
+            done.wait()
+
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo escritor"""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+        if self._log:
+            self._log.close()
+            self._log = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # Agrupar todo lo que ya esté encolado en un solo fsync
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Ningún error puede terminar el hilo: las operaciones siguientes
+            # se perderían en silencio y flush() quedaría bloqueado
+            try:
+                self._write([entry for entry in batch if isinstance(entry, str)])
+            except Exception as e:
+                print(f"❌ Error en el escritor del log de alarmas: {e}")
+
+            for entry in batch:
+                if isinstance(entry, threading.Event):
+                    entry.set()
+
+            if None in batch:
+                return
+
+    def _write(self, lines):
+        """Añade un lote al log con un único fsync y compacta si toca"""
+        if lines:
+            try:
+                self._log.write('\n'.join(lines) + '\n')
+                self._log.flush()
+                os.fsync(self._log.fileno())
+                self._log_ops += len(lines)
+            except (OSError, ValueError) as e:
+                print(f"❌ Error escribiendo el log de alarmas: {e}")
+
+        if self._log_ops >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """
+        Escribe un snapshot del estado actual y vacía el log.
+        Se ejecuta en el hilo escritor, así que el log no cambia mientras tanto.
+        Si falla, el log se conserva intacto (sigue siendo la fuente de verdad)
+        y se reintenta tras otras 'compact_every' operaciones.
+        """
+        try:
+            started = time.perf_counter()
+            write_snapshot(self.snapshot_path, self._snapshot_fn())
+
+            # Todo lo escrito en el log ya está en el snapshot
+            if self._log:
+                self._log.close()
+            self._log = open(self.log_path, 'w', encoding='utf-8')
+            self._log_ops = 0
+            print(f"💾 Snapshot de alarmas compactado en {time.perf_counter() - started:.2f}s")
+        except (OSError, ValueError) as e:
+            # ValueError: una alarma no representable en el snapshot binario
+            self._log_ops = 0
+            if self._log is None or self._log.closed:
+                self._log = open(self.log_path, 'a', encoding='utf-8')
+            print(f"❌ Error compactando alarmas: {e}")
@@ -0,0 +1,175 @@
+"""
+Servidor pre-fork: un proceso padre abre el socket y lanza N workers.
+
+Cada worker hereda el socket de escucha y ejecuta su propio servidor WSGI
+con hilos, así que las peticiones se reparten entre procesos (y núcleos) sin
+compartir el GIL. El estado que deben ver todos (alarmas, cronómetros y
+temporizadores) vive en el almacén SQLite compartido (shared_state.py).
+
+El padre no importa la aplicación: copia las alarmas del log JSON Lines al
+almacén al arrancar, vigila a los workers, relanza los que terminen y al
+salir devuelve las alarmas al log (ver "fuente de verdad" en shared_state.py).
+Un worker que cae nada más arrancar se relanza con espera creciente; tras
+MAX_CRASHES caídas seguidas se deja de relanzar y, si no queda ninguno, el
+servidor termina con código 1.
+Requiere os.fork (Linux/macOS); en Windows se usa el servidor de un proceso.
+"""
+
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+RESPAWN_DELAY = 1.0  # Espera antes del primer relanzamiento
+RESPAWN_MAX_DELAY = 30.0  # La espera se duplica con cada caída seguida hasta este tope
+STABLE_UPTIME = 30.0  # Un worker que vivió al menos esto reinicia la cuenta de caídas
+MAX_CRASHES = 5  # Caídas seguidas tras las que se deja de relanzar un worker
+
+
+def respawn_delay(crashes):
+    """Espera antes de relanzar un worker que lleva 'crashes' caídas seguidas"""
+    return min(RESPAWN_DELAY * 2 ** max(crashes - 1, 0), RESPAWN_MAX_DELAY)
+
+
+def _listen(host, port, backlog=1024):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(index, host, port, fd):
+    """Código del proceso hijo: importa la app y sirve sobre el socket heredado"""
+    os.environ['WORKER_INDEX'] = str(index)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # El padre coordina el Ctrl+C
+    from werkzeug.serving import make_server
+    from app.config import Config
+
+    # Config ya se evaluó en el padre: fijar el índice propio antes de crear la app
+    Config.WORKER_INDEX = index
+    from app.main import app
+
+    server = make_server(host, port, app, threaded=True, fd=fd)
+    print(f"👷 Worker {index} (pid {os.getpid()}) atendiendo peticiones")
+    server.serve_forever()
+
+
+def _prepare_shared_state():
+    """Activa el estado compartido y le pasa las alarmas guardadas en el log"""
+    os.environ['SHARED_STATE'] = '1'
+    from app.config import Config
+    from app.shared_state import SharedStore, import_alarm_log
+
+    store = SharedStore(Config.SHARED_STATE_PATH, ops_retain=Config.SHARED_OPS_RETAIN)
+    if Config.ALARM_PERSISTENCE:
+        imported = import_alarm_log(store, Config.ALARM_DATA_DIR)
+        if imported:
+            print(f"💾 {imported} alarmas migradas al estado compartido")
+    store.connection().close()
+
+
+def _release_shared_state():
+    """Con los workers ya detenidos, devuelve las alarmas al log JSON Lines"""
+    from app.config import Config
+    from app.shared_state import SharedStore, export_alarm_log
+
+    if not Config.ALARM_PERSISTENCE:
+        return
+    store = SharedStore(Config.SHARED_STATE_PATH, ops_retain=Config.SHARED_OPS_RETAIN)
+    try:
+        exported = export_alarm_log(store, Config.ALARM_DATA_DIR)
+        if exported is not None:
+            print(f"💾 {exported} alarmas devueltas al log de un proceso")
+    except Exception as e:
+        print(f"❌ Error devolviendo las alarmas al log: {e}")
+    finally:
+        store.connection().close()
+
+
+def serve(host='0.0.0.0', port=5000, workers=2):
+    """
+    Lanza 'workers' procesos y los mantiene vivos hasta SIGINT/SIGTERM.
+    Retorna el código de salida: 0 si se pidió parar, 1 si todos los workers
+    agotaron sus reintentos.
+    """
+    _prepare_shared_state()
+    sock = _listen(host, port)
+    children = {}  # pid -> (índice del worker, instante de arranque)
+    crashes = {}  # índice -> caídas seguidas
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                _run_worker(index, host, port, sock.fileno())
+                code = 0
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for index in range(workers):
+        spawn(index)
+    print(f"🚀 Servidor pre-fork en http://{host}:{port}/ con {workers} workers")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        child = children.pop(pid, None)
+        if child is None or stopping:
+            continue
+        index, started = child
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - started >= STABLE_UPTIME:
+            crashes[index] = 0
+        crashes[index] = crashes.get(index, 0) + 1
+        if crashes[index] >= MAX_CRASHES:
+            print(f"❌ Worker {index} (pid {pid}) terminó con código {code} "
+                  f"{crashes[index]} veces seguidas; no se relanza")
+            continue
+        delay = respawn_delay(crashes[index])
+        print(f"⚠️ Worker {index} (pid {pid}) terminó con código {code}; relanzando en {delay:g} s")
+        time.sleep(delay)
+        if not stopping:
+            spawn(index)
+    sock.close()
+    _release_shared_state()
+    # Sin workers vivos y sin haber pedido parar: todos agotaron sus reintentos
+    return 0 if stopping else 1
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Servidor pre-fork del reloj web')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    sys.exit(serve(args.host, args.port, args.workers))
@@ -0,0 +1,84 @@
+"""
+Buffer circular de capacidad fija para las vueltas (laps) del cronómetro.
+Los tiempos parciales se guardan como enteros de nanosegundos en un array,
+de modo que la memoria queda acotada aunque se registren vueltas durante horas:
+al llenarse, cada nueva vuelta sobrescribe la más antigua.
+"""
+
+from array import array
+
+NS_PER_SECOND = 1_000_000_000
+
+
+def describe_lap(number, split_ns, previous_ns):
+    """Descripción de una vuelta para la API (segundos)"""
+    return {
+        'lap': number,
+        'split': split_ns / NS_PER_SECOND,
+        'lap_time': (split_ns - previous_ns) / NS_PER_SECOND
+    }
+
+
+class LapRingBuffer:
+    """
+    Ring buffer de tiempos parciales (split) en nanosegundos.
+
+    - append(split_ns): O(1), descarta la vuelta más antigua si está lleno
+    - page(offset, limit): vueltas retenidas en orden, de la más antigua a la más nueva
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity <= 0:
+            raise ValueError('La capacidad debe ser positiva')
+        self.capacity = capacity
+        self._splits = array('q', bytes(8 * capacity))
+        self._start = 0  # Posición de la vuelta más antigua retenida
+        self._count = 0  # Vueltas retenidas
+        self.total = 0  # Vueltas registradas desde el último reinicio
+        self._base = 0  # Split anterior a la vuelta más antigua retenida
+
+    def __len__(self):
+        return self._count
+
+    def append(self, split_ns):
+        """Registra una vuelta y retorna su descripción"""
+        if self._count:
+            previous = self._splits[(self._start + self._count - 1) % self.capacity]
+        else:
+            previous = self._base
+        if self._count == self.capacity:
+            # Lleno: la vuelta más antigua sale del buffer
+            self._base = self._splits[self._start]
+            self._splits[self._start] = split_ns
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._splits[(self._start + self._count) % self.capacity] = split_ns
+            self._count += 1
+        self.total += 1
+        return self._describe(self.total, split_ns, previous)
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+        self.total = 0
+        self._base = 0
+
+    _describe = staticmethod(describe_lap)
+
+    def page(self, offset=0, limit=50):
+        """
+        Retorna hasta 'limit' vueltas retenidas a partir de 'offset'
+        (0 = la más antigua que sigue en el buffer).
+        """
+        offset = max(0, offset)
+        end = min(self._count, offset + max(0, limit))
+        first_number = self.total - self._count + 1
+        result = []
+        for i in range(offset, end):
+            split = self._splits[(self._start + i) % self.capacity]
+            if i == 0:
+                previous = self._base
+            else:
+                previous = self._splits[(self._start + i - 1) % self.capacity]
+            result.append(self._describe(first_number + i, split, previous))
+        return result
@@ -0,0 +1,340 @@
+"""
+Estado compartido entre procesos en un archivo SQLite (modo WAL).
+
+En el modo multi-proceso (pre-fork) cada worker tiene su propia memoria, así
+que las alarmas, cronómetros y temporizadores viven en este archivo:
+
+- Alarmas: cada worker mantiene su lista circular e índices en memoria y los
+  sincroniza con la tabla 'alarm_ops' (log de operaciones con secuencia
+  global). Las escrituras se hacen con BEGIN IMMEDIATE: el worker se pone al
+  día, aplica la operación en memoria y la registra en la misma transacción,
+  de modo que todos aplican las operaciones en el mismo orden. La tabla
+  'alarms' guarda el estado materializado para arrancar sin reproducir todo.
+- Cronómetros y temporizadores: se leen y escriben directamente en SQL
+  (ver SharedStopwatchRegistry y SharedTimerRegistry en instances.py).
+
+Fuente de verdad de las alarmas entre modos: en reposo es el log JSON Lines
+del modo de un proceso (ALARM_DATA_DIR). Al arrancar con varios workers se
+copian al almacén (import_alarm_log) y, mientras dura, el almacén es la
+fuente de verdad (meta 'alarms_owner' = 'shared'). Al terminar el padre las
+devuelve al log (export_alarm_log); si no pudo hacerlo (caída), el siguiente
+arranque de un proceso las recupera antes de cargar (reclaim_alarm_log).
+
+Cada hilo usa su propia conexión.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from .config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+CREATE TABLE IF NOT EXISTS alarm_ops (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    op TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alarms (
+    id INTEGER PRIMARY KEY,
+    pos INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alarms_pos ON alarms (pos);
+CREATE TABLE IF NOT EXISTS alarm_fired (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS stopwatches (
+    id TEXT PRIMARY KEY,
+    running INTEGER NOT NULL DEFAULT 0,
+    start INTEGER,
+    elapsed INTEGER NOT NULL DEFAULT 0,
+    lap_total INTEGER NOT NULL DEFAULT 0,
+    seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS stopwatches_seq ON stopwatches (seq);
+CREATE TABLE IF NOT EXISTS stopwatch_laps (
+    sw_id TEXT NOT NULL,
+    lap INTEGER NOT NULL,
+    split INTEGER NOT NULL,
+    PRIMARY KEY (sw_id, lap)
+);
+CREATE TABLE IF NOT EXISTS timers (
+    id TEXT PRIMARY KEY,
+    running INTEGER NOT NULL DEFAULT 0,
+    deadline REAL,
+    duration REAL NOT NULL DEFAULT 0,
+    remaining REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS timers_deadline ON timers (running, deadline);
+CREATE TABLE IF NOT EXISTS timer_expired (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+"""
+
+def _dumps(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+class SharedStore:
+    """
+    Acceso al archivo SQLite compartido.
+
+    - connection(): conexión del hilo actual (autocommit)
+    - transaction(): BEGIN IMMEDIATE ... COMMIT, con ROLLBACK si falla
+    - append_alarm_op(op): registra una operación y actualiza 'alarms'
+    """
+
+    def __init__(self, path, ops_retain=100000, fired_history=1000):
+        self.path = path
+        self.ops_retain = ops_retain
+        self.fired_history = fired_history
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self.connection()
+        conn.executescript(SCHEMA)
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Transacción de escritura; las anidadas se unen a la exterior"""
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @contextmanager
+    def read_transaction(self):
+        """
+        Lectura consistente (BEGIN ... COMMIT). Dentro de una transacción ya
+        abierta se une a ella: ni abre otra ni la confirma antes de tiempo.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            conn.execute('COMMIT')
+
+    # --- meta ---
+
+    def get_meta(self, key, default=None):
+        row = self.connection().execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def set_meta(self, key, value):
+        self.connection().execute(
+            'INSERT INTO meta (key, value) VALUES (?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+            (key, value)
+        )
+
+    def next_counter(self, key):
+        """Incrementa un contador de 'meta' (llamar dentro de una transacción)"""
+        value = (self.get_meta(key) or 0) + 1
+        self.set_meta(key, value)
+        return value
+
+    # --- alarmas ---
+
+    def last_alarm_seq(self):
+        row = self.connection().execute('SELECT MAX(seq) FROM alarm_ops').fetchone()
+        return row[0] or 0
+
+    def alarm_ops_since(self, seq):
+        """
+        Operaciones con secuencia mayor a 'seq'.
+        Retorna None si algunas ya se podaron (el worker debe recargar todo).
+        """
+        conn = self.connection()
+        first = conn.execute('SELECT MIN(seq) FROM alarm_ops').fetchone()[0]
+        if first is not None and first > seq + 1 and seq < self.last_alarm_seq():
+            return None
+        rows = conn.execute('SELECT seq, op FROM alarm_ops WHERE seq > ? ORDER BY seq', (seq,))
+        return [(row_seq, json.loads(op)) for row_seq, op in rows]
+
+    def load_alarms(self):
+        """
+        Estado materializado en una sola lectura consistente.
+        Retorna (alarmas en orden de inserción, última secuencia).
+        Se puede llamar dentro de transaction() (al ponerse al día antes de
+        escribir).
+        """
+        with self.read_transaction() as conn:
+            alarms = [json.loads(data) for (data,) in conn.execute('SELECT data FROM alarms ORDER BY pos')]
+            seq = self.last_alarm_seq()
+        return alarms, seq
+
+    def append_alarm_op(self, op):
+        """
+        Registra una operación y la aplica al estado materializado.
+        Debe llamarse dentro de transaction(). Retorna su secuencia.
+        """
+        conn = self.connection()
+        kind = op.get('op')
+        if kind == 'add':
+            alarm = op['alarm']
+            conn.execute(
+                'INSERT INTO alarms (id, pos, data) '
+                'VALUES (?, (SELECT COALESCE(MAX(pos), 0) + 1 FROM alarms), ?) '
+                'ON CONFLICT(id) DO UPDATE SET data = excluded.data',
+                (alarm['id'], _dumps(alarm))
+            )
+        elif kind == 'update':
+            data = op['data']
+            conn.execute('UPDATE alarms SET id = ?, data = ? WHERE id = ?',
+                         (data.get('id', op['id']), _dumps(data), op['id']))
+        elif kind == 'delete':
+            conn.execute('DELETE FROM alarms WHERE id = ?', (op['id'],))
+        seq = conn.execute('INSERT INTO alarm_ops (op) VALUES (?)', (_dumps(op),)).lastrowid
+        if seq % 1000 == 0:
+            # Podar el log: los workers muy atrasados recargan desde 'alarms'
+            conn.execute('DELETE FROM alarm_ops WHERE seq <= ?', (seq - self.ops_retain,))
+        return seq
+
+    def replace_alarms(self, alarms):
+        """Reemplaza todas las alarmas (importación desde el log JSON Lines)"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM alarms')
+            conn.execute('DELETE FROM alarm_ops')
+            for alarm in alarms:
+                self.append_alarm_op({'op': 'add', 'alarm': alarm})
+
+    def alarms_owner(self):
+        """
+        'shared' si el almacén tiene las alarmas vigentes, 'log' si las tiene
+        el log JSON Lines (también cuando aún no hay marca)
+        """
+        return self.get_meta('alarms_owner', 'log')
+
+    def alarm_count(self):
+        return self.connection().execute('SELECT COUNT(*) FROM alarms').fetchone()[0]
+
+    def record_fired(self, events):
+        """Guarda eventos de alarmas disparadas con una secuencia global"""
+        if not events:
+            return
+        with self.transaction() as conn:
+            for event in events:
+                event = {key: value for key, value in event.items() if key != 'seq'}
+                seq = conn.execute('INSERT INTO alarm_fired (event) VALUES (?)', (_dumps(event),)).lastrowid
+            conn.execute('DELETE FROM alarm_fired WHERE seq <= ?', (seq - self.fired_history,))
+
+    def fired_since(self, since=0):
+        rows = self.connection().execute(
+            'SELECT seq, event FROM alarm_fired WHERE seq > ? ORDER BY seq', (since,))
+        return [dict(json.loads(event), seq=seq) for seq, event in rows]
+
+    def last_fired_seq(self):
+        row = self.connection().execute('SELECT MAX(seq) FROM alarm_fired').fetchone()
+        return row[0] or 0
+
+
+def import_alarm_log(store, directory):
+    """
+    Si el log JSON Lines de 'directory' tiene las alarmas vigentes, las copia
+    al almacén (reemplazando las que hubiera) y el almacén pasa a ser la
+    fuente de verdad. Retorna el número de alarmas importadas.
+    """
+    from .persistence import AlarmLog
+
+    if store.alarms_owner() == 'shared':
+        return 0
+    state = OrderedDict()
+
+    def apply(op):
+        kind = op.get('op')
+        if kind == 'add':
+            state[op['alarm']['id']] = op['alarm']
+        elif kind == 'update' and op['id'] in state:
+            data = op['data']
+            if data.get('id', op['id']) != op['id']:
+                del state[op['id']]
+            state[data.get('id', op['id'])] = data
+        elif kind == 'delete':
+            state.pop(op['id'], None)
+
+    AlarmLog(directory, lambda: ()).load(apply)
+    with store.transaction():
+        store.replace_alarms(state.values())
+        store.set_meta('alarms_owner', 'shared')
+    return len(state)
+
+
+def export_alarm_log(store, directory):
+    """
+    Devuelve las alarmas del almacén al log JSON Lines de 'directory' (como
+    snapshot, con el log vacío) y el log pasa a ser la fuente de verdad.
+    Retorna el número de alarmas exportadas, o None si el log ya las tenía.
+    """
+    from .binary_snapshot import write_snapshot
+    from .persistence import AlarmLog
+
+    if store.alarms_owner() != 'shared':
+        return None
+    alarms, _ = store.load_alarms()
+    log = AlarmLog(directory, lambda: ())
+    # Primero se vacía el log: sus operaciones son anteriores a la importación.
+    # Si algo falla antes de cambiar la marca, se reintenta en el próximo arranque.
+    open(log.log_path, 'w', encoding='utf-8').close()
+    write_snapshot(log.snapshot_path, alarms)
+    store.set_meta('alarms_owner', 'log')
+    return len(alarms)
+
+
+def reclaim_alarm_log(path, directory):
+    """
+    Modo de un proceso: si el último arranque con varios workers no devolvió
+    las alarmas al log (el padre terminó de forma abrupta), las exporta
+    ahora. Retorna el número de alarmas recuperadas o None.
+    """
+    if not os.path.exists(path):
+        return None
+    store = SharedStore(path)
+    try:
+        return export_alarm_log(store, directory)
+    finally:
+        store.connection().close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Retorna el almacén compartido del proceso, creándolo la primera vez"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SharedStore(Config.SHARED_STATE_PATH, ops_retain=Config.SHARED_OPS_RETAIN)
+    return _store
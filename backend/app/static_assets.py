@@ -0,0 +1,232 @@
+"""
+Capa de archivos estáticos del frontend servida desde memoria.
+
+Al arrancar se recorre frontend/public una sola vez. De cada archivo se
+guarda el contenido (si cabe en el presupuesto de memoria), una versión
+gzip precomprimida para los tipos de texto y un ETag fuerte (hash del
+contenido). Así cada petición se resuelve con un diccionario, sin tocar
+el disco:
+
+- If-None-Match con el ETag vigente → 304 sin cuerpo
+- Accept-Encoding: gzip → versión comprimida (con su propio ETag)
+- Recursos con huella (nombre 'app.3f9c2a1b.js' o '?v=<hash>' vigente)
+  → Cache-Control de un año e 'immutable'; el resto se revalida siempre
+- Rutas desconocidas → index.html ya cargado (SPA routing)
+
+Los archivos que no caben en memoria se sirven desde disco con send_file,
+con el mismo ETag. Con STATIC_CHECK_INTERVAL > 0 (por defecto solo en
+desarrollo) un hilo en segundo plano vuelve a recorrer el directorio cada
+ese número de segundos para recoger cambios sin reiniciar; las peticiones
+nunca recorren el disco.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+from flask import Response, request, send_file
+
+# Tipos que vale la pena comprimir (las imágenes PNG/JPG ya lo están)
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/javascript', 'application/json',
+    'application/manifest+json', 'image/svg+xml'
+)
+# Huella de contenido en el nombre: nombre.<8+ hex>.ext
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{8,}\.[^./]+$')
+IMMUTABLE_CACHE = 'public, max-age={}, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+mimetypes.add_type('application/javascript', '.js')
+mimetypes.add_type('application/manifest+json', '.webmanifest')
+
+
+class StaticAsset:
+    """Un recurso (archivo o contenido generado) con sus variantes precalculadas"""
+    __slots__ = ('path', 'mtime', 'size', 'mimetype', 'digest', 'etag',
+                 'body', 'gzip_body', 'gzip_etag', 'fingerprinted')
+
+    def __init__(self, data, mimetype, keep_in_memory=True, gzip_min_size=512,
+                 gzip_level=9, path=None, mtime=None, fingerprinted=False):
+        self.path = path
+        self.mtime = mtime
+        self.size = len(data)
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.etag = self.digest[:32]
+        self.fingerprinted = fingerprinted
+        self.body = data if keep_in_memory else None
+        self.gzip_body = None
+        self.gzip_etag = None
+        if keep_in_memory and self.size >= gzip_min_size and self.mimetype.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+            if len(compressed) < self.size:
+                self.gzip_body = compressed
+                self.gzip_etag = self.etag + '-gz'
+
+    @classmethod
+    def from_file(cls, path, rel_path, keep_in_memory, gzip_min_size, gzip_level):
+        mtime = os.stat(path).st_mtime
+        with open(path, 'rb') as handle:
+            data = handle.read()
+        return cls(
+            data,
+            mimetypes.guess_type(rel_path)[0] or 'application/octet-stream',
+            keep_in_memory, gzip_min_size, gzip_level,
+            path=path, mtime=mtime, fingerprinted=bool(FINGERPRINT_RE.search(rel_path))
+        )
+
+    def read(self):
+        """Contenido sin comprimir (de memoria o, si no cabía, de disco)"""
+        if self.body is not None:
+            return self.body
+        with open(self.path, 'rb') as handle:
+            return handle.read()
+
+    @property
+    def memory(self):
+        return len(self.body or b'') + len(self.gzip_body or b'')
+
+
+class StaticAssets:
+    """
+    Índice en memoria de un directorio de archivos estáticos.
+
+    - scan(): (re)carga los archivos nuevos o modificados
+    - response(path): respuesta para una ruta (con SPA fallback)
+    - respond(asset): la misma negociación para contenido generado
+    - stats(): archivos, bytes en memoria, ahorro de gzip y 304 servidos
+    """
+
+    def __init__(self, root, index='index.html', memory_limit=32 * 1024 * 1024,
+                 max_file_size=2 * 1024 * 1024, gzip_min_size=512, gzip_level=9,
+                 immutable_max_age=31536000, check_interval=0):
+        self.root = str(root)
+        self.index = index
+        self.memory_limit = memory_limit
+        self.max_file_size = max_file_size
+        self.gzip_min_size = gzip_min_size
+        self.gzip_level = gzip_level
+        self.immutable_cache = IMMUTABLE_CACHE.format(immutable_max_age)
+        self.check_interval = check_interval
+        self._assets = {}  # ruta relativa con '/' -> StaticAsset
+        self._lock = threading.Lock()
+        self._not_modified = 0
+        self._gzip_served = 0
+        self.scan()
+        if self.check_interval:
+            threading.Thread(target=self._watch, daemon=True).start()
+
+    # --- carga ---
+
+    def _walk(self):
+        for directory, _, files in os.walk(self.root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                yield os.path.relpath(path, self.root).replace(os.sep, '/'), path
+
+    def scan(self):
+        """Recorre el directorio y recarga solo lo que cambió; retorna los recargados"""
+        with self._lock:
+            found = {}
+            reloaded = 0
+            used = sum(asset.memory for asset in self._assets.values())
+            for rel_path, path in self._walk():
+                current = self._assets.get(rel_path)
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                if current is not None and current.mtime == mtime:
+                    found[rel_path] = current
+                    continue
+                if current is not None:
+                    used -= current.memory
+                size = os.path.getsize(path)
+                keep = size <= self.max_file_size and used + size <= self.memory_limit
+                try:
+                    asset = StaticAsset.from_file(path, rel_path, keep, self.gzip_min_size, self.gzip_level)
+                except OSError:
+                    continue
+                used += asset.memory
+                found[rel_path] = asset
+                reloaded += 1
+            self._assets = found
+            return reloaded
+
+    def _watch(self):
+        """Hilo en segundo plano: revisa cambios en disco cada check_interval segundos"""
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"⚠️ Error revisando archivos estáticos: {e}")
+
+    def get(self, rel_path):
+        """StaticAsset de una ruta relativa (o None si no existe)"""
+        return self._assets.get(rel_path)
+
+    def under(self, prefix):
+        """Recursos cuya ruta relativa empieza por 'prefix' (ruta -> StaticAsset)"""
+        return {path: asset for path, asset in self._assets.items() if path.startswith(prefix)}
+
+    # --- respuestas ---
+
+    def response(self, rel_path=None):
+        """
+        Respuesta para 'rel_path' dentro del directorio. Si no existe se
+        sirve index.html (SPA routing); si tampoco existe, 404.
+        """
+        asset = self.get(rel_path) if rel_path else None
+        if asset is None:
+            asset = self._assets.get(self.index)
+            if asset is None:
+                return Response('Not Found', status=404, mimetype='text/plain')
+        return self.respond(asset)
+
+    def respond(self, asset, immutable=False):
+        """
+        Respuesta para un StaticAsset: 304, gzip o cuerpo, con caché y ETag.
+        immutable=True fuerza la caché larga (el llamador validó la huella).
+        """
+        version = request.args.get('v', '')
+        immutable = immutable or asset.fingerprinted or (
+            len(version) >= 8 and asset.digest.startswith(version))
+        use_gzip = asset.gzip_body is not None and request.accept_encodings['gzip'] > 0
+        etag = asset.gzip_etag if use_gzip else asset.etag
+        headers = {
+            'Cache-Control': self.immutable_cache if immutable else REVALIDATE_CACHE,
+            'ETag': f'"{etag}"'
+        }
+        if asset.gzip_body is not None:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if request.if_none_match.contains_weak(etag):
+            self._not_modified += 1
+            return Response(status=304, headers=headers)
+        if asset.body is None:
+            response = send_file(asset.path, mimetype=asset.mimetype, conditional=False, etag=False)
+            response.headers.update(headers)
+            return response
+        if use_gzip:
+            self._gzip_served += 1
+            headers['Content-Encoding'] = 'gzip'
+            return Response(asset.gzip_body, mimetype=asset.mimetype, headers=headers)
+        return Response(asset.body, mimetype=asset.mimetype, headers=headers)
+
+    def stats(self):
+        assets = list(self._assets.values())
+        compressed = [asset for asset in assets if asset.gzip_body is not None]
+        return {
+            'files': len(assets),
+            'in_memory': sum(asset.body is not None for asset in assets),
+            'memory_bytes': sum(asset.memory for asset in assets),
+            'gzip_files': len(compressed),
+            'gzip_saved_bytes': sum(asset.size - len(asset.gzip_body) for asset in compressed),
+            'not_modified': self._not_modified,
+            'gzip_served': self._gzip_served
+        }
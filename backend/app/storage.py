@@ -4,88 +4,605 @@ Esta estructura permite navegación bidireccional y circular entre alarmas.
 """
 
 from .circular_list import CircularDoublyLinkedList
+from .alarm_record import AlarmRecord
+from .alarm_scheduler import AlarmScheduler
+from .config import Config
+from .persistence import AlarmLog
+from .time_index import AlarmTimeIndex
+from contextlib import contextmanager
+import threading
+import time
 
 # Estructura de datos: Lista Circular Doblemente Enlazada
 # Cada nodo contiene: {'id': int, 'time': 'HH:MM', 'label': str, 'active': bool}
+# En modo compacto (Config.COMPACT_ALARMS) el nodo guarda un AlarmRecord
+# con los mismos campos; la API de este módulo sigue devolviendo dicts.
 alarms = CircularDoublyLinkedList()
 
+# Rueda de tiempo que dispara las alarmas en el servidor.
+# Se mantiene sincronizada en cada alta, edición y borrado.
+scheduler = AlarmScheduler(lambda alarm_id: _to_dict(alarms.search_by_id(alarm_id)))
+
+# Índice ordenado por hora del día para próximas alarmas y rangos
+time_index = AlarmTimeIndex()
+
+# Log de persistencia (None mientras no se habilite con enable_persistence)
+alarm_log = None
+
+# Durante una carga masiva los índices se reconstruyen al final de una vez
+_bulk_loading = False
+
+# Mientras se carga la lista en segundo plano, todas las lecturas de alarmas
+# (lista, páginas, stream, conteo, por ID, por hora) se sirven desde el
+# snapshot binario mapeado con la cola del log aplicada (persistence.LoadingView).
+# Las escrituras y la navegación esperan a '_loaded', y el motor de disparo
+# también: al terminar recupera los minutos que pasaron durante la carga.
+_loading_view = None
+_loaded = threading.Event()
+_loaded.set()
+
+# Serializa las escrituras (altas, ediciones, borrados, lotes) y la
+# navegación. El puntero de navegación no se persiste ni se comparte entre
+# workers: es estado de sesión de cada proceso.
+_write_lock = threading.RLock()
+_last_id = 0
+
+# Estado compartido entre procesos (modo pre-fork, ver shared_state.py).
+# None en modo de un solo proceso. '_shared_seq' es la última operación del
+# log compartido aplicada en memoria; '_shared_stale' fuerza una recarga.
+shared = None
+_shared_seq = 0
+_shared_stale = False
+
+
+# Lecturas de la lista completa: intentos sin bloqueo antes de recorrerla
+# bajo el bloqueo de escritura. El stream la recorre en tramos de
+# ITER_CHUNK nodos, cada uno bajo el bloqueo, sin copiar la lista entera.
+SNAPSHOT_READ_ATTEMPTS = 3
+ITER_CHUNK = 256
+
+def _index_alarm(alarm):
+    """Sincroniza los índices auxiliares con el estado de una alarma"""
+    if _bulk_loading:
+        return
+    scheduler.schedule(alarm)
+    time_index.add(alarm)
+
+def _unindex_alarm(alarm_id):
+    """Quita una alarma de los índices auxiliares"""
+    if _bulk_loading:
+        return
+    scheduler.unschedule(alarm_id)
+    time_index.remove(alarm_id)
+
+def _rebuild_indexes():
+    """Reconstruye la rueda de tiempo y el índice ordenado desde la lista"""
+    current = alarms.to_list()
+    scheduler.rebuild(current)
+    time_index.rebuild(current)
+
+def _to_record(alarm):
+    """Convierte una alarma al formato interno de almacenamiento"""
+    if Config.COMPACT_ALARMS:
+        return AlarmRecord.from_dict(alarm)
+    return alarm
+
+def _to_dict(data):
+    """Convierte el formato interno a dict para la API"""
+    if isinstance(data, AlarmRecord):
+        return data.to_dict()
+    return data
+
+def _read_list():
+    """
+    Datos de los nodos en orden (referencias, sin copiarlos).
+    Recorre como mucho 'size' nodos sin el bloqueo de escritura y valida la
+    versión al terminar (impar = escritura en curso). Solo si los escritores
+    la cambian en cada intento se recorre bajo el bloqueo. Las ediciones
+    reemplazan los datos de un nodo (copia al escribir), así que convertirlos
+    después da el estado de esa versión.
+    """
+    for _ in range(SNAPSHOT_READ_ATTEMPTS):
+        version = alarms.version
+        if version % 2 == 0:
+            try:
+                items = alarms.to_list()
+            except AttributeError:
+                # Un nodo a medio enlazar: el recorrido no es válido
+                items = None
+            if items is not None and alarms.version == version:
+                return items
+        time.sleep(0)
+    with _write_lock:
+        return alarms.to_list()
+
+def _next_live(node):
+    """
+    Primer nodo de la lista actual a partir de 'node' inclusive. Un nodo
+    borrado conserva su enlace 'next', así que se siguen esos enlaces hasta
+    llegar a uno vigente. Retorna None si se vuelve al head (fin del
+    recorrido) o si no queda ninguno. Llamar con el bloqueo de escritura.
+    """
+    seen = set()
+    while alarms.get_node(node.data.get('id')) is not node:
+        if id(node) in seen:
+            return None
+        seen.add(id(node))
+        node = node.next
+        if node is alarms.head:
+            return None
+    return node
+
+def _sync_shared():
+    """
+    Aplica en memoria las operaciones hechas por otros workers.
+    En modo de un solo proceso no hace nada.
+    """
+    if shared is None:
+        return
+    if not _shared_stale and shared.last_alarm_seq() == _shared_seq:
+        return
+    with _write_lock:
+        _catch_up_shared()
+
+def _catch_up_shared():
+    """Se pone al día con el log compartido (con el bloqueo de escritura tomado)"""
+    global _shared_seq
+    ops = None if _shared_stale else shared.alarm_ops_since(_shared_seq)
+    if ops is None:
+        _reload_shared()
+        return
+    for seq, op in ops:
+        _replay(op)
+        _shared_seq = seq
+
+def _reload_shared():
+    """Reconstruye la lista completa desde el estado materializado compartido"""
+    global _bulk_loading, _shared_seq, _shared_stale
+    rows, seq = shared.load_alarms()
+    current = alarms.get_current()
+    current_id = current.get('id') if current else None
+    alarms.clear()
+    _bulk_loading = True
+    try:
+        for alarm in rows:
+            _insert(alarm)
+    finally:
+        _bulk_loading = False
+        _rebuild_indexes()
+    alarms.current = alarms.get_node(current_id)
+    _shared_seq = seq
+    _shared_stale = False
+
+@contextmanager
+def _shared_write():
+    """
+    En modo compartido envuelve una escritura en una transacción del archivo
+    compartido: primero se pone al día y, si algo falla, la memoria se marca
+    para recargarse (la transacción se deshace pero la lista ya cambió).
+    """
+    global _shared_stale
+    if shared is None:
+        yield
+        return
+    try:
+        with shared.transaction():
+            _catch_up_shared()
+            yield
+    except BaseException:
+        _shared_stale = True
+        raise
+
 def get_alarms():
     """
     Retorna todas las alarmas como una lista de Python.
     Convierte la lista circular a formato JSON-serializable.
+    Durante la carga inicial se leen del estado en disco (snapshot + log).
+    """
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return list(view)
+    return [_to_dict(data) for data in _read_list()]
+
+def get_alarms_page(after=None, limit=50):
+    """
+    Página de alarmas a partir del cursor 'after' (ID de la última alarma
+    de la página anterior). Solo recorre 'limit' nodos.
+    Retorna (alarmas, siguiente_cursor) o None si el cursor no existe.
+    """
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return _page_result(view.page_after(after, limit))
+    # Recorrer solo 'limit' nodos bajo el bloqueo es breve y evita
+    # seguir enlaces que un escritor está modificando
+    with _write_lock:
+        page = alarms.page_after(after, limit)
+    return _page_result(page)
+
+def _page_result(page):
+    """(alarmas, siguiente_cursor) a partir de (datos, hay_mas)"""
+    if page is None:
+        return None
+    items, has_more = page
+    result = [_to_dict(data) for data in items]
+    next_cursor = result[-1]['id'] if has_more and result else None
+    return result, next_cursor
+
+def iter_alarms():
+    """
+    Generador de alarmas (dicts) sin construir la lista completa.
+    Durante la carga inicial recorre el estado en disco (snapshot + log).
+    """
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        yield from view
+        return
+    # Tramos acotados bajo el bloqueo; entre tramos se retoma desde el último
+    # nodo enviado aunque otro hilo lo haya borrado mientras tanto. Las
+    # altas y borrados concurrentes pueden verse o no, como en un cursor.
+    last = None
+    while True:
+        with _write_lock:
+            if last is None:
+                start = alarms.head
+            else:
+                start = last.next if alarms.get_node(last.data.get('id')) is last \
+                    else _next_live(last.next)
+                if start is alarms.head:
+                    start = None
+            if start is None or alarms.is_empty():
+                return
+            chunk = []
+            for node in alarms.iter_nodes(start):
+                chunk.append(node.data)
+                last = node
+                if len(chunk) == ITER_CHUNK:
+                    break
+        for data in chunk:
+            yield _to_dict(data)
+
+def is_loading():
+    """Indica si la lista circular aún se está cargando desde disco"""
+    return not _loaded.is_set()
+
+def _insert(alarm):
+    """Inserta una alarma en la lista y en los índices (sin registrar en el log)"""
+    alarms.insert_at_end(_to_record(alarm))
+    _index_alarm(alarm)
+
+def _update(alarm_id, data):
+    """Actualiza una alarma y sus índices (sin registrar en el log)"""
+    if not alarms.update_by_id(alarm_id, data):
+        return None
+    # Si 'data' cambia el ID, la alarma ya está indexada bajo el nuevo
+    new_id = data.get('id', alarm_id)
+    alarm = _to_dict(alarms.search_by_id(new_id))
+    if new_id != alarm_id:
+        _unindex_alarm(alarm_id)
+    _index_alarm(alarm)
+    return alarm
+
+def _delete(alarm_id):
+    """Elimina una alarma y sus índices (sin registrar en el log)"""
+    _unindex_alarm(alarm_id)
+    return alarms.delete_by_id(alarm_id)
+
+def _log(op):
     """
-    return alarms.to_list()
+    Registra una operación en el log compartido (modo multi-proceso) o en
+    el log de persistencia si está habilitado
+    """
+    global _shared_seq
+    if shared is not None:
+        _shared_seq = shared.append_alarm_op(op)
+    elif alarm_log is not None:
+        alarm_log.append(op)
+
+def new_alarm_id():
+    """
+    Genera un ID basado en milisegundos, único aunque se creen
+    varias alarmas en el mismo milisegundo (p. ej. en un lote).
+    """
+    global _last_id
+    with _write_lock, _shared_write():
+        _last_id = max(int(time.time() * 1000), _last_id + 1)
+        if shared is not None:
+            # Reservar el ID para todos los workers
+            _last_id = max(_last_id, (shared.get_meta('alarm_last_id') or 0) + 1)
+        while _last_id in alarms:
+            _last_id += 1
+        if shared is not None:
+            shared.set_meta('alarm_last_id', _last_id)
+        return _last_id
+
+def _add(alarm):
+    _insert(alarm)
+    _log({'op': 'add', 'alarm': _to_dict(_to_record(alarm))})
+    return alarm
+
+def _edit(alarm_id, data):
+    alarm = _update(alarm_id, data)
+    if alarm is not None:
+        # Se registra el estado completo resultante para que el replay sea idempotente
+        _log({'op': 'update', 'id': alarm_id, 'data': alarm})
+    return alarm
+
+def _remove(alarm_id):
+    deleted = _delete(alarm_id)
+    if deleted:
+        _log({'op': 'delete', 'id': alarm_id})
+    return deleted
 
 def add_alarm(alarm):
     """
     Añade una nueva alarma al final de la lista circular.
     La alarma se inserta manteniendo las referencias circulares.
     """
-    alarms.insert_at_end(alarm)
-    return alarm
+    _loaded.wait()
+    with _write_lock, _shared_write():
+        return _add(alarm)
 
 def update_alarm(alarm_id, data):
     """
     Actualiza una alarma existente por su ID.
     Retorna la alarma actualizada si se encuentra, None si no existe.
     """
-    if alarms.update_by_id(alarm_id, data):
-        return alarms.search_by_id(alarm_id)
-    return None
+    _loaded.wait()
+    with _write_lock, _shared_write():
+        return _edit(alarm_id, data)
 
 def delete_alarm(alarm_id):
     """
     Elimina una alarma por su ID.
     Retorna True si se eliminó, False si no se encontró.
     """
-    return alarms.delete_by_id(alarm_id)
+    _loaded.wait()
+    with _write_lock, _shared_write():
+        return _remove(alarm_id)
+
+def apply_batch(operations):
+    """
+    Aplica una secuencia de operaciones bajo un único bloqueo de escritura.
+    Cada operación es ('add', alarm), ('update', id, data) o ('delete', id).
+    Retorna, en el mismo orden, la alarma resultante (add/update), True/False
+    (delete) o None si la alarma no existe.
+    """
+    _loaded.wait()
+    results = []
+    with _write_lock, _shared_write():
+        for op in operations:
+            kind = op[0]
+            if kind == 'add':
+                results.append(_add(op[1]))
+            elif kind == 'update':
+                results.append(_edit(op[1], op[2]))
+            elif kind == 'delete':
+                results.append(_remove(op[1]))
+            else:
+                results.append(None)
+    return results
 
 def get_alarm_by_id(alarm_id):
     """
     Busca y retorna una alarma específica por su ID.
     """
-    return alarms.search_by_id(alarm_id)
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return view.get_many((alarm_id,)).get(alarm_id)
+    return _to_dict(alarms.search_by_id(alarm_id))
+
+def _view_alarms(view, ids):
+    """Alarmas de la vista de carga para 'ids', en ese orden"""
+    found = view.get_many(ids)
+    return [found[alarm_id] for alarm_id in ids if alarm_id in found]
 
 def next_alarm():
     """
     Navega a la siguiente alarma de forma circular.
     Retorna la alarma actual después de moverse.
     """
-    return alarms.next_item()
+    _loaded.wait()
+    _sync_shared()
+    with _write_lock:
+        return _to_dict(alarms.next_item())
 
 def prev_alarm():
     """
     Navega a la alarma anterior de forma circular.
     Retorna la alarma actual después de moverse.
     """
-    return alarms.prev_item()
+    _loaded.wait()
+    _sync_shared()
+    with _write_lock:
+        return _to_dict(alarms.prev_item())
 
 def get_current_alarm():
     """
     Retorna la alarma actual sin mover el puntero de navegación.
     """
-    return alarms.get_current()
+    _loaded.wait()
+    _sync_shared()
+    return _to_dict(alarms.get_current())
 
 def reset_alarm_navigation():
     """
     Reinicia el puntero de navegación a la primera alarma.
     """
-    return alarms.reset_current()
+    _loaded.wait()
+    _sync_shared()
+    with _write_lock:
+        return _to_dict(alarms.reset_current())
 
 def get_alarms_count():
     """
     Retorna el número total de alarmas en la lista.
     """
-    return len(alarms)
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return len(view)
+    return alarms.size
+
+def get_due_alarms(minute):
+    """
+    Retorna las alarmas activas programadas para un minuto del día.
+    Usa la rueda de tiempo: O(alarmas vencidas).
+    """
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return _view_alarms(view, view.time_index().between(minute, minute))
+    return [alarm for alarm in map(get_alarm_by_id, scheduler.due(minute)) if alarm]
+
+def get_upcoming_alarms(minute, limit):
+    """
+    Retorna las próximas 'limit' alarmas activas que suenan después
+    del minuto del día dado, dando la vuelta a medianoche.
+    Usa el índice ordenado: O(log n + k).
+    """
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return _view_alarms(view, view.time_index().upcoming(minute, limit))
+    # El índice puede adelantarse a la lista durante una escritura
+    found = (get_alarm_by_id(alarm_id) for alarm_id in time_index.upcoming(minute, limit))
+    return [alarm for alarm in found if alarm is not None]
+
+def get_alarms_between(start, end):
+    """
+    Retorna las alarmas activas entre dos minutos del día (inclusive).
+    Si start > end el rango cruza la medianoche.
+    """
+    _sync_shared()
+    view = _loading_view
+    if view is not None:
+        return _view_alarms(view, view.time_index().between(start, end))
+    found = (get_alarm_by_id(alarm_id) for alarm_id in time_index.between(start, end))
+    return [alarm for alarm in found if alarm is not None]
+
+def get_fired_alarms(since=0):
+    """
+    Retorna los eventos de alarmas disparadas por el servidor
+    con número de secuencia mayor a 'since'.
+    """
+    if shared is not None:
+        return shared.fired_since(since)
+    return scheduler.fired(since)
+
+def get_fired_last_seq():
+    """Secuencia del último evento de alarma disparada"""
+    if shared is not None:
+        return shared.last_fired_seq()
+    return scheduler.last_seq
+
+def _replay(op):
+    """Aplica una operación del log durante la carga (de forma idempotente)"""
+    kind = op.get('op')
+    if kind == 'add':
+        alarm = op['alarm']
+        if alarm.get('id') in alarms:
+            _update(alarm['id'], alarm)
+        else:
+            _insert(alarm)
+    elif kind == 'update':
+        _update(op['id'], op['data'])
+    elif kind == 'delete':
+        _delete(op['id'])
+
+def enable_persistence(directory, compact_every=50000, background=False):
+    """
+    Carga las alarmas guardadas en 'directory' y activa el log de operaciones.
+
+    Con background=True la carga se hace en un hilo: mientras tanto las
+    lecturas se sirven desde el snapshot binario mapeado (con la cola del log
+    aplicada) y las escrituras, la navegación y el motor de disparo esperan a
+    que termine. Retorna las estadísticas de la carga (alarmas, operaciones,
+    segundos), o None si la carga sigue en curso.
+    """
+    global alarm_log, _loading_view
+    if alarm_log is not None or not _loaded.is_set():
+        return None
+    log = AlarmLog(directory, lambda: map(_to_dict, _read_list()), compact_every=compact_every)
+    snapshot = log.open_snapshot()
+
+    if not background:
+        return _load(log, snapshot)
+
+    # Las lecturas ven el snapshot con la cola del log ya aplicada
+    view = log.loading_view(snapshot)
+    _loading_view = view
+    _loaded.clear()
+    # El motor no ve las alarmas hasta que se reconstruye la rueda: espera
+    # y al terminar recupera los minutos pendientes
+    scheduler.before_tick = _loaded.wait
+    threading.Thread(target=_load, args=(log, snapshot, view.ops),
+                     name='alarm-loader', daemon=True).start()
+    return None
+
+def _load(log, snapshot, ops=None):
+    """
+    Reproduce snapshot + log, reconstruye los índices y activa el log.
+    Si la reproducción falla, el log no se activa: una compactación
+    posterior escribiría el estado parcial sobre los datos guardados.
+    """
+    global alarm_log, _bulk_loading, _loading_view
+    _write_lock.acquire()
+    _bulk_loading = True
+    stats = None
+    try:
+        stats = log.load(_replay, snapshot, ops)
+    finally:
+        _bulk_loading = False
+        _rebuild_indexes()
+        _write_lock.release()
+        # El mapeo se libera cuando ningún lector lo esté usando
+        _loading_view = None
+        if stats is not None:
+            log.start()
+            alarm_log = log
+        else:
+            print("❌ Error cargando las alarmas guardadas: la persistencia queda "
+                  "desactivada para no sobrescribir los datos en disco")
+        _loaded.set()
+    print(f"💾 Alarmas cargadas: {stats['snapshot_alarms']} del snapshot, "
+          f"{stats['log_ops']} operaciones del log en {stats['seconds']:.2f}s")
+    return stats
+
+def enable_shared_state(store, leader=True):
+    """
+    Activa el modo multi-proceso: la lista se carga del almacén compartido y
+    cada lectura o escritura se sincroniza con el log de operaciones común.
+    Solo el worker líder dispara alarmas; sus eventos se guardan en el
+    almacén para que cualquier worker los sirva.
+    """
+    global shared
+    with _write_lock:
+        shared = store
+        _reload_shared()
+    scheduler.before_tick = _sync_shared
+    if leader:
+        scheduler.on_fired = store.record_fired
+    print(f"🔗 Estado compartido activo: {alarms.size} alarmas desde {store.path}")
+
+def flush_persistence():
+    """Espera a que las operaciones pendientes estén en disco"""
+    if alarm_log is not None:
+        alarm_log.flush()
 
 def display_alarms_structure():
     """
     Retorna una representación visual de la estructura circular.
     Útil para debugging y demostrar la estructura.
     """
-    return {
-        'forward': alarms.display_forward(),
-        'backward': alarms.display_backward(),
-        'size': len(alarms),
-        'is_empty': alarms.is_empty()
-    }
+    _sync_shared()
+    with _write_lock:
+        return {
+            'forward': alarms.display_forward(),
+            'backward': alarms.display_backward(),
+            'size': len(alarms),
+            'is_empty': alarms.is_empty()
+        }
@@ -0,0 +1,150 @@
+"""
+Índice ordenado de alarmas activas por hora del día.
+Mantiene una lista ordenada de claves (minuto, id) junto a la lista circular
+para responder "qué alarma suena después" y consultas por rango con bisect,
+en O(log n + k).
+
+Las claves se guardan en trozos ordenados (tuplas de hasta 2 * CHUNK_SIZE
+claves) y el estado completo se publica como una tupla inmutable que cada
+escritura reemplaza (copia al escribir). Una escritura solo copia un trozo
+y la tupla de trozos, y los lectores toman el estado una vez y lo consultan
+sin bloqueo aunque otro hilo esté añadiendo o quitando alarmas. Las
+escrituras deben serializarse fuera (storage usa su bloqueo de escritura).
+"""
+
+from bisect import bisect_left
+from itertools import chain, islice, takewhile
+
+from .alarm_scheduler import MINUTES_PER_DAY, parse_minute_of_day
+
+CHUNK_SIZE = 512
+_EMPTY = ((), (), 0)  # (trozos, última clave de cada trozo, total)
+
+
+def _iter_from(state, probe):
+    """Claves de 'state' mayores o iguales a 'probe', en orden"""
+    chunks, maxes, _ = state
+    first = bisect_left(maxes, probe)
+    if first == len(chunks):
+        return iter(())
+    head = chunks[first][bisect_left(chunks[first], probe):]
+    return chain(head, *chunks[first + 1:])
+
+
+def _iter_all(state):
+    return chain(*state[0])
+
+
+class AlarmTimeIndex:
+    """
+    Lista ordenada de (minuto_del_día, id) para alarmas activas.
+
+    - add(alarm): (re)indexa una alarma; las inactivas se retiran
+    - remove(id): la quita del índice
+    - upcoming(minute, limit): próximos IDs después de 'minute', con vuelta a medianoche
+    - between(start, end): IDs entre dos minutos (inclusive), con vuelta si start > end
+    """
+
+    def __init__(self):
+        self._state = _EMPTY
+        self._key_of = {}  # id -> (minuto, id)
+
+    def __len__(self):
+        return self._state[2]
+
+    def _publish(self, chunks, maxes, total):
+        self._state = (tuple(chunks), tuple(maxes), total)
+
+    def add(self, alarm):
+        """Indexa (o reindexa) una alarma según su 'time' y 'active'"""
+        alarm_id = alarm.get('id')
+        self.remove(alarm_id)
+        minute = parse_minute_of_day(alarm.get('time'))
+        if minute is None or not alarm.get('active', True):
+            return
+        key = (minute, alarm_id)
+        chunks, maxes, total = self._state
+        if not chunks:
+            self._publish(((key,),), (key,), 1)
+        else:
+            i = min(bisect_left(maxes, key), len(chunks) - 1)
+            chunk = chunks[i]
+            pos = bisect_left(chunk, key)
+            chunk = chunk[:pos] + (key,) + chunk[pos:]
+            if len(chunk) > 2 * CHUNK_SIZE:
+                # Partir el trozo en dos para que las copias sigan siendo pequeñas
+                parts = (chunk[:CHUNK_SIZE], chunk[CHUNK_SIZE:])
+            else:
+                parts = (chunk,)
+            self._publish(
+                chunks[:i] + parts + chunks[i + 1:],
+                maxes[:i] + tuple(part[-1] for part in parts) + maxes[i + 1:],
+                total + 1
+            )
+        self._key_of[alarm_id] = key
+
+    def remove(self, alarm_id):
+        """Quita una alarma del índice si estaba indexada"""
+        key = self._key_of.pop(alarm_id, None)
+        if key is None:
+            return
+        chunks, maxes, total = self._state
+        i = bisect_left(maxes, key)
+        if i == len(chunks):
+            return
+        chunk = chunks[i]
+        pos = bisect_left(chunk, key)
+        if pos == len(chunk) or chunk[pos] != key:
+            return
+        chunk = chunk[:pos] + chunk[pos + 1:]
+        if chunk:
+            self._publish(chunks[:i] + (chunk,) + chunks[i + 1:],
+                          maxes[:i] + (chunk[-1],) + maxes[i + 1:], total - 1)
+        else:
+            self._publish(chunks[:i] + chunks[i + 1:], maxes[:i] + maxes[i + 1:], total - 1)
+
+    def clear(self):
+        self._state = _EMPTY
+        self._key_of = {}
+
+    def rebuild(self, alarms):
+        """
+        Reconstruye el índice completo ordenando una sola vez: O(n log n).
+        Evita el coste de insertar clave a clave en cargas masivas.
+        """
+        key_of = {}
+        for alarm in alarms:
+            minute = parse_minute_of_day(alarm.get('time'))
+            if minute is not None and alarm.get('active', True):
+                key_of[alarm.get('id')] = (minute, alarm.get('id'))
+        keys = sorted(key_of.values())
+        chunks = [tuple(keys[i:i + CHUNK_SIZE]) for i in range(0, len(keys), CHUNK_SIZE)]
+        self._key_of = key_of
+        self._publish(chunks, [chunk[-1] for chunk in chunks], len(keys))
+
+    def upcoming(self, minute, limit):
+        """
+        Retorna hasta 'limit' IDs de alarmas que suenan después de 'minute'.
+        Las alarmas del mismo minuto quedan al final (sonarán mañana).
+        """
+        state = self._state
+        total = state[2]
+        if total == 0 or limit <= 0:
+            return []
+        # Desde el minuto siguiente hasta el final y luego desde el principio
+        keys = chain(_iter_from(state, ((minute + 1) % MINUTES_PER_DAY,)), _iter_all(state))
+        return [key[1] for key in islice(keys, min(limit, total))]
+
+    def between(self, start, end):
+        """
+        Retorna los IDs con minuto entre 'start' y 'end' (inclusive), en orden.
+        Si start > end el rango cruza la medianoche (p. ej. 22:00-02:00).
+        """
+        state = self._state
+        stop = (end + 1,)
+        before_stop = lambda key: key < stop
+        if start <= end:
+            return [key[1] for key in takewhile(before_stop, _iter_from(state, (start,)))]
+        # Cruza la medianoche: de 'start' al final y del principio hasta 'end'
+        return [key[1] for key in chain(_iter_from(state, (start,)),
+                                        takewhile(before_stop, _iter_all(state)))]
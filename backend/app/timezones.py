@@ -0,0 +1,203 @@
+"""
+Motor de zonas horarias sin red basado en zoneinfo (base de datos IANA).
+
+Calcula la hora local de una ciudad a partir del reloj del sistema, con el
+horario de verano correcto según las reglas de cada zona. Lo usan el reloj
+mundial y el reloj ambiental; consultar la hora cuesta microsegundos en vez
+de una petición HTTP. En sistemas sin base de datos de zonas (Windows) la
+aporta el paquete tzdata de requirements.txt; si tampoco está, todas las
+ciudades se tratan como desconocidas y se usa UTC.
+
+Para cada zona se precalcula una tabla de transiciones (instante UTC en el
+que cambia el desplazamiento) que cubre un año antes y después del momento
+actual; obtener el desplazamiento es una búsqueda binaria sobre esa tabla y
+la hora se formatea con aritmética entera, sin datetime.astimezone ni strftime.
+"""
+
+import datetime
+import time
+from bisect import bisect_right
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from .zone_catalog import get_catalog
+
+# Ciudades conocidas con sus zonas horarias
+CITY_TIMEZONES = {
+    'Madrid': 'Europe/Madrid',
+    'Buenos Aires': 'America/Argentina/Buenos_Aires',
+    'New York': 'America/New_York',
+    'Tokyo': 'Asia/Tokyo',
+    'London': 'Europe/London',
+    'Paris': 'Europe/Paris',
+    'Los Angeles': 'America/Los_Angeles',
+    'Sydney': 'Australia/Sydney',
+    'Mexico City': 'America/Mexico_City',
+    'Cairo': 'Africa/Cairo'
+}
+
+_CITY_TIMEZONES_LOWER = {city.lower(): name for city, name in CITY_TIMEZONES.items()}
+
+DEFAULT_TIMEZONE = 'UTC'
+
+
+@lru_cache(maxsize=None)
+def get_zone(name):
+    """Retorna el ZoneInfo de una zona (cacheado); None si no existe"""
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def resolve_timezone(city):
+    """
+    Traduce una ciudad a su zona IANA.
+    Acepta nombres de ciudad o alias del catálogo (sin distinguir mayúsculas
+    ni tildes) o directamente una zona IANA ('Europe/Berlin').
+    Retorna None si no la conoce.
+    """
+    if not city:
+        return None
+    # Resto de ciudades, alias y zonas: catálogo IANA compartido (carga perezosa)
+    name = _CITY_TIMEZONES_LOWER.get(city.strip().lower()) or get_catalog().resolve(city)
+    # Sin base de datos de zonas (ni del sistema ni tzdata) no se conoce ninguna
+    if name and get_zone(name) is not None:
+        return name
+    return None
+
+
+def format_offset_seconds(seconds):
+    """Formatea un desplazamiento en segundos como ±HH:MM"""
+    sign = '+' if seconds >= 0 else '-'
+    hours, minutes = divmod(abs(seconds) // 60, 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
+def format_utc_offset(offset):
+    """Formatea un desplazamiento UTC (timedelta) como ±HH:MM"""
+    if offset is None:
+        return '+00:00'
+    return format_offset_seconds(int(offset.total_seconds()))
+
+
+TABLE_SPAN = 366 * 86400  # Segundos cubiertos antes y después del instante pedido
+_SCAN_STEP = 6 * 3600  # Paso del barrido que detecta transiciones
+
+
+class ZoneOffsets:
+    """
+    Tabla de transiciones de una zona en [start, end): listas paralelas de
+    instantes de inicio, desplazamiento en segundos y si es horario de verano.
+    """
+
+    def __init__(self, name, start, end):
+        # Zona desconocida o sin base de datos de zonas: UTC fijo
+        zone = get_zone(name) or datetime.timezone.utc
+        self.name = name
+        self.start = start
+        self.end = end
+
+        def info(instant):
+            local = datetime.datetime.fromtimestamp(instant, zone)
+            return int(local.utcoffset().total_seconds()), bool(local.dst())
+
+        current = info(start)
+        self._starts = [start]
+        self._offsets = [current[0]]
+        self._dst = [current[1]]
+        instant = start
+        while instant < end:
+            following = min(instant + _SCAN_STEP, end)
+            state = info(following)
+            if state != current:
+                # Buscar el segundo exacto del cambio dentro del paso
+                lo, hi = instant, following
+                while hi - lo > 1:
+                    mid = (lo + hi) // 2
+                    if info(mid) == current:
+                        lo = mid
+                    else:
+                        hi = mid
+                self._starts.append(hi)
+                self._offsets.append(state[0])
+                self._dst.append(state[1])
+                current = state
+            instant = following
+
+    def covers(self, instant):
+        return self.start <= instant < self.end
+
+    def lookup(self, instant):
+        """Retorna (desplazamiento_en_segundos, es_horario_de_verano)"""
+        i = bisect_right(self._starts, instant) - 1
+        return self._offsets[i], self._dst[i]
+
+    def transitions(self):
+        """Lista de (instante_utc, desplazamiento, dst) de la tabla"""
+        return list(zip(self._starts, self._offsets, self._dst))
+
+
+_tables = {}
+
+
+def get_offset_table(name, instant):
+    """Tabla de transiciones de la zona que cubre 'instant' (se rehace al salir)"""
+    table = _tables.get(name)
+    if table is None or not table.covers(instant):
+        table = _tables[name] = ZoneOffsets(name, int(instant) - TABLE_SPAN, int(instant) + TABLE_SPAN)
+    return table
+
+
+def zone_offset(name, instant):
+    """Desplazamiento (segundos, dst) de una zona en un instante UTC (epoch)"""
+    return get_offset_table(name, instant).lookup(instant)
+
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=4096)
+def _format_date(days, date_format):
+    return datetime.date.fromordinal(_EPOCH_ORDINAL + days).strftime(date_format)
+
+
+def format_local(instant, offset, date_format='%Y-%m-%d'):
+    """Retorna (HH:MM:SS, fecha) de un instante UTC entero más un desplazamiento"""
+    days, seconds = divmod(int(instant) + offset, 86400)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}", _format_date(days, date_format)
+
+
+def local_time(city, now=None, date_format='%Y-%m-%d'):
+    """
+    Hora local de una ciudad calculada sin red.
+
+    'now' es un instante UTC opcional (datetime con tzinfo o epoch en
+    segundos) para calcular varias ciudades sobre el mismo instante. Las
+    ciudades desconocidas usan UTC y se marcan con 'success': False.
+    """
+    timezone_name = resolve_timezone(city)
+    known = timezone_name is not None
+    if not known:
+        timezone_name = DEFAULT_TIMEZONE
+    if now is None:
+        instant = time.time()
+    elif isinstance(now, datetime.datetime):
+        instant = now.timestamp()
+    else:
+        instant = now
+    instant = int(instant)
+    offset, is_dst = zone_offset(timezone_name, instant)
+    time_str, date_str = format_local(instant, offset, date_format)
+    return {
+        'city': city,
+        'time': time_str,
+        'date': date_str,
+        'timezone': timezone_name,
+        'utc_offset': format_offset_seconds(offset),
+        'is_dst': is_dst,
+        'success': known,
+        'source': 'zoneinfo'
+    }
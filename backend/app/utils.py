@@ -1,28 +1,39 @@
 import datetime
-import time
 import random
-import requests
+from .http_client import http_get
 from typing import Dict, Any, Optional
-import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .cache import TTLCache
+from .config import Config
+from .timezones import DEFAULT_TIMEZONE, local_time, resolve_timezone
 
-# Cache para evitar demasiadas llamadas a las APIs
-_weather_cache = {}
-_time_cache = {}
+# Cache para evitar demasiadas llamadas a las APIs.
+# Acotados (LRU) porque /api/envclock/<city> acepta cualquier texto, y con
+# coalescencia: N peticiones simultáneas de una ciudad hacen una sola consulta.
 _cache_duration = 300  # 5 minutos
+_time_cache_duration = 30  # Cache más corto para la hora (solo verificación)
+# El clima usa stale-while-revalidate: al vencer se sirve el valor anterior
+# (hasta ENV_WEATHER_MAX_STALE segundos) y se refresca en segundo plano.
+_refresh_pool = ThreadPoolExecutor(max_workers=Config.ENV_REFRESH_WORKERS, thread_name_prefix='env-refresh')
+_weather_cache = TTLCache(
+    maxsize=Config.ENV_CACHE_SIZE,
+    ttl=_cache_duration,
+    name='weather',
+    max_stale=Config.ENV_WEATHER_MAX_STALE,
+    executor=_refresh_pool
+)
+_time_cache = TTLCache(maxsize=Config.ENV_CACHE_SIZE, ttl=_time_cache_duration, name='time')
+# Pool compartido para consultar proveedores de clima en paralelo
+_provider_pool = ThreadPoolExecutor(max_workers=Config.WEATHER_PROVIDER_WORKERS, thread_name_prefix='weather-provider')
+# Pool para las consultas de hora y clima de /api/envclock/batch
+_batch_pool = ThreadPoolExecutor(max_workers=Config.ENV_BATCH_WORKERS, thread_name_prefix='env-batch')
 
-def is_cache_valid(cache_entry: dict) -> bool:
-    """Verifica si una entrada del cache sigue siendo válida"""
-    if not cache_entry:
-        return False
-    return time.time() - cache_entry.get('timestamp', 0) < _cache_duration
-
-def cache_result(cache_dict: dict, key: str, data: dict) -> dict:
-    """Guarda un resultado en el cache con timestamp"""
-    cache_dict[key] = {
-        **data,
-        'timestamp': time.time()
+def get_cache_stats() -> Dict[str, Any]:
+    """Estadísticas de los caches de clima y hora"""
+    return {
+        'weather': _weather_cache.stats(),
+        'time': _time_cache.stats()
     }
-    return data
 
 def get_current_time():
     return datetime.datetime.now().strftime('%H:%M:%S')
@@ -31,84 +42,12 @@ def get_world_time(offset):
     now = datetime.datetime.utcnow() + datetime.timedelta(hours=offset)
     return now.strftime('%H:%M:%S')
 
-def get_real_world_time(city: str) -> Dict[str, Any]:
-    """
-    Obtiene la hora real usando timeapi.io (más confiable que worldtimeapi)
-    """
-    try:
-        # Mapeo de ciudades a zonas horarias
-        timezone_map = {
-            'Madrid': 'Europe/Madrid',
-            'Buenos Aires': 'America/Argentina/Buenos_Aires', 
-            'New York': 'America/New_York',
-            'Tokyo': 'Asia/Tokyo',
-            'London': 'Europe/London',
-            'Paris': 'Europe/Paris',
-            'Los Angeles': 'America/Los_Angeles',
-            'Sydney': 'Australia/Sydney',
-            'Mexico City': 'America/Mexico_City',
-            'Cairo': 'Africa/Cairo'
-        }
-        
-        timezone = timezone_map.get(city, 'UTC')
-        
-        # Usar timeapi.io que es más rápido y confiable
-        url = f'http://timeapi.io/api/Time/current/zone?timeZone={timezone}'
-        response = requests.get(url, timeout=3)
-        
-        if response.status_code == 200:
-            data = response.json()
-            # timeapi.io devuelve formato diferente
-            time_str = data.get('time', '00:00:00')
-            date_str = data.get('date', '2025-01-01')
-            
-            return {
-                'city': city,
-                'time': time_str,
-                'date': date_str,
-                'timezone': timezone,
-                'utc_offset': data.get('utcOffset', '+00:00'),
-                'success': True
-            }
-        else:
-            # Fallback a cálculo manual más preciso
-            return get_fallback_world_time(city)
-            
-    except Exception as e:
-        print(f"Error obteniendo hora de {city}: {e}")
-        return get_fallback_world_time(city)
-
 def get_fallback_world_time(city: str) -> Dict[str, Any]:
-    """Fallback con cálculo preciso de zonas horarias"""
-    # Offsets más precisos considerando horario de invierno/verano
-    current_month = datetime.datetime.now().month
-    is_summer = 4 <= current_month <= 10  # Aproximación del horario de verano
-    
-    offsets = {
-        'Madrid': 2 if is_summer else 1,
-        'Buenos Aires': -3,
-        'New York': -4 if is_summer else -5,
-        'Tokyo': 9,
-        'London': 1 if is_summer else 0,
-        'Paris': 2 if is_summer else 1,
-        'Los Angeles': -7 if is_summer else -8,
-        'Sydney': 11 if is_summer else 10,
-        'Mexico City': -5,
-        'Cairo': 2
-    }
-    
-    offset = offsets.get(city, 0)
-    now = datetime.datetime.utcnow() + datetime.timedelta(hours=offset)
-    
-    return {
-        'city': city,
-        'time': now.strftime('%H:%M:%S'),
-        'date': now.strftime('%Y-%m-%d'),
-        'timezone': f'UTC{offset:+d}',
-        'utc_offset': f'{offset:+03d}:00',
-        'success': False,
-        'fallback': True
-    }
+    """Fallback sin red: hora calculada con zoneinfo (horario de verano real)"""
+    result = local_time(city)
+    result['success'] = False
+    result['fallback'] = True
+    return result
 
 def get_weather_from_openweather(city: str) -> Dict[str, Any]:
     """
@@ -134,16 +73,16 @@ def get_weather_from_openweather(city: str) -> Dict[str, Any]:
         # Usar API de archivo de Open-Meteo para datos consistentes
         # La API de pronóstico puede no tener datos para la fecha actual en el pasado
         today = datetime.datetime.now().strftime('%Y-%m-%d')
-        url = f"https://archive-api.open-meteo.com/v1/archive?latitude={lat}&longitude={lon}&start_date={today}&end_date={today}&hourly=temperature_2m,weather_code"
+        url = f"{Config.OPEN_METEO_URL}?latitude={lat}&longitude={lon}&start_date={today}&end_date={today}&hourly=temperature_2m,weather_code"
         
-        response = requests.get(url, timeout=5)
+        response = http_get(url, timeout=5)
         
         if response.status_code == 200:
             data = response.json()
             hourly = data.get('hourly', {})
             
             if not hourly.get('temperature_2m') or not hourly.get('weather_code'):
-                 return get_weather_from_weatherapi(city)
+                 return get_fallback_weather_data(city)
 
             temp = hourly['temperature_2m'][0]
             weather_code = hourly['weather_code'][0]
@@ -173,11 +112,11 @@ def get_weather_from_openweather(city: str) -> Dict[str, Any]:
                 'success': True
             }
         else:
-            return get_weather_from_weatherapi(city)
+            return get_fallback_weather_data(city)
             
     except Exception as e:
         print(f"Error con Open-Meteo para {city}: {e}")
-        return get_weather_from_weatherapi(city)
+        return get_fallback_weather_data(city)
 
 def get_weather_from_weatherapi(city: str) -> Dict[str, Any]:
     """
@@ -185,14 +124,14 @@ def get_weather_from_weatherapi(city: str) -> Dict[str, Any]:
     """
     try:
         # WeatherAPI.com ofrece datos gratuitos limitados
-        url = f'http://api.weatherapi.com/v1/current.json'
+        url = Config.WEATHERAPI_URL
         params = {
             'key': 'demo',  # Clave demo que funciona para pruebas
             'q': city,
             'lang': 'es'
         }
         
-        response = requests.get(url, params=params, timeout=4)
+        response = http_get(url, params=params, timeout=4)
         
         if response.status_code == 200:
             data = response.json()
@@ -245,12 +184,12 @@ def get_weather_from_google(city: str) -> Dict[str, Any]:
         import re
         
         # Google Weather en español
-        url = f'https://www.google.com/search?q=clima+{city}&hl=es'
+        url = f'{Config.GOOGLE_SEARCH_URL}?q=clima+{city}&hl=es'
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=5)
+        response = http_get(url, headers=headers, timeout=5)
         
         if response.status_code == 200:
             text = response.text
@@ -303,12 +242,12 @@ def get_time_from_google(city: str) -> Dict[str, Any]:
         import re
         
         # Buscar en Google la hora de la ciudad
-        url = f'https://www.google.com/search?q=hora+en+{city}&hl=es'
+        url = f'{Config.GOOGLE_SEARCH_URL}?q=hora+en+{city}&hl=es'
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=5)
+        response = http_get(url, headers=headers, timeout=5)
         
         if response.status_code == 200:
             text = response.text
@@ -347,74 +286,144 @@ def get_time_from_google(city: str) -> Dict[str, Any]:
         print(f"Error con Google Time para {city}: {e}")
         return get_fallback_world_time(city)
 
+# Proveedores de clima por nombre; el orden lo define Config.WEATHER_PROVIDERS
+WEATHER_PROVIDERS = {
+    'openweather': get_weather_from_openweather,
+    'weatherapi': get_weather_from_weatherapi,
+    'google': get_weather_from_google
+}
+
 def get_weather_data(city: str) -> Dict[str, Any]:
     """
     Función principal que intenta múltiples fuentes para el clima
     """
-    # Verificar cache primero
-    cache_key = f"weather_{city.lower()}"
-    if cache_key in _weather_cache and is_cache_valid(_weather_cache[cache_key]):
-        print(f"📦 Clima de {city} obtenido del cache")
-        return _weather_cache[cache_key]
-    
+    return _weather_cache.get_or_load(city.lower(), lambda: fetch_weather_data(city))
+
+def fetch_weather_data(city: str) -> Dict[str, Any]:
+    """
+    Consulta los proveedores de clima sin pasar por el cache.
+    Según WEATHER_PROVIDER_MODE: 'sequential' (uno tras otro), 'race' (todos a
+    la vez) o 'hedge' (lanza el siguiente si el anterior tarda más de
+    WEATHER_HEDGE_DELAY segundos). Gana la primera respuesta válida.
+    """
     print(f"🌤️ Obteniendo clima para {city}...")
-    
-    # 1. Intentar OpenWeatherMap
-    result = get_weather_from_openweather(city)
-    if result.get('success'):
-        print(f"✅ Clima obtenido de OpenWeatherMap")
-        return cache_result(_weather_cache, cache_key, result)
-    
-    # 2. Intentar WeatherAPI
-    result = get_weather_from_weatherapi(city)
-    if result.get('success'):
-        print(f"✅ Clima obtenido de WeatherAPI")
-        return cache_result(_weather_cache, cache_key, result)
-    
-    # 3. Intentar Google Weather (scraping)
-    result = get_weather_from_google(city)
-    if result.get('success'):
-        print(f"✅ Clima obtenido de Google")
-        return cache_result(_weather_cache, cache_key, result)
-    
-    # 4. Usar datos simulados como último recurso
+    providers = [name for name in Config.WEATHER_PROVIDERS if name in WEATHER_PROVIDERS]
+    mode = Config.WEATHER_PROVIDER_MODE
+
+    if mode == 'sequential':
+        for name in providers:
+            result = _call_weather_provider(name, city)
+            if result.get('success'):
+                print(f"✅ Clima obtenido de {name}")
+                return result
+    else:
+        hedge_delay = 0 if mode == 'race' else Config.WEATHER_HEDGE_DELAY
+        result = _race_weather_providers(city, providers, hedge_delay, Config.WEATHER_RACE_CONCURRENCY)
+        if result is not None:
+            return result
+
+    # Usar datos simulados como último recurso
     print(f"⚠️ Usando datos simulados para {city}")
-    result = get_fallback_weather_data(city)
-    return cache_result(_weather_cache, cache_key, result)
+    return get_fallback_weather_data(city)
+
+def _call_weather_provider(name: str, city: str) -> Dict[str, Any]:
+    """Llama a un proveedor tratando cualquier excepción como fallo"""
+    try:
+        return WEATHER_PROVIDERS[name](city)
+    except Exception as e:
+        print(f"Error con {name} para {city}: {e}")
+        return {'success': False}
+
+def _race_weather_providers(city: str, providers, hedge_delay: float, concurrency: int) -> Optional[Dict[str, Any]]:
+    """
+    Ejecuta los proveedores en paralelo y retorna la primera respuesta exitosa.
+
+    Con hedge_delay <= 0 se lanzan hasta 'concurrency' proveedores de golpe.
+    Si no, se empieza por el primero y se añade otro cada vez que pasan
+    hedge_delay segundos sin respuesta o cuando uno falla. Las peticiones que
+    pierden la carrera se cancelan si aún no empezaron y se ignoran si ya corren.
+    Retorna None si todos fallan.
+    """
+    queue = list(providers)
+    concurrency = max(1, concurrency)
+    limit = concurrency if hedge_delay <= 0 else 1
+    running = {}
+
+    def launch():
+        while queue and len(running) < limit:
+            name = queue.pop(0)
+            running[_provider_pool.submit(_call_weather_provider, name, city)] = name
+
+    launch()
+    try:
+        while running:
+            done, _ = wait(running, timeout=hedge_delay if hedge_delay > 0 and queue else None,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                # Nadie respondió a tiempo: cubrir con el siguiente proveedor
+                limit = min(limit + 1, concurrency)
+            for future in done:
+                name = running.pop(future)
+                result = future.result()
+                if result.get('success'):
+                    print(f"✅ Clima obtenido de {name}")
+                    return result
+            launch()
+        return None
+    finally:
+        for future in running:
+            future.cancel()
 
 def get_real_world_time(city: str) -> Dict[str, Any]:
     """
-    Función principal que intenta múltiples fuentes para la hora
+    Hora local de una ciudad calculada sin red con zoneinfo.
+    Con ENV_TIME_VERIFY activo se contrasta además con los proveedores de red
+    (cacheados) y se añade el desfase observado en 'verification'.
     """
-    # Verificar cache primero (cache más corto para tiempo: 30 segundos)
-    cache_key = f"time_{city.lower()}"
-    if cache_key in _time_cache:
-        cache_entry = _time_cache[cache_key]
-        # Cache más corto para tiempo: 30 segundos
-        if time.time() - cache_entry.get('timestamp', 0) < 30:
-            print(f"� Hora de {city} obtenida del cache")
-            return cache_entry
-    
-    print(f"�🕐 Obteniendo hora para {city}...")
+    time_data = local_time(city)
+    if Config.ENV_TIME_VERIFY:
+        reference = _time_cache.get_or_load(city.lower(), lambda: fetch_world_time(city))
+        time_data['verification'] = verify_world_time(city, reference)
+    return time_data
+
+def _seconds_of_day(time_str: str) -> int:
+    hours, minutes, seconds = (int(part) for part in time_str.split(':')[:3])
+    return hours * 3600 + minutes * 60 + seconds
+
+def verify_world_time(city: str, reference: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compara la hora de un proveedor de red con la calculada offline para el
+    mismo instante en que se consultó el proveedor.
+    """
+    fetched_at = reference.get('fetched_at')
+    if not reference.get('success') or fetched_at is None:
+        return {'source': reference.get('source'), 'verified': None}
+    expected = local_time(city, now=fetched_at)
+    try:
+        drift = _seconds_of_day(reference['time']) - _seconds_of_day(expected['time'])
+    except (KeyError, ValueError):
+        return {'source': reference.get('source'), 'verified': None}
+    # Llevar el desfase a [-12h, 12h] por si el cambio de día cae en medio
+    drift = (drift + 43200) % 86400 - 43200
+    return {
+        'source': reference.get('source'),
+        'drift_seconds': drift,
+        'verified': abs(drift) <= Config.ENV_TIME_VERIFY_TOLERANCE
+    }
+
+def fetch_world_time(city: str) -> Dict[str, Any]:
+    """
+    Consulta los proveedores de hora de red en orden, sin pasar por el cache.
+    Solo se usa para verificar el motor offline (ENV_TIME_VERIFY).
+    """
+    print(f"🕐 Obteniendo hora para {city}...")
+    fetched_at = datetime.datetime.now(datetime.timezone.utc)
     
     # 1. Intentar timeapi.io
     try:
-        timezone_map = {
-            'Madrid': 'Europe/Madrid',
-            'Buenos Aires': 'America/Argentina/Buenos_Aires', 
-            'New York': 'America/New_York',
-            'Tokyo': 'Asia/Tokyo',
-            'London': 'Europe/London',
-            'Paris': 'Europe/Paris',
-            'Los Angeles': 'America/Los_Angeles',
-            'Sydney': 'Australia/Sydney',
-            'Mexico City': 'America/Mexico_City',
-            'Cairo': 'Africa/Cairo'
-        }
-        
-        timezone = timezone_map.get(city, 'UTC')
-        url = f'http://timeapi.io/api/Time/current/zone?timeZone={timezone}'
-        response = requests.get(url, timeout=3)
+        timezone = resolve_timezone(city) or DEFAULT_TIMEZONE
+        url = f'{Config.TIMEAPI_URL}?timeZone={timezone}'
+        response = http_get(url, timeout=3)
         
         if response.status_code == 200:
             data = response.json()
@@ -431,22 +440,24 @@ def get_real_world_time(city: str) -> Dict[str, Any]:
                 'date': date_str,
                 'timezone': timezone,
                 'utc_offset': data.get('utcOffset', '+00:00'),
-                'success': True
+                'success': True,
+                'source': 'timeapi',
+                'fetched_at': fetched_at
             }
-            return cache_result(_time_cache, cache_key, result)
+            return result
     except Exception as e:
         print(f"❌ Error con TimeAPI: {e}")
     
     # 2. Intentar Google (scraping)
     result = get_time_from_google(city)
-    if result.get('success'):
+    if result and result.get('success'):
         print(f"✅ Hora obtenida de Google")
-        return cache_result(_time_cache, cache_key, result)
+        result['source'] = 'google'
+        result['fetched_at'] = fetched_at
+        return result
     
-    # 3. Usar cálculo manual como último recurso
-    print(f"⚠️ Usando cálculo manual para {city}")
-    result = get_fallback_world_time(city)
-    return cache_result(_time_cache, cache_key, result)
+    print(f"⚠️ Ningún proveedor de hora respondió para {city}")
+    return {'success': False, 'source': None}
 
 def get_fallback_weather_data(city: str) -> Dict[str, Any]:
     """Datos de clima simulados cuando la API no está disponible"""
@@ -454,7 +465,8 @@ def get_fallback_weather_data(city: str) -> Dict[str, Any]:
     # Usar seed basada en la ciudad para consistencia
     import hashlib
     seed = int(hashlib.md5(city.encode()).hexdigest()[:8], 16) % 1000
-    random.seed(seed + datetime.datetime.now().hour)  # Cambiar cada hora
+    # Generador propio: no altera el estado global de random
+    rng = random.Random(seed + datetime.datetime.now().hour)  # Cambiar cada hora
     
     # Datos más realistas por ciudad y época del año
     weather_profiles = {
@@ -487,8 +499,8 @@ def get_fallback_weather_data(city: str) -> Dict[str, Any]:
     ]
     
     profile = weather_profiles.get(city, default_profile)
-    weather = random.choice(profile)
-    temp = random.randint(weather['temp_range'][0], weather['temp_range'][1])
+    weather = rng.choice(profile)
+    temp = rng.randint(weather['temp_range'][0], weather['temp_range'][1])
     
     return {
         'city': city,
@@ -496,23 +508,54 @@ def get_fallback_weather_data(city: str) -> Dict[str, Any]:
         'weather_emoji': weather['emoji'],
         'description': f'Clima {weather["type"]} (simulado)',
         'temperature': f"{temp}°C",
-        'humidity': f"{random.randint(40, 80)}%",
-        'wind_speed': f"{random.randint(5, 25)} km/h",
+        'humidity': f"{rng.randint(40, 80)}%",
+        'wind_speed': f"{rng.randint(5, 25)} km/h",
         'success': False,
         'fallback': True
     }
 
 def get_env_data(city: str = None) -> Dict[str, Any]:
     """
-    Obtiene datos ambientales completos para una ubicación
+    Obtiene datos ambientales completos para una ubicación.
+    Una ciudad vacía, solo con espacios o que no es texto usa la de por defecto.
     """
-    if not city:
+    if not isinstance(city, str) or not city.strip():
         city = 'Madrid'  # Ciudad por defecto
-    
-    # Obtener datos de hora y clima
-    time_data = get_real_world_time(city)
-    weather_data = get_weather_data(city)
-    
+    return get_env_data_batch([city])[0]
+
+def normalize_cities(cities) -> list:
+    """
+    Limpia una lista de ciudades: descarta vacías y duplicadas (sin
+    distinguir mayúsculas), conservando el orden y la primera grafía.
+    """
+    unique = {}
+    for city in cities:
+        if not isinstance(city, str):
+            continue
+        city = city.strip()
+        if city and city.lower() not in unique:
+            unique[city.lower()] = city
+    return list(unique.values())
+
+def get_env_data_batch(cities) -> list:
+    """
+    Obtiene los datos ambientales de varias ciudades a la vez.
+    Las consultas de hora y clima de todas las ciudades se lanzan juntas en
+    un pool acotado; las que están en cache resuelven al instante y las
+    repetidas se coalescen, así que el coste total es el de la más lenta.
+    """
+    cities = normalize_cities(cities)
+    lookups = [
+        (_batch_pool.submit(get_real_world_time, city), _batch_pool.submit(get_weather_data, city))
+        for city in cities
+    ]
+    return [
+        build_env_data(city, time_future.result(), weather_future.result())
+        for city, (time_future, weather_future) in zip(cities, lookups)
+    ]
+
+def build_env_data(city: str, time_data: Dict[str, Any], weather_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Combina hora y clima en la respuesta del reloj ambiental"""
     # Determinar si es día o noche basado en la hora local
     try:
         hour = int(time_data['time'].split(':')[0])
@@ -521,7 +564,7 @@ def get_env_data(city: str = None) -> Dict[str, Any]:
         hour = datetime.datetime.now().hour
         is_day = 6 <= hour < 18
     
-    return {
+    env_data = {
         'city': city,
         'time': time_data['time'],
         'date': time_data['date'],
@@ -536,3 +579,6 @@ def get_env_data(city: str = None) -> Dict[str, Any]:
         'time_success': time_data['success'],
         'weather_success': weather_data['success']
     }
+    if 'verification' in time_data:
+        env_data['time_verification'] = time_data['verification']
+    return env_data
@@ -0,0 +1,249 @@
+"""
+Catálogo de zonas horarias IANA con alias de ciudades y búsqueda por prefijo.
+
+Se carga de forma perezosa la primera vez que se usa y lo comparten el reloj
+mundial (búsqueda y consulta por ciudad) y el reloj ambiental (resolución de
+ciudad a zona). Cada zona aporta una ciudad derivada de su nombre
+('America/Argentina/Buenos_Aires' -> 'Buenos Aires') y la tabla CITY_ALIASES
+añade nombres en español y ciudades que no son capital de zona.
+
+El índice es una lista ordenada de claves normalizadas (sin tildes, en
+minúsculas): el nombre completo, cada palabra a partir de la segunda y el
+identificador de la zona. Una búsqueda por prefijo es un bisect más el
+recorrido de las claves que empiezan por el texto buscado.
+"""
+
+import threading
+import unicodedata
+import zoneinfo
+from bisect import bisect_left
+
+# Ciudades que no coinciden con el nombre de su zona IANA (o con otro idioma)
+CITY_ALIASES = {
+    'Madrid': 'Europe/Madrid',
+    'Barcelona': 'Europe/Madrid',
+    'Sevilla': 'Europe/Madrid',
+    'Valencia': 'Europe/Madrid',
+    'Bilbao': 'Europe/Madrid',
+    'Buenos Aires': 'America/Argentina/Buenos_Aires',
+    'New York': 'America/New_York',
+    'Nueva York': 'America/New_York',
+    'Boston': 'America/New_York',
+    'Washington': 'America/New_York',
+    'Miami': 'America/New_York',
+    'Atlanta': 'America/New_York',
+    'Chicago': 'America/Chicago',
+    'Houston': 'America/Chicago',
+    'Dallas': 'America/Chicago',
+    'Denver': 'America/Denver',
+    'Phoenix': 'America/Phoenix',
+    'Los Angeles': 'America/Los_Angeles',
+    'Los Ángeles': 'America/Los_Angeles',
+    'San Francisco': 'America/Los_Angeles',
+    'Seattle': 'America/Los_Angeles',
+    'Las Vegas': 'America/Los_Angeles',
+    'Montreal': 'America/Toronto',
+    'Ottawa': 'America/Toronto',
+    'Mexico City': 'America/Mexico_City',
+    'Ciudad de México': 'America/Mexico_City',
+    'Guadalajara': 'America/Mexico_City',
+    'Monterrey': 'America/Monterrey',
+    'Bogotá': 'America/Bogota',
+    'Medellín': 'America/Bogota',
+    'Cali': 'America/Bogota',
+    'Quito': 'America/Guayaquil',
+    'Santiago de Chile': 'America/Santiago',
+    'Río de Janeiro': 'America/Sao_Paulo',
+    'Rio de Janeiro': 'America/Sao_Paulo',
+    'São Paulo': 'America/Sao_Paulo',
+    'Brasilia': 'America/Sao_Paulo',
+    'Córdoba': 'America/Argentina/Cordoba',
+    'Asunción': 'America/Asuncion',
+    'La Habana': 'America/Havana',
+    'Ciudad de Panamá': 'America/Panama',
+    'San José': 'America/Costa_Rica',
+    'London': 'Europe/London',
+    'Londres': 'Europe/London',
+    'Manchester': 'Europe/London',
+    'Edinburgh': 'Europe/London',
+    'Paris': 'Europe/Paris',
+    'París': 'Europe/Paris',
+    'Berlín': 'Europe/Berlin',
+    'Munich': 'Europe/Berlin',
+    'Múnich': 'Europe/Berlin',
+    'Frankfurt': 'Europe/Berlin',
+    'Hamburg': 'Europe/Berlin',
+    'Roma': 'Europe/Rome',
+    'Milan': 'Europe/Rome',
+    'Milán': 'Europe/Rome',
+    'Florencia': 'Europe/Rome',
+    'Lisboa': 'Europe/Lisbon',
+    'Oporto': 'Europe/Lisbon',
+    'Ámsterdam': 'Europe/Amsterdam',
+    'Bruselas': 'Europe/Brussels',
+    'Ginebra': 'Europe/Zurich',
+    'Viena': 'Europe/Vienna',
+    'Praga': 'Europe/Prague',
+    'Varsovia': 'Europe/Warsaw',
+    'Atenas': 'Europe/Athens',
+    'Estocolmo': 'Europe/Stockholm',
+    'Copenhague': 'Europe/Copenhagen',
+    'Moscú': 'Europe/Moscow',
+    'Estambul': 'Europe/Istanbul',
+    'Tokyo': 'Asia/Tokyo',
+    'Tokio': 'Asia/Tokyo',
+    'Osaka': 'Asia/Tokyo',
+    'Kioto': 'Asia/Tokyo',
+    'Beijing': 'Asia/Shanghai',
+    'Pekín': 'Asia/Shanghai',
+    'Shenzhen': 'Asia/Shanghai',
+    'Seúl': 'Asia/Seoul',
+    'Singapur': 'Asia/Singapore',
+    'Mumbai': 'Asia/Kolkata',
+    'Bombay': 'Asia/Kolkata',
+    'Delhi': 'Asia/Kolkata',
+    'Nueva Delhi': 'Asia/Kolkata',
+    'Bangalore': 'Asia/Kolkata',
+    'Abu Dhabi': 'Asia/Dubai',
+    'Dubái': 'Asia/Dubai',
+    'Teherán': 'Asia/Tehran',
+    'Jerusalén': 'Asia/Jerusalem',
+    'Bangkok': 'Asia/Bangkok',
+    'Hanói': 'Asia/Bangkok',
+    'Yakarta': 'Asia/Jakarta',
+    'Sydney': 'Australia/Sydney',
+    'Sídney': 'Australia/Sydney',
+    'Canberra': 'Australia/Sydney',
+    'Melbourne': 'Australia/Melbourne',
+    'Auckland': 'Pacific/Auckland',
+    'Wellington': 'Pacific/Auckland',
+    'Honolulu': 'Pacific/Honolulu',
+    'Cairo': 'Africa/Cairo',
+    'El Cairo': 'Africa/Cairo',
+    'Ciudad del Cabo': 'Africa/Johannesburg',
+    'Cape Town': 'Africa/Johannesburg',
+    'Marrakech': 'Africa/Casablanca',
+    'Nairobi': 'Africa/Nairobi'
+}
+
+
+# Regiones IANA cuyas zonas terminan en un nombre de ciudad
+CITY_REGIONS = frozenset([
+    'Africa', 'America', 'Antarctica', 'Asia', 'Atlantic',
+    'Australia', 'Europe', 'Indian', 'Pacific'
+])
+
+
+def normalize(text):
+    """Clave de búsqueda: minúsculas, sin tildes, '_' como espacio"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.replace('_', ' ').lower().split())
+
+
+def city_from_zone(zone):
+    """Nombre de ciudad a partir de una zona IANA ('America/New_York' -> 'New York')"""
+    return zone.rsplit('/', 1)[-1].replace('_', ' ')
+
+
+class ZoneCatalog:
+    """
+    Catálogo inmutable de (nombre, zona) con índice ordenado por prefijo.
+
+    - resolve(name): zona IANA de una ciudad, alias o zona (o None)
+    - search(query, limit): coincidencias por prefijo ordenadas por relevancia
+    """
+
+    def __init__(self, zones, aliases):
+        entries = {}
+        for zone in zones:
+            # Las zonas sin ciudad ('UTC', 'Etc/GMT+3') y los enlaces heredados
+            # ('US/Pacific', 'Mexico/General') se listan con su identificador
+            name = city_from_zone(zone) if zone.split('/', 1)[0] in CITY_REGIONS else zone
+            entries.setdefault((name, zone), None)
+        for name, zone in aliases.items():
+            if zone in zones:
+                entries.setdefault((name, zone), None)
+        self.entries = sorted(entries)  # [(nombre, zona)]
+        self.zones = frozenset(zones)
+        self._name_keys = [normalize(name) for name, _ in self.entries]
+
+        self._resolve = {}
+        keys = []
+        for i, (name, zone) in enumerate(self.entries):
+            key = self._name_keys[i]
+            # Los alias tienen prioridad sobre las ciudades derivadas
+            if name in aliases or key not in self._resolve:
+                self._resolve[key] = zone
+            self._resolve.setdefault(normalize(zone), zone)
+            keys.append((key, i))
+            words = key.split(' ')
+            for w in range(1, len(words)):
+                keys.append((' '.join(words[w:]), i))
+            keys.append((normalize(zone), i))
+        keys.sort()
+        self._keys = [key for key, _ in keys]
+        self._positions = [i for _, i in keys]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def resolve(self, name):
+        """Retorna la zona IANA para una ciudad, alias o zona; None si no existe"""
+        if not name:
+            return None
+        return self._resolve.get(normalize(name))
+
+    def search(self, query, limit=10):
+        """
+        Retorna hasta 'limit' (nombre, zona) cuyo nombre, alguna de sus
+        palabras o su zona empiezan por 'query'. Primero la coincidencia
+        exacta, luego los nombres que empiezan por el texto y al final el resto;
+        a igualdad, los nombres más cortos.
+        """
+        prefix = normalize(query or '')
+        if not prefix or limit <= 0:
+            return []
+        ranked = {}
+        keys = self._keys
+        name_keys = self._name_keys
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            position = self._positions[i]
+            name = self.entries[position][0]
+            name_key = name_keys[position]
+            if name_key == prefix:
+                rank = 0
+            elif name_key.startswith(prefix):
+                rank = 1
+            else:
+                rank = 2
+            if rank < ranked.get(position, (3,))[0]:
+                ranked[position] = (rank, len(name), name)
+            i += 1
+        results = []
+        seen = set()
+        for position, _ in sorted(ranked.items(), key=lambda item: item[1]):
+            # 'Bogota' y 'Bogotá' en la misma zona cuentan como una sola ciudad
+            unique = (name_keys[position], self.entries[position][1])
+            if unique in seen:
+                continue
+            seen.add(unique)
+            results.append(self.entries[position])
+            if len(results) == limit:
+                break
+        return results
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Retorna el catálogo compartido, construyéndolo la primera vez"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ZoneCatalog(zoneinfo.available_timezones(), CITY_ALIASES)
+    return _catalog
@@ -0,0 +1,352 @@
+"""
+Benchmark de las estructuras de alarmas: lista circular frente a lista simple.
+
+Compara, de 10^3 a 10^6 alarmas:
+- circular_list: CircularDoublyLinkedList con dicts (COMPACT_ALARMS=0)
+- circular_list_compact: la misma lista con AlarmRecord (por defecto)
+- plain_list: el almacenamiento original en una lista de Python
+  (reloj-/backend/app/storage.py), que busca, actualiza y borra en O(n)
+
+Fases: insert, to_list, search, update, next, prev y delete. El tiempo
+(ns por operación) es el mejor de --repeat pasadas con el GC apagado y un
+presupuesto de segundos por fase, para que las operaciones O(n) a 10^6 no
+tarden minutos; el pico de memoria sale de otra pasada con tracemalloc.
+Las alarmas se crean dentro de 'insert' en todas las estructuras, así la
+memoria incluye los datos y no solo los nodos.
+
+La lista simple no tiene navegación ni búsqueda: next/prev usan un índice
+circular sobre la lista y search un recorrido lineal, como haría la API.
+
+Uso (desde backend/):
+    python -m benchmarks.alarm_structures [--sizes 1000 10000] [--output FILE]
+    python -m benchmarks.alarm_structures --save-baseline benchmarks/baseline.json
+    python -m benchmarks.alarm_structures --baseline benchmarks/baseline.json
+
+Con --baseline se compara cada fase y se marca como regresión si el tiempo
+o el pico de memoria empeoran más que --threshold (25 % por defecto); el
+proceso termina con código 1 si hay regresiones. En máquinas compartidas
+el ruido entre ejecuciones puede superar el 30 %: conviene subir --repeat
+o --threshold y comparar siempre en la misma máquina.
+"""
+
+import argparse
+import datetime
+import gc
+import importlib.util
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from app.alarm_record import AlarmRecord
+from app.circular_list import CircularDoublyLinkedList
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLAIN_STORAGE = os.path.join(os.path.dirname(BACKEND_DIR), 'reloj-', 'backend', 'app', 'storage.py')
+DEFAULT_OUTPUT = os.path.join(BACKEND_DIR, 'benchmarks', 'results', 'alarm_structures.json')
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+PHASES = ('insert', 'to_list', 'search', 'update', 'next', 'prev', 'delete')
+MIN_TIME_DELTA_NS = 20  # Diferencias menores se consideran ruido
+MIN_MEMORY_DELTA_KB = 64
+
+
+def make_alarm(alarm_id):
+    return {
+        'id': alarm_id,
+        'time': f'{(alarm_id // 60) % 24:02d}:{alarm_id % 60:02d}',
+        'label': f'Alarma {alarm_id}',
+        'active': True
+    }
+
+
+# --- estructuras con una interfaz común ---
+
+class CircularListStore:
+    name = 'circular_list'
+    convert = None
+
+    def __init__(self):
+        self.alarms = CircularDoublyLinkedList()
+
+    def insert(self, alarm):
+        self.alarms.insert_at_end(self.convert(alarm) if self.convert else alarm)
+
+    def search(self, alarm_id):
+        return self.alarms.search_by_id(alarm_id)
+
+    def update(self, alarm_id, data):
+        return self.alarms.update_by_id(alarm_id, data)
+
+    def delete(self, alarm_id):
+        return self.alarms.delete_by_id(alarm_id)
+
+    def to_list(self):
+        return self.alarms.to_list()
+
+    def next(self):
+        return self.alarms.next_item()
+
+    def prev(self):
+        return self.alarms.prev_item()
+
+
+class CompactCircularListStore(CircularListStore):
+    name = 'circular_list_compact'
+    convert = staticmethod(AlarmRecord.from_dict)
+
+
+class PlainListStore:
+    """Adaptador del módulo original (cada instancia carga su propia copia)"""
+    name = 'plain_list'
+
+    def __init__(self):
+        spec = importlib.util.spec_from_file_location(f'plain_storage_{id(self)}', PLAIN_STORAGE)
+        self.module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.module)
+        self.insert = self.module.add_alarm
+        self.update = self.module.update_alarm
+        self.delete = self.module.delete_alarm
+        self.to_list = self.module.get_alarms
+        self.position = -1
+
+    def search(self, alarm_id):
+        for alarm in self.module.alarms:
+            if alarm['id'] == alarm_id:
+                return alarm
+        return None
+
+    def next(self):
+        alarms = self.module.alarms
+        self.position = (self.position + 1) % len(alarms)
+        return alarms[self.position]
+
+    def prev(self):
+        alarms = self.module.alarms
+        self.position = (self.position - 1) % len(alarms)
+        return alarms[self.position]
+
+
+STORES = {store.name: store for store in (CircularListStore, CompactCircularListStore, PlainListStore)}
+
+
+# --- medición ---
+
+def plan(size, ops, nav_steps, seed=42):
+    """Argumentos de cada fase (los mismos para todas las estructuras)"""
+    rng = random.Random(seed)
+    sample = rng.sample(range(1, size + 1), min(ops, size))
+    # Búsquedas y ediciones repiten la muestra hasta 'ops' (los borrados no pueden)
+    lookups = (sample * (ops // len(sample) + 1))[:ops]
+    return {
+        'insert': (lambda store: lambda i: store.insert(make_alarm(i)), [(i,) for i in range(1, size + 1)]),
+        'to_list': (lambda store: store.to_list, [()] * max(1, min(100, 10 ** 6 // size))),
+        'search': (lambda store: store.search, [(i,) for i in lookups]),
+        'update': (lambda store: store.update, [(i, {'label': f'Editada {i}'}) for i in lookups]),
+        'next': (lambda store: store.next, [()] * nav_steps),
+        'prev': (lambda store: store.prev, [()] * nav_steps),
+        'delete': (lambda store: store.delete, [(i,) for i in sample])
+    }
+
+
+def _run_chunk(func, calls):
+    for args in calls:
+        func(*args)
+
+
+def timed_phase(func, calls, budget):
+    """
+    Ejecuta las llamadas en bloques crecientes hasta terminar o agotar el
+    presupuesto. Retorna (operaciones hechas, nanosegundos).
+    """
+    done = 0
+    elapsed = 0
+    chunk = 1
+    while done < len(calls) and elapsed < budget * 1e9:
+        block = calls[done:done + chunk]
+        started = time.perf_counter_ns()
+        _run_chunk(func, block)
+        elapsed += time.perf_counter_ns() - started
+        done += len(block)
+        chunk *= 2
+    return done, elapsed
+
+
+def run_timing(store_cls, size, phases, budget):
+    store = store_cls()
+    results = {}
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for phase in PHASES:
+            get_func, calls = phases[phase]
+            if phase == 'insert':
+                # La estructura tiene que quedar completa para las demás fases
+                done, elapsed = timed_phase(get_func(store), calls, float('inf'))
+            else:
+                done, elapsed = timed_phase(get_func(store), calls, budget)
+            results[phase] = {
+                'ops': done,
+                'ns_per_op': round(elapsed / done, 1),
+                'total_ms': round(elapsed / 1e6, 3),
+                'complete': done == len(calls)
+            }
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return results
+
+
+def run_memory(store_cls, size, phases, mem_ops):
+    """Pico de memoria por fase (KB sobre lo que había al empezarla)"""
+    tracemalloc.start()
+    try:
+        store = store_cls()
+        results = {}
+        for phase in PHASES:
+            get_func, calls = phases[phase]
+            if phase != 'insert':
+                calls = calls[:mem_ops]
+            gc.collect()
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            _run_chunk(get_func(store), calls)
+            current, peak = tracemalloc.get_traced_memory()
+            results[phase] = {'peak_kb': round((peak - start) / 1024, 1)}
+            if phase == 'insert':
+                results[phase]['retained_kb'] = round((current - start) / 1024, 1)
+        del store
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def best_timing(store_cls, size, phases, budget, repeat):
+    """Mejor resultado de 'repeat' pasadas (el mínimo filtra el ruido del sistema)"""
+    best = None
+    for _ in range(repeat):
+        timing = run_timing(store_cls, size, phases, budget)
+        if best is None:
+            best = timing
+            continue
+        for phase, values in timing.items():
+            if values['ns_per_op'] < best[phase]['ns_per_op']:
+                best[phase] = values
+    return best
+
+
+def run(sizes, stores, ops, nav_steps, budget, mem_ops, repeat):
+    results = {}
+    for name in stores:
+        results[name] = {}
+        for size in sizes:
+            phases = plan(size, ops, nav_steps)
+            timing = best_timing(STORES[name], size, phases, budget, repeat)
+            memory = run_memory(STORES[name], size, phases, mem_ops)
+            results[name][str(size)] = {phase: dict(timing[phase], **memory[phase]) for phase in PHASES}
+            print(f'✅ {name} n={size}: ' + ', '.join(
+                f"{phase} {timing[phase]['ns_per_op']:.0f} ns" for phase in PHASES), file=sys.stderr)
+    return results
+
+
+# --- comparación con la línea base ---
+
+def compare(current, baseline, threshold):
+    """
+    Compara tiempo y pico de memoria fase por fase.
+    Retorna una lista de diferencias; las que superan el umbral llevan
+    'regression': True.
+    """
+    diffs = []
+    for name, sizes in current.items():
+        for size, phases in sizes.items():
+            for phase, values in phases.items():
+                base = baseline.get(name, {}).get(size, {}).get(phase)
+                if not base:
+                    continue
+                for metric, min_delta in (('ns_per_op', MIN_TIME_DELTA_NS), ('peak_kb', MIN_MEMORY_DELTA_KB)):
+                    old, new = base.get(metric), values.get(metric)
+                    if not old or new is None:
+                        continue
+                    ratio = new / old
+                    diffs.append({
+                        'structure': name, 'size': int(size), 'phase': phase, 'metric': metric,
+                        'baseline': old, 'current': new, 'ratio': round(ratio, 3),
+                        'regression': ratio > 1 + threshold and new - old > min_delta
+                    })
+    return diffs
+
+
+def print_table(results):
+    header = f"{'estructura':<22}{'n':>9}" + ''.join(f'{phase:>12}' for phase in PHASES)
+    print(header)
+    print('-' * len(header))
+    for name, sizes in results.items():
+        for size, phases in sizes.items():
+            cells = ''.join(f"{phases[phase]['ns_per_op']:>10.0f}ns" for phase in PHASES)
+            print(f'{name:<22}{size:>9}{cells}')
+    print()
+    header = f"{'pico KB':<22}{'n':>9}" + ''.join(f'{phase:>12}' for phase in PHASES)
+    print(header)
+    print('-' * len(header))
+    for name, sizes in results.items():
+        for size, phases in sizes.items():
+            cells = ''.join(f"{phases[phase]['peak_kb']:>12.1f}" for phase in PHASES)
+            print(f'{name:<22}{size:>9}{cells}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--stores', nargs='+', choices=list(STORES), default=list(STORES))
+    parser.add_argument('--ops', type=int, default=20000, help='Búsquedas, ediciones y borrados por fase')
+    parser.add_argument('--nav-steps', type=int, default=100000)
+    parser.add_argument('--budget', type=float, default=1.0, help='Segundos máximos por fase')
+    parser.add_argument('--repeat', type=int, default=3, help='Pasadas de tiempo (se toma la mejor)')
+    parser.add_argument('--mem-ops', type=int, default=100, help='Operaciones por fase en la pasada de memoria')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', help='Resultados previos con los que comparar')
+    parser.add_argument('--save-baseline', help='Guardar también estos resultados como línea base')
+    parser.add_argument('--threshold', type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': args.sizes, 'ops': args.ops, 'nav_steps': args.nav_steps,
+            'budget_s': args.budget, 'repeat': args.repeat
+        },
+        'results': run(args.sizes, args.stores, args.ops, args.nav_steps, args.budget,
+                       args.mem_ops, args.repeat)
+    }
+    print_table(report['results'])
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as handle:
+            baseline = json.load(handle)
+        report['comparison'] = compare(report['results'], baseline['results'], args.threshold)
+        regressions = [diff for diff in report['comparison'] if diff['regression']]
+        print()
+        for diff in regressions:
+            print(f"⚠️ Regresión: {diff['structure']} n={diff['size']} {diff['phase']} "
+                  f"{diff['metric']} {diff['baseline']} → {diff['current']} (x{diff['ratio']})")
+        if not regressions:
+            print(f"✅ Sin regresiones frente a {args.baseline} (umbral {args.threshold:.0%})")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f'💾 Resultados en {path}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
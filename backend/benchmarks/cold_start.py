@@ -0,0 +1,144 @@
+"""
+Mide el arranque en frío de las alarmas persistidas.
+
+Genera (con semilla fija) un directorio de datos por escenario y carga cada
+uno en un proceso nuevo con storage.enable_persistence, como al arrancar el
+servidor:
+
+- snapshot:      N alarmas en el snapshot binario, log vacío
+- log:           las mismas N alarmas solo como operaciones 'add' del log
+- snapshot+tail: el snapshot más una cola de T operaciones mezcladas
+                 (altas, ediciones y borrados)
+
+Reporta por escenario el tiempo de AlarmLog.load (reproducir snapshot y
+log), el total con la reconstrucción de índices, el tamaño en disco y la
+memoria máxima del proceso.
+
+Uso (desde backend/):
+    python -m benchmarks.cold_start [--alarms 1000000] [--tail 50000] [--repeat 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.binary_snapshot import write_snapshot
+from app.persistence import LOG_FILE, SNAPSHOT_FILE, _dumps
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ('snapshot', 'log', 'snapshot+tail')
+FIRST_ID = 1_700_000_000_000
+
+
+def generate_alarms(count, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield {
+            'id': FIRST_ID + i,
+            'time': f'{rng.randrange(24):02d}:{rng.randrange(60):02d}',
+            'label': f'alarma {i}' if rng.random() < 0.8 else '',
+            'active': rng.random() < 0.9
+        }
+
+
+def generate_tail(count, existing, seed=1):
+    """Operaciones del log posteriores al snapshot: 40% altas, 40% ediciones, 20% borrados"""
+    rng = random.Random(seed)
+    next_id = FIRST_ID + existing
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4 or not existing:
+            yield {'op': 'add', 'alarm': {'id': next_id, 'time': '07:30', 'label': 'nueva', 'active': True}}
+            next_id += 1
+        elif roll < 0.8:
+            alarm_id = FIRST_ID + rng.randrange(existing)
+            yield {'op': 'update', 'id': alarm_id, 'data': {'id': alarm_id, 'time': '08:15',
+                                                            'label': 'editada', 'active': False}}
+        else:
+            yield {'op': 'delete', 'id': FIRST_ID + rng.randrange(existing)}
+
+
+def write_log(path, ops):
+    with open(path, 'w', encoding='utf-8') as f:
+        for op in ops:
+            f.write(_dumps(op) + '\n')
+
+
+def prepare(scenario, directory, alarms, tail):
+    """Genera los archivos de datos de un escenario"""
+    if scenario == 'log':
+        write_log(os.path.join(directory, LOG_FILE),
+                  ({'op': 'add', 'alarm': alarm} for alarm in generate_alarms(alarms)))
+        return
+    write_snapshot(os.path.join(directory, SNAPSHOT_FILE), generate_alarms(alarms))
+    if scenario == 'snapshot+tail':
+        write_log(os.path.join(directory, LOG_FILE), generate_tail(tail, alarms))
+
+
+def disk_bytes(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def child(directory):
+    """Proceso hijo: carga el directorio en la lista real e imprime las medidas en JSON"""
+    from app import storage
+    started = time.perf_counter()
+    stats = storage.enable_persistence(directory, compact_every=sys.maxsize)
+    total = time.perf_counter() - started
+    storage.alarm_log.close()
+    print(json.dumps({
+        'alarms': storage.get_alarms_count(),
+        'snapshot_alarms': stats['snapshot_alarms'],
+        'log_ops': stats['log_ops'],
+        'load_s': round(stats['seconds'], 3),
+        'total_s': round(total, 3),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }))
+
+
+def measure(directory):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.cold_start', '--child', directory],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--alarms', type=int, default=1_000_000)
+    parser.add_argument('--tail', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    results = {'alarms': args.alarms, 'tail': args.tail, 'repeat': args.repeat, 'scenarios': {}}
+    for scenario in args.scenarios:
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.perf_counter()
+            prepare(scenario, directory, args.alarms, args.tail)
+            generate_s = time.perf_counter() - started
+            # Mejor de 'repeat' cargas: la primera ya calienta la caché de disco
+            runs = [measure(directory) for _ in range(max(1, args.repeat))]
+            best = min(runs, key=lambda run: run['total_s'])
+            results['scenarios'][scenario] = dict(
+                best,
+                generate_s=round(generate_s, 2),
+                disk_mb=round(disk_bytes(directory) / 2 ** 20, 1)
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Mide la ganancia del pool keep-alive frente a requests.get sin sesión.
+
+Levanta un servidor HTTP/1.1 local que imita a un proveedor (JSON pequeño,
+latencia configurable) y hace N peticiones secuenciales con cada cliente.
+
+Uso (desde backend/):
+    python -m benchmarks.http_pool [--requests 500] [--latency-ms 0]
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.http_client import build_session
+
+PAYLOAD = json.dumps({'main': {'temp': 21.5, 'humidity': 60}, 'weather': [{'main': 'Clear'}]}).encode()
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Mantiene la conexión abierta entre peticiones
+    disable_nagle_algorithm = True  # Cabeceras y cuerpo van en escrituras separadas
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_server(latency=0.0):
+    """Inicia el servidor stub en un puerto libre; retorna (server, url)"""
+    handler = type('Handler', (StubProviderHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/weather'
+
+
+def measure(get, url, count):
+    """Ejecuta 'count' GETs y retorna las latencias en milisegundos"""
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = get(url, timeout=5)
+        response.json()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(ordered[len(ordered) // 2], 3),
+        'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 3),
+        'total_s': round(sum(ordered) / 1000, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.latency_ms / 1000)
+    session = build_session()
+    try:
+        # Calentar ambos caminos antes de medir
+        measure(requests.get, url, 5)
+        measure(session.get, url, 5)
+        results = {
+            'requests': args.requests,
+            'stub_latency_ms': args.latency_ms,
+            'no_pool': summarize(measure(requests.get, url, args.requests)),
+            'pooled': summarize(measure(session.get, url, args.requests))
+        }
+        results['speedup'] = round(results['no_pool']['mean_ms'] / results['pooled']['mean_ms'], 2)
+        print(json.dumps(results, indent=2))
+    finally:
+        session.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,424 @@
+"""
+Prueba de carga de extremo a extremo con proveedores externos simulados.
+
+Levanta un servidor HTTP local por cada proveedor que usa utils.py
+(Open-Meteo, WeatherAPI, Google y timeapi.io) con un perfil de latencia,
+errores y cuelgues configurable; arranca la aplicación real apuntando a
+ellos (OPEN_METEO_URL, WEATHERAPI_URL, GOOGLE_SEARCH_URL, TIMEAPI_URL) y
+la carga desde varios procesos cliente con tráfico mixto sobre alarmas,
+cronómetro, temporizador, reloj mundial y reloj ambiental.
+
+Reporta por endpoint: peticiones, errores, peticiones/s, p50/p95/p99/máx
+e histograma de latencias; y por proveedor cuántas peticiones recibió y
+cuántos errores y cuelgues se inyectaron.
+
+Perfiles (--profile para todos, --provider nombre=perfil para uno):
+    fast, normal, slow, flaky, down
+    o 'latency=80,jitter=40,error=0.05,timeout=0.01,hang=10'
+
+Uso (desde backend/):
+    python -m benchmarks.load_test [--clients 8] [--seconds 20] [--profile normal]
+    python -m benchmarks.load_test --provider openmeteo=down --provider timeapi=slow
+    python -m benchmarks.load_test --mix envclock=10,alarms=1 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import available_timezones
+
+import requests
+
+from app.http_client import build_session
+from app.zone_catalog import city_from_zone
+from benchmarks.prefork import free_port, start_server
+
+PROFILES = {
+    'fast': {'latency': 5, 'jitter': 2, 'error': 0.0, 'timeout': 0.0},
+    'normal': {'latency': 80, 'jitter': 40, 'error': 0.01, 'timeout': 0.0},
+    'slow': {'latency': 600, 'jitter': 300, 'error': 0.02, 'timeout': 0.01},
+    'flaky': {'latency': 150, 'jitter': 100, 'error': 0.2, 'timeout': 0.05},
+    'down': {'latency': 0, 'jitter': 0, 'error': 1.0, 'timeout': 0.0}
+}
+DEFAULT_HANG = 10.0  # Segundos de un cuelgue (más que cualquier timeout del cliente)
+
+# Proveedor -> variable de entorno con su URL base en Config
+PROVIDERS = {
+    'openmeteo': ('OPEN_METEO_URL', '/v1/archive'),
+    'weatherapi': ('WEATHERAPI_URL', '/v1/current.json'),
+    'google': ('GOOGLE_SEARCH_URL', '/search'),
+    'timeapi': ('TIMEAPI_URL', '/api/Time/current/zone')
+}
+
+# Límites del histograma en milisegundos (el último cubo es '>5000')
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def parse_profile(text):
+    """'slow' o 'latency=80,error=0.1' -> dict de perfil completo"""
+    if text in PROFILES:
+        return dict(PROFILES[text], hang=DEFAULT_HANG)
+    profile = dict(PROFILES['fast'], hang=DEFAULT_HANG)
+    for item in filter(None, text.split(',')):
+        key, _, value = item.partition('=')
+        if key.strip() not in profile:
+            raise argparse.ArgumentTypeError(f'Clave de perfil desconocida: {key}')
+        profile[key.strip()] = float(value)
+    return profile
+
+
+# --- proveedores simulados ---
+
+def provider_payload(name, query):
+    """Cuerpo y tipo de contenido con el formato de cada proveedor real"""
+    if name == 'openmeteo':
+        body = {'hourly': {'temperature_2m': [round(random.uniform(-5, 35), 1)],
+                           'weather_code': [random.choice([0, 1, 2, 3, 61, 80])]}}
+    elif name == 'weatherapi':
+        body = {'current': {'condition': {'text': random.choice(['Soleado', 'Nublado', 'Lluvia ligera'])},
+                            'temp_c': round(random.uniform(-5, 35), 1),
+                            'humidity': random.randint(30, 90), 'wind_kph': random.uniform(0, 40)}}
+    elif name == 'timeapi':
+        now = time.gmtime()
+        body = {'time': time.strftime('%H:%M', now), 'date': time.strftime('%m/%d/%Y', now),
+                'timeZone': query.get('timeZone', ['UTC'])[0]}
+    else:
+        text = f"<html><body>{random.randint(-5, 35)}°C nublado {time.strftime('%H:%M:%S')}</body></html>"
+        return text.encode(), 'text/html; charset=utf-8'
+    return json.dumps(body).encode(), 'application/json'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    provider = None  # Se fija en la subclase de cada proveedor
+
+    def do_GET(self):
+        provider = self.provider
+        profile = provider.profile
+        with provider.lock:
+            provider.stats['requests'] += 1
+        roll = random.random()
+        if roll < profile['timeout']:
+            with provider.lock:
+                provider.stats['timeouts'] += 1
+            time.sleep(profile['hang'])
+            self.close_connection = True
+            return
+        delay = profile['latency'] + random.uniform(-profile['jitter'], profile['jitter'])
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if roll < profile['timeout'] + profile['error']:
+            with provider.lock:
+                provider.stats['errors'] += 1
+            body, status, content_type = b'{"error": "stub"}', 503, 'application/json'
+        else:
+            body, content_type = provider_payload(provider.name, parse_qs(urlparse(self.path).query))
+            status = 200
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubProvider:
+    """Servidor HTTP local que imita a un proveedor con un perfil dado"""
+
+    def __init__(self, name, profile):
+        self.name = name
+        self.profile = profile
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'timeouts': 0}
+        handler = type(f'{name}Handler', (StubHandler,), {'provider': self})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server.server_port}{PROVIDERS[self.name][1]}'
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# --- tráfico ---
+
+def city_pool(size):
+    """Ciudades reales y distintas para provocar fallos de cache del clima"""
+    zones = sorted(zone for zone in available_timezones()
+                   if zone.split('/')[0] in ('Europe', 'America', 'Asia', 'Africa', 'Australia')
+                   and zone.count('/') == 1)
+    return [city_from_zone(zone) for zone in zones][:size]
+
+
+def _alarms(session, base, state, rng):
+    roll = rng.random()
+    if roll < 0.3 or not state['alarms']:
+        response = session.post(base + '/api/alarms/', json={
+            'time': f'{rng.randrange(24):02d}:{rng.randrange(60):02d}', 'label': 'carga'})
+        if response.status_code == 201:
+            state['alarms'].append(response.json()['id'])
+        return 'POST /api/alarms/', response
+    if roll < 0.5:
+        return 'GET /api/alarms/?limit=50', session.get(base + '/api/alarms/?limit=50')
+    if roll < 0.65:
+        return 'GET /api/alarms/next', session.get(base + '/api/alarms/next')
+    if roll < 0.8:
+        alarm_id = rng.choice(state['alarms'])
+        return 'PUT /api/alarms/<id>', session.put(f'{base}/api/alarms/{alarm_id}', json={'label': 'editada'})
+    if roll < 0.9:
+        alarm_id = state['alarms'].pop(rng.randrange(len(state['alarms'])))
+        return 'DELETE /api/alarms/<id>', session.delete(f'{base}/api/alarms/{alarm_id}')
+    return 'GET /api/alarms/upcoming', session.get(base + '/api/alarms/upcoming')
+
+
+def _stopwatch(session, base, state, rng):
+    sw = f"{base}/api/stopwatch/{state['name']}"
+    roll = rng.random()
+    if roll < 0.2:
+        return 'POST /api/stopwatch/<id>/start', session.post(sw + '/start')
+    if roll < 0.4:
+        return 'POST /api/stopwatch/<id>/lap', session.post(sw + '/lap')
+    if roll < 0.5:
+        return 'POST /api/stopwatch/<id>/stop', session.post(sw + '/stop')
+    return 'GET /api/stopwatch/<id>/', session.get(sw + '/')
+
+
+def _timer(session, base, state, rng):
+    timer = f"{base}/api/timer/{state['name']}"
+    roll = rng.random()
+    if roll < 0.3:
+        return 'POST /api/timer/<id>/start', session.post(timer + '/start', json={'duration': rng.randint(1, 600)})
+    if roll < 0.4:
+        return 'POST /api/timer/<id>/stop', session.post(timer + '/stop')
+    if roll < 0.5:
+        return 'GET /api/timer/expired', session.get(base + '/api/timer/expired')
+    return 'GET /api/timer/<id>/', session.get(timer + '/')
+
+
+def _worldclock(session, base, state, rng):
+    roll = rng.random()
+    if roll < 0.6:
+        return 'GET /api/worldclock/', session.get(base + '/api/worldclock/')
+    if roll < 0.8:
+        query = rng.choice(['ma', 'new', 'bu', 'to', 'sa', 'eur'])
+        return 'GET /api/worldclock/search', session.get(base + '/api/worldclock/search', params={'q': query})
+    return 'GET /api/worldclock/<city>', session.get(f"{base}/api/worldclock/{rng.choice(state['cities'])}")
+
+
+def _envclock(session, base, state, rng):
+    if rng.random() < 0.8:
+        city = rng.choice(state['cities'])
+        return 'GET /api/envclock/<city>', session.get(f'{base}/api/envclock/{city}')
+    cities = rng.sample(state['cities'], min(5, len(state['cities'])))
+    return 'POST /api/envclock/batch', session.post(base + '/api/envclock/batch', json={'cities': cities})
+
+
+TRAFFIC = {
+    'alarms': _alarms,
+    'stopwatch': _stopwatch,
+    'timer': _timer,
+    'worldclock': _worldclock,
+    'envclock': _envclock
+}
+DEFAULT_MIX = 'alarms=3,stopwatch=2,timer=2,worldclock=2,envclock=2'
+
+
+def parse_mix(text):
+    mix = {}
+    for item in filter(None, text.split(',')):
+        name, _, weight = item.partition('=')
+        if name not in TRAFFIC:
+            raise argparse.ArgumentTypeError(f'Grupo de tráfico desconocido: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class TimeoutSession:
+    """Sesión keep-alive con el mismo timeout en todas las peticiones"""
+
+    def __init__(self, timeout):
+        self.session = build_session(retries=0)
+        self.timeout = timeout
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, timeout=self.timeout, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.session.post(url, timeout=self.timeout, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.session.put(url, timeout=self.timeout, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.session.delete(url, timeout=self.timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+def client(args):
+    """
+    Proceso cliente en lazo cerrado: elige una operación según el mix, la
+    ejecuta y espera 'think' segundos. Retorna [(endpoint, ms, status)].
+    """
+    index, base, mix, cities, seconds, think, timeout = args
+    rng = random.Random(index)
+    session = TimeoutSession(timeout)
+    state = {'alarms': [], 'name': f'carga-{index}', 'cities': cities}
+    groups, weights = list(mix), list(mix.values())
+    # Solo /start crea instancias con nombre: se crean antes de medir
+    try:
+        session.post(f"{base}/api/stopwatch/{state['name']}/start")
+        session.post(f"{base}/api/timer/{state['name']}/start", json={'duration': 0})
+    except requests.RequestException:
+        pass
+    samples = []
+    stop_at = time.perf_counter() + seconds
+    while time.perf_counter() < stop_at:
+        group = rng.choices(groups, weights)[0]
+        started = time.perf_counter()
+        endpoint = f'{group} (error de conexión)'
+        try:
+            endpoint, response = TRAFFIC[group](session, base, state, rng)
+            status = response.status_code
+        except requests.RequestException:
+            status = 0
+        samples.append((endpoint, (time.perf_counter() - started) * 1000, status))
+        if think:
+            time.sleep(think)
+    session.close()
+    return samples
+
+
+# --- informe ---
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def histogram(latencies):
+    buckets = {f'<={bound}ms': 0 for bound in HISTOGRAM_BOUNDS}
+    buckets[f'>{HISTOGRAM_BOUNDS[-1]}ms'] = 0
+    for value in latencies:
+        for bound in HISTOGRAM_BOUNDS:
+            if value <= bound:
+                buckets[f'<={bound}ms'] += 1
+                break
+        else:
+            buckets[f'>{HISTOGRAM_BOUNDS[-1]}ms'] += 1
+    return buckets
+
+
+def summarize(samples, elapsed):
+    """Estadísticas por endpoint y totales"""
+    by_endpoint = {}
+    for endpoint, latency, status in samples:
+        by_endpoint.setdefault(endpoint, []).append((latency, status))
+    by_endpoint['TOTAL'] = [(latency, status) for _, latency, status in samples]
+    report = {}
+    for endpoint, values in sorted(by_endpoint.items()):
+        ordered = sorted(latency for latency, _ in values)
+        report[endpoint] = {
+            'requests': len(values),
+            'errors': sum(1 for _, status in values if status == 0 or status >= 500),
+            'req_per_s': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(ordered, 0.50), 2),
+            'p95_ms': round(percentile(ordered, 0.95), 2),
+            'p99_ms': round(percentile(ordered, 0.99), 2),
+            'max_ms': round(ordered[-1], 2),
+            'histogram': histogram(ordered)
+        }
+    return report
+
+
+def print_report(report, providers):
+    header = f"{'endpoint':<36}{'peticiones':>11}{'errores':>9}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'máx':>9}"
+    print(header)
+    print('-' * len(header))
+    for endpoint, row in report.items():
+        print(f"{endpoint:<36}{row['requests']:>11}{row['errors']:>9}{row['req_per_s']:>9.1f}"
+              f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}")
+    print()
+    for name, stats in providers.items():
+        print(f"🛰️ {name:<11} {stats['requests']:>6} peticiones, {stats['errors']} errores, "
+              f"{stats['timeouts']} cuelgues inyectados ({stats['profile']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--think-ms', type=float, default=0, help='Pausa de cada cliente entre peticiones')
+    parser.add_argument('--timeout', type=float, default=15, help='Timeout de cada petición del cliente')
+    parser.add_argument('--workers', type=int, default=1, help='Workers del servidor (pre-fork si > 1)')
+    parser.add_argument('--profile', default='normal', help='Perfil de todos los proveedores')
+    parser.add_argument('--provider', action='append', default=[], metavar='NOMBRE=PERFIL',
+                        help='Perfil de un proveedor concreto (' + ', '.join(PROVIDERS) + ')')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument('--cities', type=int, default=200, help='Ciudades distintas en el tráfico de envclock')
+    parser.add_argument('--no-time-verify', action='store_true',
+                        help='No contrastar la hora con timeapi/Google (ENV_TIME_VERIFY=0)')
+    parser.add_argument('--output', help='Guardar el informe en JSON')
+    args = parser.parse_args()
+
+    profiles = {name: args.profile for name in PROVIDERS}
+    for item in args.provider:
+        name, _, profile = item.partition('=')
+        if name not in PROVIDERS:
+            parser.error(f'Proveedor desconocido: {name}')
+        profiles[name] = profile
+    stubs = {name: StubProvider(name, parse_profile(profile)) for name, profile in profiles.items()}
+    env = {PROVIDERS[name][0]: stub.url for name, stub in stubs.items()}
+    env['ENV_TIME_VERIFY'] = '0' if args.no_time_verify else '1'
+    cities = city_pool(args.cities)
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            process, base = start_server(args.workers, free_port(), data_dir, env)
+            try:
+                jobs = [(index, base, args.mix, cities, args.seconds, args.think_ms / 1000, args.timeout)
+                        for index in range(args.clients)]
+                with multiprocessing.Pool(args.clients) as pool:
+                    started = time.perf_counter()
+                    results = pool.map(client, jobs)
+                    elapsed = time.perf_counter() - started
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+    finally:
+        for stub in stubs.values():
+            stub.close()
+
+    report = {
+        'config': {
+            'clients': args.clients, 'seconds': args.seconds, 'workers': args.workers,
+            'think_ms': args.think_ms, 'mix': args.mix, 'cities': len(cities),
+            'time_verify': not args.no_time_verify, 'cpus': os.cpu_count()
+        },
+        'providers': {name: dict(stub.stats, profile=profiles[name]) for name, stub in stubs.items()},
+        'endpoints': summarize([sample for samples in results for sample in samples], elapsed)
+    }
+    print_report(report['endpoints'], report['providers'])
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+        print(f'💾 Informe en {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Compara el rendimiento del servidor de un proceso con el modo pre-fork.
+
+Para cada configuración levanta el servidor real en un subproceso (puerto
+libre, datos en un directorio temporal) y lo carga desde varios procesos
+cliente con conexiones keep-alive durante un tiempo fijo. Reporta
+peticiones por segundo y latencias por configuración.
+
+La ganancia depende de los núcleos disponibles: con un solo núcleo los
+workers compiten por la misma CPU y el modo pre-fork no puede escalar.
+
+Uso (desde backend/):
+    python -m benchmarks.prefork [--workers 1 4] [--clients 8] [--seconds 5]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from app.http_client import build_session
+from benchmarks.http_pool import summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATHS = ['/api/worldclock/', '/api/alarms/count', '/api/stopwatch/', '/api/timer/']
+
+# Servidor de un proceso equivalente a run_unified.py (werkzeug con hilos)
+SINGLE_SERVER = (
+    'import sys; from werkzeug.serving import make_server; from app.main import app; '
+    'make_server("127.0.0.1", int(sys.argv[1]), app, threaded=True).serve_forever()'
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, port, data_dir, extra_env=None):
+    """Lanza el servidor con 'workers' procesos; retorna (Popen, url base)"""
+    env = dict(os.environ, ALARM_DATA_DIR=data_dir, **(extra_env or {}))
+    if workers > 1:
+        command = [sys.executable, '-m', 'app.prefork', '--host', '127.0.0.1',
+                   '--port', str(port), '--workers', str(workers)]
+    else:
+        command = [sys.executable, '-c', SINGLE_SERVER, str(port)]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 20
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url + DEFAULT_PATHS[0], timeout=1)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f'El servidor con {workers} workers no respondió')
+
+
+def client(args):
+    """Proceso cliente: GETs keep-alive en ronda hasta 'seconds'; retorna latencias"""
+    url, paths, seconds = args
+    session = build_session(retries=0)
+    latencies = []
+    errors = 0
+    stop_at = time.perf_counter() + seconds
+    index = 0
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            response = session.get(url + paths[index % len(paths)], timeout=5)
+            response.content
+            if response.status_code != 200:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+        index += 1
+    session.close()
+    return latencies, errors
+
+
+def run_load(url, paths, clients, seconds):
+    with multiprocessing.Pool(clients) as pool:
+        pool.map(client, [(url, paths, 0.5)] * clients)  # Calentamiento
+        started = time.perf_counter()
+        results = pool.map(client, [(url, paths, seconds)] * clients)
+        elapsed = time.perf_counter() - started
+    latencies = [value for values, _ in results for value in values]
+    summary = summarize(latencies)
+    summary.pop('total_s')
+    return dict(
+        summary,
+        requests=len(latencies),
+        errors=sum(errors for _, errors in results),
+        req_per_s=round(len(latencies) / elapsed, 1)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, os.cpu_count() or 2])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+    args = parser.parse_args()
+
+    results = {'cpus': os.cpu_count(), 'clients': args.clients, 'paths': args.paths, 'runs': {}}
+    for workers in dict.fromkeys(args.workers):
+        with tempfile.TemporaryDirectory() as data_dir:
+            process, url = start_server(workers, free_port(), data_dir)
+            try:
+                results['runs'][workers] = run_load(url, args.paths, args.clients, args.seconds)
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+    base = results['runs'].get(min(results['runs']))
+    for run in results['runs'].values():
+        run['speedup'] = round(run['req_per_s'] / base['req_per_s'], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
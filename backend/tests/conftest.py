@@ -0,0 +1,40 @@
+"""
+Configuración común de las pruebas del backend.
+
+Se ejecutan desde backend/ con 'python -m pytest'. La aplicación se importa
+sin persistencia ni estado compartido para no tocar backend/data.
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ['ALARM_PERSISTENCE'] = '0'
+os.environ['SHARED_STATE'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import storage  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    from app.main import app
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def empty_storage():
+    """Cada prueba empieza y termina con la lista de alarmas vacía"""
+    def clear():
+        for alarm in storage.get_alarms():
+            storage.delete_alarm(alarm['id'])
+    clear()
+    yield
+    clear()
@@ -0,0 +1,106 @@
+"""Rueda de tiempo del motor de alarmas: disparo, recuperación y saltos de reloj"""
+
+import datetime
+import threading
+
+import pytest
+
+from app.alarm_scheduler import AlarmScheduler, parse_minute_of_day
+
+
+def _at(hour, minute, day=1):
+    return datetime.datetime(2026, 10, day, hour, minute, 5)
+
+
+@pytest.fixture
+def hourly():
+    """Rueda con 24 alarmas, una a cada hora en punto"""
+    alarms = {hour: {'id': hour, 'time': f'{hour:02d}:00', 'label': str(hour), 'active': True}
+              for hour in range(24)}
+    scheduler = AlarmScheduler(alarms.get)
+    for alarm in alarms.values():
+        scheduler.schedule(alarm)
+    return scheduler
+
+
+def _ids(events):
+    return [event['id'] for event in events]
+
+
+def test_parse_minute_of_day():
+    assert parse_minute_of_day('00:00') == 0
+    assert parse_minute_of_day('07:30') == 450
+    assert parse_minute_of_day('23:59:59') == 1439
+    assert parse_minute_of_day('24:00') is None
+    assert parse_minute_of_day(None) is None
+    for value in ('7:00', '07:0', '-0:30', '07:00:60', ' 07:00', '07:00\n', 700):
+        assert parse_minute_of_day(value) is None, value
+
+
+def test_fires_each_minute_once(hourly):
+    assert hourly.tick(_at(6, 58)) == []
+    assert hourly.tick(_at(6, 59)) == []
+    assert _ids(hourly.tick(_at(7, 0))) == [7]
+    assert hourly.tick(_at(7, 0)) == []
+    assert [event['seq'] for event in hourly.fired()] == [1]
+
+
+def test_catches_up_missed_minutes(hourly):
+    hourly.tick(_at(7, 58))
+    # El hilo estuvo dormido tres minutos
+    assert _ids(hourly.tick(_at(8, 1))) == [8]
+
+
+def test_crosses_midnight(hourly):
+    hourly.tick(_at(23, 59))
+    assert _ids(hourly.tick(_at(0, 0, day=2))) == [0]
+
+
+@pytest.mark.parametrize('before, after', [
+    ((2, 30), (2, 29)),    # Corrección NTP hacia atrás
+    ((3, 0), (2, 0)),      # Cambio al horario de invierno
+    ((10, 0), (18, 0)),    # Salto hacia delante mayor que la recuperación
+])
+def test_clock_jumps_resync_without_firing(hourly, before, after):
+    hourly.tick(_at(*before))
+    assert hourly.tick(_at(*after)) == []
+    assert hourly.fired() == []
+    # Tras resincronizar sigue disparando con normalidad
+    next_hour = (after[0] + 1) % 24
+    hourly.tick(_at(after[0], 59))
+    hourly.tick(_at(next_hour, 0))
+    assert _ids(hourly.fired()) == [next_hour]
+
+
+def test_inactive_and_unscheduled_alarms_do_not_fire(hourly):
+    hourly.schedule({'id': 7, 'time': '07:00', 'active': False})
+    hourly.unschedule(8)
+    hourly.tick(_at(6, 59))
+    assert hourly.tick(_at(7, 0)) == []
+    hourly.tick(_at(7, 59))
+    assert hourly.tick(_at(8, 0)) == []
+
+
+def test_reschedule_moves_slot(hourly):
+    hourly.schedule({'id': 7, 'time': '07:30', 'active': True})
+    assert hourly.due(7 * 60) == []
+    assert hourly.due(7 * 60 + 30) == [7]
+
+
+def test_tick_waits_for_before_tick_hook():
+    alarms = {8: {'id': 8, 'time': '08:00', 'active': True}}
+    scheduler = AlarmScheduler(alarms.get)
+    loaded = threading.Event()
+    scheduler.before_tick = loaded.wait
+    loaded.set()
+    scheduler.tick(_at(7, 59))
+    loaded.clear()
+
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(scheduler.tick(_at(8, 0))))
+    thread.start()
+    # La rueda se llena mientras el tick espera (carga en segundo plano)
+    scheduler.schedule(alarms[8])
+    loaded.set()
+    thread.join(5)
+    assert _ids(results) == [8]
@@ -0,0 +1,141 @@
+"""API de alarmas: altas, ediciones, lotes y eventos disparados"""
+
+import datetime
+
+import pytest
+
+from app import storage
+
+
+def _create(client, **data):
+    response = client.post('/api/alarms/', json=data)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+@pytest.mark.parametrize('body', [
+    None,
+    {},
+    {'time': '25:00'},
+    {'time': '07:60'},
+    {'time': 730},
+    {'time': '-0:30'},
+    {'time': '7:05'},
+    {'time': '07:5'},
+    {'time': ' 7:00'},
+    {'time': '07:00 '},
+    {'time': '07:00\n'},
+    {'time': '07:00:99'},
+    {'time': '07:00:00.000'},
+    {'time': '０７:００'},
+    {'time': '07:00', 'label': ['x']},
+    {'time': '07:00', 'active': 'yes'},
+])
+def test_create_rejects_invalid_data(client, body):
+    response = client.post('/api/alarms/', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    assert client.get('/api/alarms/count').get_json()['count'] == 0
+
+
+@pytest.mark.parametrize('value', ['00:00', '07:05', '23:59', '23:59:59'])
+def test_create_accepts_strict_times(client, value):
+    assert _create(client, time=value)['time'] == value
+
+
+def test_create_and_update(client):
+    alarm = _create(client, time='07:00', label='Despertar')
+    response = client.put(f"/api/alarms/{alarm['id']}", json={'time': '07:30', 'active': False})
+    assert response.status_code == 200
+    assert response.get_json() == dict(alarm, time='07:30', active=False)
+
+
+def test_update_rejects_id_change(client):
+    first = _create(client, time='07:00')
+    second = _create(client, time='08:00')
+    response = client.put(f"/api/alarms/{first['id']}", json={'id': second['id'], 'label': 'x'})
+    assert response.status_code == 400
+    # Ninguna de las dos alarmas cambió
+    alarms = {alarm['id']: alarm for alarm in client.get('/api/alarms/').get_json()}
+    assert alarms == {first['id']: first, second['id']: second}
+
+
+def test_update_accepts_same_id(client):
+    alarm = _create(client, time='07:00')
+    response = client.put(f"/api/alarms/{alarm['id']}", json={'id': alarm['id'], 'label': 'x'})
+    assert response.status_code == 200
+    assert response.get_json()['label'] == 'x'
+
+
+def test_update_validates_fields(client):
+    alarm = _create(client, time='07:00')
+    assert client.put(f"/api/alarms/{alarm['id']}", json={'time': '7h'}).status_code == 400
+    assert client.put(f"/api/alarms/{alarm['id']}", json={'time': '7:00'}).status_code == 400
+    assert client.put(f"/api/alarms/{alarm['id']}", json={'label': 3}).status_code == 400
+    assert client.put('/api/alarms/1', json={'label': 'x'}).status_code == 404
+
+
+def test_fired_cursor(client):
+    alarm = _create(client, time='07:00', label='Despertar')
+    since = client.get('/api/alarms/fired').get_json()['last_seq']
+    storage.scheduler.fire_minute(7 * 60, datetime.datetime(2026, 10, 1, 7, 0))
+
+    data = client.get(f'/api/alarms/fired?since={since}').get_json()
+    assert [event['id'] for event in data['events']] == [alarm['id']]
+    assert data['last_seq'] == data['events'][-1]['seq']
+    # Sin eventos nuevos el cursor no avanza
+    again = client.get(f"/api/alarms/fired?since={data['last_seq']}").get_json()
+    assert again == {'events': [], 'last_seq': data['last_seq']}
+    # Un cursor por delante del servidor (reinicio) se devuelve corregido
+    ahead = client.get(f"/api/alarms/fired?since={data['last_seq'] + 100}").get_json()
+    assert ahead['last_seq'] == data['last_seq']
+
+
+def test_batch_validates_each_operation(client):
+    existing = _create(client, time='06:00')
+    response = client.post('/api/alarms/batch', json={'operations': [
+        {'op': 'create', 'time': '07:00', 'label': 'ok'},
+        {'op': 'create', 'time': 'nope'},
+        {'op': 'update', 'id': existing['id'], 'data': {'label': 'editada'}},
+        {'op': 'update', 'id': existing['id'], 'data': {'id': existing['id'] + 1}},
+        {'op': 'update', 'id': existing['id'], 'data': 'x'},
+        {'op': 'delete', 'id': 'abc'},
+        {'op': 'delete', 'id': True},
+        {'op': 'rename', 'id': existing['id']},
+        'create',
+        {'op': 'delete', 'id': 1},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['status'] for result in results] == [201, 400, 200, 400, 400, 400, 400, 400, 400, 404]
+    assert results[2]['alarm']['label'] == 'editada'
+
+    alarms = client.get('/api/alarms/').get_json()
+    assert sorted(alarm['time'] for alarm in alarms) == ['06:00', '07:00']
+
+
+@pytest.mark.parametrize('body', [
+    {'operations': 'x'},
+    {},
+    [{'op': 'delete', 'id': 1}],
+    'operations',
+    None,
+])
+def test_batch_rejects_malformed_body(client, body):
+    assert client.post('/api/alarms/batch', json=body).status_code == 400
+
+
+def test_batch_rejects_non_json(client):
+    assert client.post('/api/alarms/batch', data='no json').status_code == 400
+
+
+def test_pagination(client):
+    created = [_create(client, time=f'0{hour}:00') for hour in range(5)]
+    first = client.get('/api/alarms/?limit=2').get_json()
+    assert [alarm['id'] for alarm in first['alarms']] == [alarm['id'] for alarm in created[:2]]
+    second = client.get(f"/api/alarms/?after={first['next_cursor']}&limit=10").get_json()
+    assert [alarm['id'] for alarm in second['alarms']] == [alarm['id'] for alarm in created[2:]]
+    assert second['next_cursor'] is None
+    assert client.get('/api/alarms/?after=1&limit=2').status_code == 404
+    assert client.get('/api/alarms/?after=abc').status_code == 400
+    assert client.get('/api/alarms/?limit=abc').status_code == 400
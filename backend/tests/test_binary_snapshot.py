@@ -0,0 +1,109 @@
+"""Snapshot binario mapeado: ida y vuelta, datos inválidos y vista de carga"""
+
+import os
+
+import pytest
+
+from app.binary_snapshot import MappedAlarmSnapshot, write_snapshot
+from app.persistence import AlarmLog, _dumps
+
+
+def test_snapshot_round_trip(tmp_path):
+    alarms = [
+        {'id': 1, 'time': '07:00', 'label': 'Despertar', 'active': True},
+        {'id': 2, 'time': '23:59:59', 'label': 'Café ☕ y más', 'active': False},
+        {'id': 3, 'time': '12:30', 'label': '', 'active': True},
+    ]
+    path = str(tmp_path / 'alarms.snapshot.bin')
+    write_snapshot(path, alarms)
+    snapshot = MappedAlarmSnapshot(path)
+    try:
+        assert len(snapshot) == 3
+        assert list(snapshot) == alarms
+        assert snapshot[1] == alarms[1]
+        assert list(snapshot.select({3, 1})) == [alarms[0], alarms[2]]
+    finally:
+        snapshot.close()
+
+
+def test_snapshot_normalizes_labels(tmp_path):
+    path = str(tmp_path / 'alarms.snapshot.bin')
+    write_snapshot(path, [
+        {'id': 1, 'time': '07:00', 'label': None, 'active': True},
+        {'id': 2, 'time': '08:00', 'label': 42, 'active': True},
+    ])
+    snapshot = MappedAlarmSnapshot(path)
+    try:
+        assert [alarm['label'] for alarm in snapshot] == ['', '42']
+    finally:
+        snapshot.close()
+
+
+@pytest.mark.parametrize('alarm', [
+    {'id': '1', 'time': '07:00', 'label': '', 'active': True},
+    {'id': True, 'time': '07:00', 'label': '', 'active': True},
+    {'id': None, 'time': '07:00', 'label': '', 'active': True},
+    {'id': 2 ** 63, 'time': '07:00', 'label': '', 'active': True},
+    {'id': 1, 'time': '07:00:00.000', 'label': '', 'active': True},
+    {'id': 1, 'time': '07:00 ☀', 'label': '', 'active': True},
+])
+def test_snapshot_rejects_unrepresentable_alarms(tmp_path, alarm):
+    path = tmp_path / 'alarms.snapshot.bin'
+    write_snapshot(str(path), [{'id': 9, 'time': '06:00', 'label': 'previa', 'active': True}])
+    with pytest.raises(ValueError):
+        write_snapshot(str(path), [alarm])
+    # El snapshot anterior sigue intacto y no quedan temporales
+    assert os.listdir(tmp_path) == ['alarms.snapshot.bin']
+    snapshot = MappedAlarmSnapshot(str(path))
+    try:
+        assert [alarm['id'] for alarm in snapshot] == [9]
+    finally:
+        snapshot.close()
+
+@pytest.fixture
+def view_dir(tmp_path):
+    """Snapshot con tres alarmas y una cola que borra, edita, renombra y añade"""
+    log = AlarmLog(str(tmp_path), lambda: ())
+    write_snapshot(log.snapshot_path, [
+        {'id': 1, 'time': '07:00', 'label': 'a', 'active': True},
+        {'id': 2, 'time': '08:00', 'label': 'b', 'active': True},
+        {'id': 3, 'time': '09:00', 'label': 'c', 'active': True},
+    ])
+    with open(log.log_path, 'w', encoding='utf-8') as f:
+        for op in (
+            {'op': 'delete', 'id': 1},
+            {'op': 'update', 'id': 2, 'data': {'id': 2, 'time': '06:30', 'label': 'b2', 'active': True}},
+            {'op': 'update', 'id': 3, 'data': {'id': 30, 'time': '09:00', 'label': 'c', 'active': True}},
+            {'op': 'add', 'alarm': {'id': 4, 'time': '23:00', 'label': 'd', 'active': True}},
+        ):
+            f.write(_dumps(op) + '\n')
+    return log
+
+
+def test_loading_view_matches_full_load(view_dir):
+    snapshot = view_dir.open_snapshot()
+    try:
+        view = view_dir.loading_view(snapshot)
+        assert len(view) == 3
+        assert [alarm['id'] for alarm in view] == [2, 30, 4]
+        assert view.get_many([1, 2, 3, 30, 99]) == {
+            2: {'id': 2, 'time': '06:30', 'label': 'b2', 'active': True},
+            30: {'id': 30, 'time': '09:00', 'label': 'c', 'active': True},
+        }
+    finally:
+        snapshot.close()
+
+
+def test_loading_view_pages_and_time_index(view_dir):
+    snapshot = view_dir.open_snapshot()
+    try:
+        view = view_dir.loading_view(snapshot)
+        assert view.page_after(None, 2) == ([view.get_many([2])[2], view.get_many([30])[30]], True)
+        items, has_more = view.page_after(30, 2)
+        assert [alarm['id'] for alarm in items] == [4] and not has_more
+        assert view.page_after(1, 2) is None
+        index = view.time_index()
+        assert index is view.time_index()
+        assert index.upcoming(7 * 60, 3) == [30, 4, 2]
+    finally:
+        snapshot.close()
@@ -0,0 +1,237 @@
+"""Cache TTL + LRU con coalescencia de peticiones"""
+
+import random
+import threading
+
+import pytest
+
+from app import cache as cache_module
+from app.cache import TTLCache
+from app.utils import get_fallback_weather_data
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', fake)
+    return fake
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=4, ttl=10)
+    cache.set('a', 1)
+    clock.now += 9
+    assert cache.get('a') == 1
+    clock.now += 1
+    assert cache.get('a') is None
+    assert len(cache) == 0
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['expirations'] == 1
+
+
+def test_per_entry_ttl(clock):
+    cache = TTLCache(ttl=10)
+    cache.set('a', 1, ttl=60)
+    clock.now += 30
+    assert cache.get('a') == 1
+
+
+def test_evicts_least_recently_used(clock):
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' pasa a ser la menos usada
+    cache.set('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_get_or_load_caches_result(clock):
+    cache = TTLCache(ttl=10)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_load('k', loader) == 1
+    assert cache.get_or_load('k', loader) == 1
+    clock.now += 10
+    assert cache.get_or_load('k', loader) == 2
+
+
+def test_loader_errors_are_not_cached(clock):
+    cache = TTLCache(ttl=10)
+
+    def failing():
+        raise RuntimeError('caído')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('k', failing)
+    assert cache.get_or_load('k', lambda: 'ok') == 'ok'
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'valor'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+    leader.start()
+    assert started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_load('k', loader)))
+        for _ in range(5)
+    ]
+    for thread in followers:
+        thread.start()
+    # Esperar a que todos estén bloqueados en la carga en curso
+    while cache.stats()['coalesced'] < 5:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert calls == [1]
+    assert results == ['valor'] * 6
+
+
+def test_concurrent_waiters_receive_loader_error():
+    cache = TTLCache(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+
+    def loader():
+        started.set()
+        release.wait(5)
+        raise RuntimeError('caído')
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load('k', loader)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    while cache.stats()['coalesced'] < 1:
+        threading.Event().wait(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert len(errors) == 2
+
+
+def test_fallback_weather_keeps_global_random_state():
+    random.seed(42)
+    expected = random.random()
+    random.seed(42)
+    get_fallback_weather_data('Madrid')
+    assert random.random() == expected
+
+
+def test_fallback_weather_is_stable_per_city():
+    assert get_fallback_weather_data('Madrid') == get_fallback_weather_data('Madrid')
+
+
+class ManualExecutor:
+    """Guarda los refrescos y los ejecuta cuando la prueba lo pide"""
+
+    def __init__(self):
+        self.pending = []
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        self.pending.append((fn, args))
+
+    def run(self):
+        while self.pending:
+            fn, args = self.pending.pop(0)
+            fn(*args)
+
+
+def test_stale_entry_is_served_while_refreshing(clock):
+    executor = ManualExecutor()
+    cache = TTLCache(ttl=10, max_stale=30, executor=executor)
+    values = iter(['viejo', 'nuevo'])
+    assert cache.get_or_load('k', lambda: next(values)) == 'viejo'
+    clock.now += 15
+    # Vencida pero dentro de max_stale: se sirve la anterior y se refresca
+    assert cache.get('k') is None
+    assert cache.get_or_load('k', lambda: next(values)) == 'viejo'
+    assert executor.submitted == 1
+    # Mientras el refresco está pendiente no se programa otro
+    assert cache.get_or_load('k', lambda: 'otro') == 'viejo'
+    assert executor.submitted == 1
+    executor.run()
+    assert cache.get_or_load('k', lambda: 'otro') == 'nuevo'
+    stats = cache.stats()
+    assert stats['stale_hits'] == 2 and stats['refreshes'] == 1
+
+
+def test_entry_past_max_stale_loads_synchronously(clock):
+    executor = ManualExecutor()
+    cache = TTLCache(ttl=10, max_stale=30, executor=executor)
+    cache.set('k', 'viejo')
+    clock.now += 40
+    assert cache.get_or_load('k', lambda: 'nuevo') == 'nuevo'
+    assert executor.submitted == 0
+
+
+def test_failed_refresh_keeps_stale_value(clock):
+    executor = ManualExecutor()
+    cache = TTLCache(ttl=10, max_stale=30, executor=executor)
+    cache.set('k', 'viejo')
+    clock.now += 15
+
+    def failing():
+        raise RuntimeError('caído')
+
+    assert cache.get_or_load('k', failing) == 'viejo'
+    executor.run()
+    assert cache.get_or_load('k', failing) == 'viejo'
+    executor.run()
+    assert cache.stats()['refresh_errors'] == 2
+
+
+
+def test_refresh_without_executor_runs_in_a_thread():
+    cache = TTLCache(ttl=0.05, max_stale=30)
+    cache.set('k', 'viejo')
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return 'nuevo'
+
+    threading.Event().wait(0.06)
+    assert cache.get_or_load('k', loader) == 'viejo'
+    assert refreshed.wait(5)
+    for _ in range(500):
+        if cache.get('k') == 'nuevo':
+            break
+        threading.Event().wait(0.01)
+    assert cache.get('k') == 'nuevo'
@@ -0,0 +1,84 @@
+"""Paquete de componentes HTML en una sola respuesta"""
+
+import json
+import os
+
+import pytest
+
+from app import component_bundle as bundle_module
+from app.component_bundle import ComponentBundle
+from app.static_assets import StaticAssets
+
+
+@pytest.fixture
+def public(tmp_path):
+    components = tmp_path / 'components'
+    components.mkdir()
+    (components / 'alarm.html').write_text('<div>alarma ⏰</div>', encoding='utf-8')
+    (components / 'timer.html').write_text('<div>temporizador</div>', encoding='utf-8')
+    (components / 'notes.txt').write_text('no es un componente')
+    (components / 'extra').mkdir()
+    (components / 'extra' / 'nested.html').write_text('<div>anidado</div>')
+    return tmp_path
+
+
+def payload(asset):
+    return json.loads(asset.read().decode('utf-8'))
+
+
+def test_bundles_top_level_html_components(public):
+    bundle = ComponentBundle(StaticAssets(public))
+    assert bundle.names() == ['alarm', 'timer']
+    data = payload(bundle.get())
+    assert data['version'] == bundle.version
+    assert data['components'] == {'alarm': '<div>alarma ⏰</div>', 'timer': '<div>temporizador</div>'}
+
+
+def test_subset_and_unknown_names(public):
+    bundle = ComponentBundle(StaticAssets(public))
+    assert list(payload(bundle.get(['timer', 'timer']))['components']) == ['timer']
+    with pytest.raises(KeyError) as error:
+        bundle.get(['timer', 'nope'])
+    assert error.value.args[0] == ['nope']
+
+
+def test_variants_are_memoized(public, monkeypatch):
+    bundle = ComponentBundle(StaticAssets(public))
+    assert bundle.get(['alarm', 'timer']) is bundle.get(['timer', 'alarm'])
+    monkeypatch.setattr(bundle_module, 'MAX_VARIANTS', 1)
+    first = bundle.get(['alarm'])
+    bundle.get(['timer'])
+    assert bundle.get(['alarm']) is not first
+
+
+def test_rebuilds_only_when_a_component_changes(public):
+    assets = StaticAssets(public)
+    bundle = ComponentBundle(assets)
+    version = bundle.version
+    everything = bundle.get()
+    assets.scan()
+    assert bundle.version == version and bundle.get() is everything
+
+    path = public / 'components' / 'alarm.html'
+    path.write_text('<div>alarma nueva</div>', encoding='utf-8')
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+    assets.scan()
+    assert bundle.version != version
+    assert payload(bundle.get())['components']['alarm'] == '<div>alarma nueva</div>'
+
+
+def test_components_endpoint(client):
+    from app.main import component_bundle
+    response = client.get('/api/components')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    assert sorted(response.get_json()['components']) == component_bundle.names()
+
+    cached = client.get(f'/api/components?v={component_bundle.version}')
+    assert cached.headers['Cache-Control'].endswith('immutable')
+    assert client.get('/api/components', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+
+    missing = client.get('/api/components?names=nope')
+    assert missing.status_code == 404
+    assert missing.get_json()['unknown'] == ['nope']
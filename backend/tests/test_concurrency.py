@@ -0,0 +1,123 @@
+"""Lectores y escritores concurrentes sobre el almacenamiento de alarmas"""
+
+import random
+import threading
+import time
+
+from app import storage
+
+DURATION = 1.0
+INITIAL = 2000
+
+
+def _time_of(n):
+    return f'{n // 60 % 24:02d}:{n % 60:02d}'
+
+
+def _writer(seed, own_ids, stop, errors):
+    """Altas, ediciones y borrados de sus propias alarmas; label siempre igual a time"""
+    rng = random.Random(seed)
+    try:
+        while not stop.is_set():
+            roll = rng.random()
+            if roll < 0.4 or not own_ids:
+                value = _time_of(rng.randrange(1440))
+                alarm = {'id': storage.new_alarm_id(), 'time': value, 'label': value, 'active': True}
+                storage.add_alarm(alarm)
+                own_ids.append(alarm['id'])
+            elif roll < 0.8:
+                value = _time_of(rng.randrange(1440))
+                alarm_id = rng.choice(own_ids)
+                assert storage.update_alarm(alarm_id, {'time': value, 'label': value,
+                                                       'active': rng.random() < 0.8})
+            else:
+                alarm_id = own_ids.pop(rng.randrange(len(own_ids)))
+                assert storage.delete_alarm(alarm_id)
+    except Exception as e:  # pragma: no cover - se informa en el hilo principal
+        errors.append(e)
+
+
+def _reader(seed, stop, errors, reads):
+    rng = random.Random(seed)
+    try:
+        while not stop.is_set():
+            alarms = storage.get_alarms()
+            ids = [alarm['id'] for alarm in alarms]
+            assert len(ids) == len(set(ids)), 'IDs repetidos en el snapshot'
+            for alarm in alarms:
+                # Una edición nunca se ve a medias
+                assert alarm['label'] == alarm['time'], alarm
+            minute = rng.randrange(1440)
+            for alarm in storage.get_upcoming_alarms(minute, 20):
+                assert alarm is not None and alarm['label'] == alarm['time']
+            for alarm in storage.get_alarms_between(minute, (minute + 30) % 1440):
+                assert alarm is not None and alarm['label'] == alarm['time']
+            streamed = [alarm['id'] for alarm in storage.iter_alarms()]
+            assert len(streamed) == len(set(streamed)), 'IDs repetidos en el stream'
+            page, _ = storage.get_alarms_page(limit=50)
+            assert all(alarm['label'] == alarm['time'] for alarm in page)
+            assert storage.get_alarms_count() >= 0
+            reads.append(1)
+    except Exception as e:  # pragma: no cover - se informa en el hilo principal
+        errors.append(e)
+
+
+def test_concurrent_readers_and_writers():
+    owned = [[], []]
+    for i in range(INITIAL):
+        value = _time_of(i)
+        alarm = {'id': storage.new_alarm_id(), 'time': value, 'label': value, 'active': True}
+        storage.add_alarm(alarm)
+        owned[i % 2].append(alarm['id'])
+
+    stop = threading.Event()
+    errors, reads = [], []
+    threads = [threading.Thread(target=_writer, args=(seed, owned[seed], stop, errors)) for seed in (0, 1)]
+    threads += [threading.Thread(target=_reader, args=(seed, stop, errors, reads)) for seed in (2, 3, 4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert reads
+    # Al terminar, la lista, el índice por hora y los IDs de los escritores coinciden
+    expected = set(owned[0]) | set(owned[1])
+    alarms = storage.get_alarms()
+    assert {alarm['id'] for alarm in alarms} == expected
+    active = {alarm['id'] for alarm in alarms if alarm['active']}
+    assert set(storage.time_index.upcoming(0, len(alarms) + 1)) == active
+
+
+def _add_many(count):
+    ids = []
+    for i in range(count):
+        alarm = {'id': storage.new_alarm_id(), 'time': _time_of(i), 'label': _time_of(i), 'active': True}
+        storage.add_alarm(alarm)
+        ids.append(alarm['id'])
+    return ids
+
+
+def test_stream_resumes_after_its_cursor_is_deleted():
+    ids = _add_many(storage.ITER_CHUNK * 2 + 10)
+    stream = storage.iter_alarms()
+    first = [next(stream)['id'] for _ in range(storage.ITER_CHUNK)]
+    assert first == ids[:storage.ITER_CHUNK]
+    # Borrar el último enviado y el siguiente, y añadir al final
+    storage.delete_alarm(ids[storage.ITER_CHUNK - 1])
+    storage.delete_alarm(ids[storage.ITER_CHUNK])
+    added = _add_many(1)
+    rest = [alarm['id'] for alarm in stream]
+    assert rest == ids[storage.ITER_CHUNK + 1:] + added
+
+
+def test_stream_ends_when_everything_is_deleted():
+    ids = _add_many(storage.ITER_CHUNK + 5)
+    stream = storage.iter_alarms()
+    for _ in range(storage.ITER_CHUNK):
+        next(stream)
+    for alarm_id in ids:
+        storage.delete_alarm(alarm_id)
+    assert list(stream) == []
@@ -0,0 +1,64 @@
+"""POST /api/envclock/batch"""
+
+import threading
+
+import pytest
+
+from app import utils
+from app.config import Config
+
+
+@pytest.fixture
+def weather_calls(monkeypatch):
+    """Sustituye el clima por datos fijos y registra las ciudades consultadas"""
+    calls = []
+    lock = threading.Lock()
+
+    def fake_weather(city):
+        with lock:
+            calls.append(city)
+        return {
+            'weather': 'soleado', 'weather_emoji': '☀️', 'description': 'prueba',
+            'temperature': '20°C', 'humidity': '50%', 'wind_speed': '5 km/h',
+            'success': True
+        }
+
+    monkeypatch.setattr(utils, 'get_weather_data', fake_weather)
+    monkeypatch.setattr(Config, 'ENV_TIME_VERIFY', False)
+    return calls
+
+
+def test_batch_deduplicates_and_keeps_order(client, weather_calls):
+    response = client.post('/api/envclock/batch',
+                           json={'cities': ['Tokyo', ' madrid ', 'tokyo', '', 7, 'Madrid']})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert [result['city'] for result in body['results']] == ['Tokyo', 'madrid']
+    assert body['results'][0]['timezone'] == 'Asia/Tokyo'
+    assert sorted(weather_calls) == ['Tokyo', 'madrid']
+
+
+@pytest.mark.parametrize('body', [None, [], ['Madrid'], 'Madrid', 3, {}, {'cities': 'Madrid'}])
+def test_batch_rejects_malformed_bodies(client, weather_calls, body):
+    response = client.post('/api/envclock/batch', json=body)
+    assert response.status_code == 400
+    assert weather_calls == []
+
+
+def test_batch_rejects_invalid_json(client, weather_calls):
+    response = client.post('/api/envclock/batch', data='{', content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_batch_limit(client, weather_calls, monkeypatch):
+    monkeypatch.setattr(Config, 'ENV_BATCH_LIMIT', 2)
+    response = client.post('/api/envclock/batch', json={'cities': ['A', 'B', 'C']})
+    assert response.status_code == 413
+    # Las repetidas no cuentan para el límite
+    response = client.post('/api/envclock/batch', json={'cities': ['A', 'a', 'B']})
+    assert response.status_code == 200
+
+
+def test_blank_city_uses_default(weather_calls):
+    assert utils.get_env_data('   ')['city'] == 'Madrid'
@@ -0,0 +1,84 @@
+"""Difusión de eventos SSE: codificación, suscripciones y tickers"""
+
+import json
+
+from app.events import EventHub, Subscription, encode_event
+
+
+def _decode(message):
+    event, data = message.decode('utf-8').strip().split('\n')
+    return event[len('event: '):], json.loads(data[len('data: '):])
+
+
+def test_encode_event():
+    message = encode_event('worldclock', {'ciudad': 'Málaga'})
+    assert message.endswith(b'\n\n')
+    assert _decode(message) == ('worldclock', {'ciudad': 'Málaga'})
+
+
+def test_slow_subscriber_drops_oldest():
+    sub = Subscription(['t'], maxsize=2)
+    for i in range(3):
+        sub.put(i)
+    assert [sub.get(0), sub.get(0), sub.get(0)] == [1, 2, None]
+
+
+def test_publish_reaches_only_subscribed_topics():
+    hub = EventHub()
+    clock = hub.subscribe(['worldclock'])
+    watch = hub.subscribe(['stopwatch:a'])
+    hub.publish('worldclock', {'n': 1})
+    assert _decode(clock.get(1)) == ('worldclock', {'n': 1})
+    assert watch.get(0) is None
+    assert hub.subscriber_count() == 2
+    assert hub.subscriber_count('stopwatch:a') == 1
+    hub.unsubscribe(watch)
+    assert hub.subscriber_count() == 1
+
+
+def test_new_subscriber_gets_last_state():
+    hub = EventHub()
+    hub.publish('stopwatch', {'elapsed': 5})
+    sub = hub.subscribe(['stopwatch'])
+    assert _decode(sub.get(1)) == ('stopwatch', {'elapsed': 5})
+
+
+def test_ticker_publishes_periodically():
+    hub = EventHub()
+    calls = []
+
+    def producer():
+        calls.append(1)
+        return {'n': len(calls)}
+
+    hub.add_ticker('worldclock', producer, interval=0.05)
+    sub = hub.subscribe(['worldclock'])
+    first = _decode(sub.get(2))
+    second = _decode(sub.get(2))
+    assert first == ('worldclock', {'n': 1})
+    assert second[1]['n'] > 1
+
+
+def test_failing_producer_keeps_ticker_alive():
+    hub = EventHub()
+    calls = []
+
+    def producer():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError('proveedor caído')
+        return {'n': len(calls)}
+
+    hub.add_ticker('worldclock', producer, interval=0.05)
+    sub = hub.subscribe(['worldclock'])
+    assert _decode(sub.get(2)) == ('worldclock', {'n': 2})
+
+
+def test_stream_endpoint(client):
+    response = client.get('/api/events/?topics=worldclock,nope')
+    assert response.mimetype == 'text/event-stream'
+    chunks = response.response
+    assert next(chunks) == b'retry: 3000\n\n'
+    event, payload = _decode(next(chunks))
+    assert event == 'worldclock'
+    response.close()
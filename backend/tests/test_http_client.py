@@ -0,0 +1,63 @@
+"""Sesión HTTP compartida y su política de reintentos"""
+
+import socket
+import threading
+
+import pytest
+import requests
+
+from app import http_client
+
+
+@pytest.fixture
+def silent_server():
+    """Servidor que acepta conexiones y nunca responde; cuenta las conexiones"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(8)
+    server.settimeout(0.1)
+    accepted = []
+    stop = threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            accepted.append(conn)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.getsockname()[1]}/', accepted
+    stop.set()
+    thread.join(5)
+    for conn in accepted:
+        conn.close()
+    server.close()
+
+
+def test_retry_policy():
+    session = http_client.build_session(retries=3, backoff=0)
+    retry = session.get_adapter('https://example.com').max_retries
+    assert retry.total == 3
+    assert retry.read == 0
+    assert 503 in retry.status_forcelist
+    assert retry.allowed_methods == frozenset(['GET'])
+
+
+def test_read_timeout_is_not_retried(silent_server):
+    url, accepted = silent_server
+    session = http_client.build_session(retries=3, backoff=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(url, timeout=(1, 0.2))
+    session.close()
+    assert len(accepted) == 1
+
+
+def test_shared_session_is_reused():
+    http_client.close_session()
+    try:
+        assert http_client.get_session() is http_client.get_session()
+    finally:
+        http_client.close_session()
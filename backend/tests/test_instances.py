@@ -0,0 +1,124 @@
+"""Cronómetros y temporizadores con nombre: borrar y volver a crear, IDs desconocidos, límite"""
+
+import pytest
+
+from app import instances
+from app.api import stopwatch as stopwatch_api
+from app.api import timer as timer_api
+from app.instances import (DEFAULT_ID, InstanceLimitError, SharedStopwatchRegistry, SharedTimerRegistry,
+                           StopwatchRegistry, TimerRegistry, UnknownInstanceError)
+from app.shared_state import SharedStore
+
+
+class FakeClock:
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock(1000.0)
+    monkeypatch.setattr(instances.time, 'monotonic', clock)
+    monkeypatch.setattr(instances.time, 'time', clock)
+    monkeypatch.setattr(instances.time, 'time_ns', lambda: int(clock.now * 1e9))
+    return clock
+
+
+@pytest.fixture(params=['memory', 'shared'])
+def store(request, tmp_path):
+    """None para los registros en memoria, un SharedStore para los compartidos"""
+    if request.param == 'memory':
+        yield None
+        return
+    store = SharedStore(str(tmp_path / 'shared.sqlite3'))
+    yield store
+    store.connection().close()
+
+
+def _timers(store, **kwargs):
+    return TimerRegistry(**kwargs) if store is None else SharedTimerRegistry(store, **kwargs)
+
+
+def _stopwatches(store, **kwargs):
+    return StopwatchRegistry(**kwargs) if store is None else SharedStopwatchRegistry(store, **kwargs)
+
+
+@pytest.fixture
+def timers(store):
+    return _timers(store)
+
+
+def test_delete_and_recreate_ignores_old_deadline(timers, clock):
+    timers.start('té', 5)
+    assert timers.delete('té')
+    timers.start('té', 60)
+    clock.now += 10
+    # El vencimiento del temporizador borrado no afecta al nuevo
+    assert timers.expired() == []
+    assert timers.snapshot('té')['running'] is True
+    clock.now += 60
+    events = timers.expired()
+    assert [(event['id'], event['duration']) for event in events] == [('té', 60)]
+    assert timers.snapshot('té')['running'] is False
+
+
+def test_restart_reports_single_expiry(timers, clock):
+    timers.start('a', 5)
+    timers.stop('a')
+    timers.start('a', 5)
+    clock.now += 6
+    assert [event['id'] for event in timers.expired()] == ['a']
+
+
+def test_unknown_named_timer(timers, clock):
+    with pytest.raises(UnknownInstanceError):
+        timers.snapshot('nadie')
+    with pytest.raises(UnknownInstanceError):
+        timers.stop('nadie')
+    assert timers.delete('nadie') is False
+    # El temporizador por defecto existe siempre
+    assert timers.snapshot(DEFAULT_ID)['running'] is False
+
+
+def test_timer_api_delete_and_recreate(client):
+    assert client.post('/api/timer/cocina/start', json={'duration': 60}).status_code == 200
+    assert client.delete('/api/timer/cocina/').status_code == 204
+    assert client.get('/api/timer/cocina/').status_code == 404
+    assert client.post('/api/timer/cocina/stop').status_code == 404
+    response = client.post('/api/timer/cocina/start', json={'duration': 30})
+    assert response.status_code == 200
+    assert response.get_json()['running'] is True
+    assert client.delete('/api/timer/cocina/').status_code == 204
+
+
+@pytest.mark.parametrize('make', [_timers, _stopwatches])
+def test_named_instance_limit(store, make):
+    registry = make(store, max_instances=2)
+    registry.snapshot(DEFAULT_ID)
+    registry.start('a')
+    registry.start('b')
+    # Volver a arrancar una existente o usar 'default' no cuenta
+    registry.start('a')
+    registry.start(DEFAULT_ID)
+    with pytest.raises(InstanceLimitError):
+        registry.start('c')
+    assert registry.delete('b')
+    registry.start('c')
+
+
+def test_instance_limit_endpoints(client, monkeypatch):
+    monkeypatch.setattr(stopwatch_api.stopwatches, 'max_instances', 1)
+    monkeypatch.setattr(timer_api.timers, 'max_instances', 1)
+    try:
+        assert client.post('/api/stopwatch/uno/start').status_code == 200
+        response = client.post('/api/stopwatch/dos/start')
+        assert response.status_code == 429
+        assert 'error' in response.get_json()
+        assert client.post('/api/timer/uno/start', json={'duration': 5}).status_code == 200
+        assert client.post('/api/timer/dos/start', json={'duration': 5}).status_code == 429
+    finally:
+        client.delete('/api/stopwatch/uno/')
+        client.delete('/api/timer/uno/')
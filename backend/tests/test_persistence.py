@@ -0,0 +1,83 @@
+"""Log JSON Lines de alarmas: reproducción sobre el snapshot, escritura y compactación"""
+
+import os
+
+from app.binary_snapshot import write_snapshot
+from app.persistence import AlarmLog, _dumps
+
+
+def _load(directory):
+    """Estado resultante de reproducir snapshot + log (id -> alarma)"""
+    state = {}
+
+    def apply(op):
+        if op['op'] == 'add':
+            state[op['alarm']['id']] = dict(op['alarm'])
+        elif op['op'] == 'update' and op['id'] in state:
+            state[op['id']].update(op['data'])
+        elif op['op'] == 'delete':
+            state.pop(op['id'], None)
+
+    stats = AlarmLog(directory, lambda: ()).load(apply)
+    return state, stats
+
+
+def test_log_tail_applies_over_snapshot(tmp_path):
+    log = AlarmLog(str(tmp_path), lambda: ())
+    write_snapshot(log.snapshot_path, [
+        {'id': 1, 'time': '07:00', 'label': 'a', 'active': True},
+        {'id': 2, 'time': '08:00', 'label': 'b', 'active': True},
+    ])
+    with open(log.log_path, 'w', encoding='utf-8') as f:
+        f.write(_dumps({'op': 'add', 'alarm': {'id': 3, 'time': '09:00', 'label': 'c', 'active': True}}) + '\n')
+        f.write(_dumps({'op': 'update', 'id': 1, 'data': {'id': 1, 'time': '07:15',
+                                                         'label': 'a2', 'active': False}}) + '\n')
+        f.write(_dumps({'op': 'delete', 'id': 2}) + '\n')
+        f.write('{"op": "add", "alarm": {"id"')  # Escritura interrumpida
+
+    state, stats = _load(str(tmp_path))
+    assert stats['snapshot_alarms'] == 2
+    assert stats['log_ops'] == 3
+    assert state == {
+        1: {'id': 1, 'time': '07:15', 'label': 'a2', 'active': False},
+        3: {'id': 3, 'time': '09:00', 'label': 'c', 'active': True},
+    }
+
+
+def test_append_and_compact_round_trip(tmp_path):
+    state = {}
+    log = AlarmLog(str(tmp_path), lambda: list(state.values()), compact_every=3)
+    log.start()
+    try:
+        for alarm_id in (1, 2, 3, 4):
+            alarm = {'id': alarm_id, 'time': f'0{alarm_id}:00', 'label': f'n{alarm_id}', 'active': True}
+            state[alarm_id] = alarm
+            log.append({'op': 'add', 'alarm': alarm})
+            log.flush()
+    finally:
+        log.close()
+
+    loaded, stats = _load(str(tmp_path))
+    assert loaded == state
+    # Tras compactar, el snapshot tiene las 3 primeras y el log solo la última
+    assert stats['snapshot_alarms'] == 3
+    assert stats['log_ops'] == 1
+
+
+def test_compact_failure_keeps_log(tmp_path):
+    bad = [{'id': 'x', 'time': '07:00', 'label': '', 'active': True}]
+    log = AlarmLog(str(tmp_path), lambda: bad, compact_every=1)
+    log.start()
+    try:
+        log.append({'op': 'add', 'alarm': {'id': 1, 'time': '07:00', 'label': '', 'active': True}})
+        log.flush()
+        # El escritor sigue vivo después del fallo
+        log.append({'op': 'add', 'alarm': {'id': 2, 'time': '08:00', 'label': '', 'active': True}})
+        log.flush()
+    finally:
+        log.close()
+
+    loaded, stats = _load(str(tmp_path))
+    assert sorted(loaded) == [1, 2]
+    assert stats['snapshot_alarms'] == 0
+    assert not os.path.exists(log.snapshot_path)
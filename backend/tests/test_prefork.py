@@ -0,0 +1,48 @@
+"""Supervisión de workers del servidor pre-fork"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from app import prefork
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_respawn_delay_grows_up_to_cap(monkeypatch):
+    monkeypatch.setattr(prefork, 'RESPAWN_DELAY', 1.0)
+    monkeypatch.setattr(prefork, 'RESPAWN_MAX_DELAY', 5.0)
+    assert [prefork.respawn_delay(n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+def run_serve(worker_body):
+    """Ejecuta serve() en otro proceso con un worker de prueba y sin estado compartido"""
+    script = textwrap.dedent('''
+        import sys
+        from app import prefork
+
+        def worker(index, host, port, fd):
+        {body}
+
+        prefork._run_worker = worker
+        prefork._prepare_shared_state = lambda: None
+        prefork._release_shared_state = lambda: None
+        prefork.RESPAWN_DELAY = 0.01
+        prefork.MAX_CRASHES = 3
+        sys.exit(prefork.serve('127.0.0.1', 0, 2))
+    ''').format(body=textwrap.indent(textwrap.dedent(worker_body), '    '))
+    return subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR,
+                          capture_output=True, text=True, timeout=60)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requiere os.fork')
+def test_crashing_workers_report_and_give_up():
+    result = run_serve("raise RuntimeError('worker roto')")
+    assert result.returncode == 1
+    # Cada caída deja su traza y sale con código 1
+    assert result.stderr.count("RuntimeError: worker roto") == 6
+    assert result.stdout.count("terminó con código 1; relanzando") == 4
+    assert result.stdout.count("no se relanza") == 2
@@ -0,0 +1,63 @@
+"""Buffer circular de vueltas del cronómetro"""
+
+import pytest
+
+from app.ring_buffer import NS_PER_SECOND, LapRingBuffer
+
+
+def test_append_describes_lap():
+    buffer = LapRingBuffer(3)
+    assert buffer.append(2 * NS_PER_SECOND) == {'lap': 1, 'split': 2.0, 'lap_time': 2.0}
+    assert buffer.append(5 * NS_PER_SECOND) == {'lap': 2, 'split': 5.0, 'lap_time': 3.0}
+
+
+def test_overwrites_oldest_and_keeps_lap_times():
+    buffer = LapRingBuffer(3)
+    for second in (1, 3, 6, 10, 15):
+        buffer.append(second * NS_PER_SECOND)
+    assert len(buffer) == 3
+    assert buffer.total == 5
+    laps = buffer.page(0, 10)
+    assert [lap['lap'] for lap in laps] == [3, 4, 5]
+    # La vuelta más antigua retenida conserva su tiempo de vuelta real
+    assert [lap['lap_time'] for lap in laps] == [3.0, 4.0, 5.0]
+
+
+def test_page_offsets():
+    buffer = LapRingBuffer(4)
+    for second in range(1, 7):
+        buffer.append(second * NS_PER_SECOND)
+    assert [lap['lap'] for lap in buffer.page(1, 2)] == [4, 5]
+    assert buffer.page(10, 5) == []
+    assert buffer.page(-3, 1) == buffer.page(0, 1)
+    assert buffer.page(0, -1) == []
+
+
+def test_clear():
+    buffer = LapRingBuffer(2)
+    buffer.append(NS_PER_SECOND)
+    buffer.clear()
+    assert len(buffer) == 0 and buffer.total == 0
+    assert buffer.append(4 * NS_PER_SECOND)['lap_time'] == 4.0
+
+
+def test_rejects_non_positive_capacity():
+    with pytest.raises(ValueError):
+        LapRingBuffer(0)
+
+
+def test_lap_endpoints(client):
+    assert client.post('/api/stopwatch/vueltas/lap').status_code == 404
+    client.post('/api/stopwatch/vueltas/start')
+    try:
+        first = client.post('/api/stopwatch/vueltas/lap')
+        assert first.status_code == 201
+        assert first.get_json()['lap'] == 1
+        client.post('/api/stopwatch/vueltas/lap')
+        page = client.get('/api/stopwatch/vueltas/laps?offset=1&limit=5').get_json()
+        assert [lap['lap'] for lap in page['laps']] == [2]
+        assert page['total'] == 2
+        client.post('/api/stopwatch/vueltas/stop')
+        assert client.post('/api/stopwatch/vueltas/lap').status_code == 409
+    finally:
+        client.delete('/api/stopwatch/vueltas/')
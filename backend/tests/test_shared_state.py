@@ -0,0 +1,54 @@
+"""Almacén SQLite compartido y traspaso de alarmas con el log JSON Lines"""
+
+import os
+
+import pytest
+
+from app.persistence import AlarmLog
+from app.shared_state import SharedStore, export_alarm_log, import_alarm_log, reclaim_alarm_log
+
+ALARM = {'id': 1, 'time': '07:30', 'label': 'Despertar', 'enabled': True}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SharedStore(str(tmp_path / 'shared.sqlite3'))
+    yield store
+    store.connection().close()
+
+
+def test_store_without_marker_belongs_to_log(store):
+    store.replace_alarms([ALARM])
+    assert store.alarms_owner() == 'log'
+
+
+def test_reopening_keeps_running_stopwatches(store):
+    store.connection().execute(
+        "INSERT INTO stopwatches (id, running, start) VALUES ('sw', 1, 123)")
+    reopened = SharedStore(store.path)
+    row = reopened.connection().execute(
+        "SELECT running, start FROM stopwatches WHERE id = 'sw'").fetchone()
+    assert row == (1, 123)
+    reopened.connection().close()
+
+
+def test_import_and_export_round_trip(tmp_path, store):
+    directory = str(tmp_path / 'alarms')
+    log = AlarmLog(directory, lambda: ())
+    log.start()
+    log.append({'op': 'add', 'alarm': ALARM})
+    log.close()
+
+    assert import_alarm_log(store, directory) == 1
+    assert store.alarms_owner() == 'shared'
+    # Ya importadas: un segundo arranque no las vuelve a copiar
+    assert import_alarm_log(store, directory) == 0
+
+    assert export_alarm_log(store, directory) == 1
+    assert store.alarms_owner() == 'log'
+    assert export_alarm_log(store, directory) is None
+    assert os.path.getsize(AlarmLog(directory, lambda: ()).log_path) == 0
+
+
+def test_reclaim_without_store_is_noop(tmp_path):
+    assert reclaim_alarm_log(str(tmp_path / 'missing.sqlite3'), str(tmp_path)) is None
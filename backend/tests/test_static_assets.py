@@ -0,0 +1,123 @@
+"""Archivos estáticos servidos desde memoria"""
+
+import gzip
+import os
+import time
+
+import pytest
+from flask import Flask
+
+from app.static_assets import StaticAssets
+
+SCRIPT = b'console.log("reloj");\n' * 100
+
+
+@pytest.fixture
+def public(tmp_path):
+    (tmp_path / 'index.html').write_bytes(b'<html>reloj</html>')
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_bytes(SCRIPT)
+    (tmp_path / 'js' / 'app.3f9c2a1b.js').write_bytes(b'fingerprinted')
+    (tmp_path / 'logo.png').write_bytes(b'\x89PNG' + b'\x00' * 2000)
+    return tmp_path
+
+
+def make_client(assets):
+    app = Flask(__name__)
+
+    @app.route('/', defaults={'path': None})
+    @app.route('/<path:path>')
+    def serve(path):
+        return assets.response(path)
+
+    return app.test_client()
+
+
+def touch(path, data):
+    path.write_bytes(data)
+    # Asegurar un mtime distinto aunque el sistema de archivos sea de baja resolución
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+
+def test_serves_from_memory_with_etag(public):
+    assets = StaticAssets(public)
+    client = make_client(assets)
+    response = client.get('/js/app.js')
+    assert response.status_code == 200
+    assert response.data == SCRIPT
+    assert response.mimetype == 'application/javascript'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    etag = response.headers['ETag']
+
+    again = client.get('/js/app.js', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.data == b''
+    assert assets.stats()['not_modified'] == 1
+
+
+def test_gzip_variant_has_its_own_etag(public):
+    assets = StaticAssets(public)
+    client = make_client(assets)
+    plain = client.get('/js/app.js')
+    compressed = client.get('/js/app.js', headers={'Accept-Encoding': 'gzip'})
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert compressed.headers['Vary'] == 'Accept-Encoding'
+    assert gzip.decompress(compressed.data) == SCRIPT
+    assert compressed.headers['ETag'] != plain.headers['ETag']
+    # Las imágenes ya comprimidas no tienen variante gzip
+    image = client.get('/logo.png', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in image.headers
+    assert assets.stats()['gzip_files'] == 1
+
+
+def test_fingerprinted_assets_are_immutable(public):
+    assets = StaticAssets(public, immutable_max_age=60)
+    client = make_client(assets)
+    assert client.get('/js/app.3f9c2a1b.js').headers['Cache-Control'] == 'public, max-age=60, immutable'
+    digest = assets.get('js/app.js').digest
+    assert client.get(f'/js/app.js?v={digest[:8]}').headers['Cache-Control'].endswith('immutable')
+    assert client.get('/js/app.js?v=deadbeef').headers['Cache-Control'] == 'no-cache'
+
+
+def test_unknown_paths_fall_back_to_index(public):
+    client = make_client(StaticAssets(public))
+    response = client.get('/alarmas/editar/3')
+    assert response.status_code == 200 and response.data == b'<html>reloj</html>'
+    assert client.get('/').data == b'<html>reloj</html>'
+
+
+def test_not_found_without_index(tmp_path):
+    client = make_client(StaticAssets(tmp_path))
+    assert client.get('/cualquiera').status_code == 404
+
+
+def test_files_over_budget_are_served_from_disk(public):
+    assets = StaticAssets(public, max_file_size=1024)
+    assert assets.get('js/app.js').body is None
+    client = make_client(assets)
+    response = client.get('/js/app.js')
+    assert response.data == SCRIPT
+    assert response.headers['ETag'] == f'"{assets.get("js/app.js").etag}"'
+    # app.js (2200 bytes) y logo.png (2004 bytes) quedan en disco
+    assert assets.stats()['in_memory'] == 2
+
+
+def test_scan_reloads_only_changed_files(public):
+    assets = StaticAssets(public)
+    unchanged = assets.get('logo.png')
+    touch(public / 'index.html', b'<html>nuevo</html>')
+    (public / 'js' / 'app.3f9c2a1b.js').unlink()
+    assert assets.scan() == 1
+    assert assets.get('logo.png') is unchanged
+    assert assets.get('index.html').read() == b'<html>nuevo</html>'
+    assert assets.get('js/app.3f9c2a1b.js') is None
+    assert set(assets.under('js/')) == {'js/app.js'}
+
+
+def test_background_watcher_picks_up_changes(public):
+    assets = StaticAssets(public, check_interval=0.01)
+    touch(public / 'index.html', b'<html>nuevo</html>')
+    deadline = time.monotonic() + 5
+    while assets.get('index.html').read() != b'<html>nuevo</html>' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert assets.get('index.html').read() == b'<html>nuevo</html>'
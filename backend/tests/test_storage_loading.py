@@ -0,0 +1,70 @@
+"""Carga de las alarmas guardadas: lecturas durante la carga y fallos de reproducción"""
+
+import threading
+
+import pytest
+
+from app import storage
+from app.binary_snapshot import write_snapshot
+from app.persistence import AlarmLog, _dumps
+
+ALARMS = [
+    {'id': 1, 'time': '07:00', 'label': 'a', 'active': True},
+    {'id': 2, 'time': '08:00', 'label': 'b', 'active': True},
+    {'id': 3, 'time': '22:00', 'label': 'c', 'active': False},
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    log = AlarmLog(str(tmp_path), lambda: ())
+    write_snapshot(log.snapshot_path, ALARMS[:2])
+    with open(log.log_path, 'w', encoding='utf-8') as f:
+        f.write(_dumps({'op': 'add', 'alarm': ALARMS[2]}) + '\n')
+    yield str(tmp_path)
+    # Dejar el almacenamiento como lo encontró el resto de pruebas
+    storage._loaded.wait(5)
+    if storage.alarm_log is not None:
+        storage.alarm_log.close()
+        storage.alarm_log = None
+    storage.scheduler.before_tick = None
+
+
+def test_reads_are_served_from_snapshot_while_loading(data_dir, monkeypatch):
+    release = threading.Event()
+    replay = storage._replay
+
+    def slow_replay(op):
+        release.wait(5)
+        replay(op)
+
+    monkeypatch.setattr(storage, '_replay', slow_replay)
+    assert storage.enable_persistence(data_dir, background=True) is None
+    try:
+        assert storage.is_loading()
+        assert storage.get_alarms() == ALARMS
+        assert storage.get_alarms_count() == 3
+        assert storage.get_alarms_page(1, 1) == ([ALARMS[1]], 2)
+        assert storage.get_alarms_page(99, 1) is None
+        assert storage.get_alarm_by_id(2) == ALARMS[1]
+        assert storage.get_alarm_by_id(99) is None
+        assert storage.get_upcoming_alarms(0, 5) == ALARMS[:2]
+        assert storage.get_alarms_between(7 * 60, 7 * 60) == [ALARMS[0]]
+        assert storage.get_due_alarms(8 * 60) == [ALARMS[1]]
+    finally:
+        release.set()
+    assert storage._loaded.wait(5)
+    assert storage.get_alarms() == ALARMS
+    assert storage.get_alarm_by_id(2) == ALARMS[1]
+    assert storage.get_due_alarms(8 * 60) == [ALARMS[1]]
+
+
+def test_failed_replay_does_not_activate_the_log(data_dir, monkeypatch):
+    def broken_replay(op):
+        raise KeyError('alarm')
+
+    monkeypatch.setattr(storage, '_replay', broken_replay)
+    with pytest.raises(KeyError):
+        storage.enable_persistence(data_dir)
+    assert storage.alarm_log is None
+    assert not storage.is_loading()
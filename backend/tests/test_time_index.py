@@ -0,0 +1,99 @@
+"""Índice ordenado por hora del día: próximas alarmas y rangos"""
+
+import random
+
+import pytest
+
+from app import time_index as time_index_module
+from app.time_index import AlarmTimeIndex
+
+
+def _alarm(alarm_id, value, active=True):
+    return {'id': alarm_id, 'time': value, 'active': active}
+
+
+@pytest.fixture
+def index():
+    index = AlarmTimeIndex()
+    index.rebuild([
+        _alarm(1, '07:00'),
+        _alarm(2, '07:00'),
+        _alarm(3, '12:30'),
+        _alarm(4, '23:45'),
+        _alarm(5, '09:00', active=False),
+        _alarm(6, 'sin hora'),
+    ])
+    return index
+
+
+def test_rebuild_skips_inactive_and_invalid(index):
+    assert len(index) == 4
+
+
+def test_upcoming_wraps_past_midnight(index):
+    assert index.upcoming(8 * 60, 10) == [3, 4, 1, 2]
+    assert index.upcoming(23 * 60 + 50, 2) == [1, 2]
+    # Las del mismo minuto quedan al final: sonarán mañana
+    assert index.upcoming(7 * 60, 4) == [3, 4, 1, 2]
+    assert index.upcoming(0, 0) == []
+
+
+def test_between_inclusive_and_across_midnight(index):
+    assert index.between(7 * 60, 12 * 60 + 30) == [1, 2, 3]
+    assert index.between(23 * 60, 7 * 60) == [4, 1, 2]
+    assert index.between(13 * 60, 14 * 60) == []
+
+
+def test_add_reindexes_and_remove(index):
+    index.add(_alarm(3, '06:00'))
+    index.add(_alarm(1, '07:00', active=False))
+    index.remove(4)
+    index.remove(99)
+    assert index.upcoming(0, 10) == [3, 2]
+    assert len(index) == 2
+
+
+def test_matches_sorted_reference(monkeypatch):
+    # Trozos pequeños para ejercitar las particiones y los trozos vacíos
+    monkeypatch.setattr(time_index_module, 'CHUNK_SIZE', 4)
+    rng = random.Random(7)
+    index = AlarmTimeIndex()
+    reference = {}
+    for _ in range(3000):
+        alarm_id = rng.randrange(200)
+        if rng.random() < 0.3:
+            index.remove(alarm_id)
+            reference.pop(alarm_id, None)
+            continue
+        minute = rng.randrange(1440)
+        active = rng.random() < 0.9
+        index.add(_alarm(alarm_id, f'{minute // 60:02d}:{minute % 60:02d}', active))
+        if active:
+            reference[alarm_id] = minute
+        else:
+            reference.pop(alarm_id, None)
+
+        probe = rng.randrange(1440)
+        ordered = sorted((minute, alarm_id) for alarm_id, minute in reference.items())
+        after = [key[1] for key in ordered if key[0] > probe] + \
+                [key[1] for key in ordered if key[0] <= probe]
+        assert index.upcoming(probe, 5) == after[:5]
+        start, end = probe, (probe + 90) % 1440
+        if start <= end:
+            expected = [key[1] for key in ordered if start <= key[0] <= end]
+        else:
+            expected = [key[1] for key in ordered if key[0] >= start] + \
+                       [key[1] for key in ordered if key[0] <= end]
+        assert index.between(start, end) == expected
+    assert len(index) == len(reference)
+
+
+def test_upcoming_and_range_endpoints(client):
+    for value in ('06:00', '22:30', '01:15'):
+        assert client.post('/api/alarms/', json={'time': value}).status_code == 201
+    upcoming = client.get('/api/alarms/upcoming?from=22:00&limit=2').get_json()
+    assert [alarm['time'] for alarm in upcoming] == ['22:30', '01:15']
+    in_range = client.get('/api/alarms/range?start=22:00&end=02:00').get_json()
+    assert [alarm['time'] for alarm in in_range] == ['22:30', '01:15']
+    assert client.get('/api/alarms/range?start=22:00').status_code == 400
+    assert client.get('/api/alarms/upcoming?from=99:99').status_code == 400
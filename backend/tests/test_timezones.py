@@ -0,0 +1,102 @@
+"""Motor de zonas horarias sin red"""
+
+import datetime
+
+import pytest
+
+from app import timezones
+from app.timezones import format_offset_seconds, local_time, resolve_timezone
+
+# 2024-07-01 12:00:00 UTC
+SUMMER = int(datetime.datetime(2024, 7, 1, 12, tzinfo=datetime.timezone.utc).timestamp())
+# 2024-01-15 23:30:00 UTC
+WINTER = int(datetime.datetime(2024, 1, 15, 23, 30, tzinfo=datetime.timezone.utc).timestamp())
+
+
+@pytest.fixture
+def no_tz_database(monkeypatch):
+    """Simula un sistema sin base de datos de zonas ni tzdata"""
+    monkeypatch.setattr(timezones, 'get_zone', lambda name: None)
+    monkeypatch.setattr(timezones, '_tables', {})
+
+
+def test_resolve_timezone():
+    assert resolve_timezone('Madrid') == 'Europe/Madrid'
+    assert resolve_timezone('  tokyo ') == 'Asia/Tokyo'
+    assert resolve_timezone('Europe/Berlin') == 'Europe/Berlin'
+    assert resolve_timezone('Atlántida') is None
+    assert resolve_timezone('') is None
+
+
+def test_local_time_applies_dst():
+    summer = local_time('Madrid', now=SUMMER)
+    assert summer['time'] == '14:00:00' and summer['utc_offset'] == '+02:00'
+    assert summer['is_dst'] is True and summer['success'] is True
+    winter = local_time('Madrid', now=WINTER)
+    assert winter['time'] == '00:30:00' and winter['date'] == '2024-01-16'
+    assert winter['utc_offset'] == '+01:00' and winter['is_dst'] is False
+
+
+def test_local_time_accepts_datetime():
+    now = datetime.datetime.fromtimestamp(SUMMER, datetime.timezone.utc)
+    assert local_time('Tokyo', now=now)['time'] == '21:00:00'
+
+
+def test_unknown_city_uses_utc():
+    result = local_time('Atlántida', now=SUMMER)
+    assert result['timezone'] == 'UTC'
+    assert result['time'] == '12:00:00'
+    assert result['success'] is False
+
+
+def test_without_tz_database_everything_is_utc(no_tz_database):
+    assert resolve_timezone('Madrid') is None
+    result = local_time('Madrid', now=SUMMER)
+    assert result['timezone'] == 'UTC'
+    assert result['time'] == '12:00:00' and result['utc_offset'] == '+00:00'
+    assert result['success'] is False
+
+
+def test_offset_table_for_missing_zone_is_utc(no_tz_database):
+    table = timezones.ZoneOffsets('Europe/Madrid', SUMMER, SUMMER + 86400)
+    assert table.transitions() == [(SUMMER, 0, False)]
+
+
+def test_format_offset_seconds():
+    assert format_offset_seconds(0) == '+00:00'
+    assert format_offset_seconds(19800) == '+05:30'
+    assert format_offset_seconds(-12600) == '-03:30'
+
+
+def utc(*args):
+    return int(datetime.datetime(*args, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def test_offset_table_finds_exact_transitions():
+    table = timezones.ZoneOffsets('Europe/Madrid', utc(2024, 1, 1), utc(2025, 1, 1))
+    assert table.transitions() == [
+        (utc(2024, 1, 1), 3600, False),
+        (utc(2024, 3, 31, 1), 7200, True),
+        (utc(2024, 10, 27, 1), 3600, False),
+    ]
+    assert table.lookup(utc(2024, 3, 31, 1) - 1) == (3600, False)
+    assert table.lookup(utc(2024, 3, 31, 1)) == (7200, True)
+
+
+@pytest.mark.parametrize('name', ['Europe/Madrid', 'America/New_York', 'Australia/Sydney',
+                                  'Asia/Kolkata', 'America/Sao_Paulo', 'UTC'])
+def test_zone_offset_matches_zoneinfo(name):
+    zone = timezones.get_zone(name)
+    for instant in range(SUMMER - 200 * 86400, SUMMER + 200 * 86400, 86400 // 3 + 7):
+        local = datetime.datetime.fromtimestamp(instant, zone)
+        expected = (int(local.utcoffset().total_seconds()), bool(local.dst()))
+        assert timezones.zone_offset(name, instant) == expected
+
+
+def test_offset_table_is_rebuilt_outside_its_range(monkeypatch):
+    monkeypatch.setattr(timezones, '_tables', {})
+    first = timezones.get_offset_table('Europe/Madrid', SUMMER)
+    assert timezones.get_offset_table('Europe/Madrid', SUMMER + 86400) is first
+    later = SUMMER + 2 * timezones.TABLE_SPAN
+    second = timezones.get_offset_table('Europe/Madrid', later)
+    assert second is not first and second.covers(later)
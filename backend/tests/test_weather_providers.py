@@ -0,0 +1,105 @@
+"""Carrera y cobertura (hedge) entre proveedores de clima"""
+
+import threading
+import time
+
+import pytest
+
+from app import utils
+from app.config import Config
+
+
+class FakeProviders:
+    """Proveedores de prueba con retardo y resultado configurables"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def provider(self, name, delay=0.0, success=True, block=False, error=None):
+        def call(city):
+            with self._lock:
+                self.calls.append(name)
+            if block:
+                self.release.wait(5)
+            elif delay:
+                time.sleep(delay)
+            if error is not None:
+                raise error
+            return {'success': success, 'source': name, 'city': city}
+        return call
+
+
+@pytest.fixture
+def fakes(monkeypatch):
+    fake = FakeProviders()
+    monkeypatch.setattr(utils, 'WEATHER_PROVIDERS', {})
+    yield fake
+    fake.release.set()
+
+
+def register(fake, **providers):
+    for name, options in providers.items():
+        utils.WEATHER_PROVIDERS[name] = fake.provider(name, **options)
+
+
+def test_race_returns_fastest_success(fakes):
+    register(fakes, lento={'block': True}, rapido={})
+    result = utils._race_weather_providers('Madrid', ['lento', 'rapido'], 0, 2)
+    assert result['source'] == 'rapido'
+
+
+def test_race_respects_concurrency(fakes):
+    register(fakes, a={'success': False}, b={'success': False}, c={})
+    result = utils._race_weather_providers('Madrid', ['a', 'b', 'c'], 0, 2)
+    assert result['source'] == 'c'
+    # 'c' solo entra cuando uno de los dos primeros termina
+    assert sorted(fakes.calls[:2]) == ['a', 'b']
+
+
+def test_hedge_skips_backup_when_first_answers(fakes):
+    register(fakes, primero={}, respaldo={})
+    result = utils._race_weather_providers('Madrid', ['primero', 'respaldo'], 1.0, 2)
+    assert result['source'] == 'primero'
+    assert fakes.calls == ['primero']
+
+
+def test_hedge_launches_backup_after_delay(fakes):
+    register(fakes, primero={'block': True}, respaldo={})
+    started = time.monotonic()
+    result = utils._race_weather_providers('Madrid', ['primero', 'respaldo'], 0.05, 2)
+    assert result['source'] == 'respaldo'
+    assert time.monotonic() - started >= 0.05
+    assert fakes.calls == ['primero', 'respaldo']
+
+
+def test_hedge_moves_on_immediately_after_failure(fakes):
+    register(fakes, primero={'error': RuntimeError('caído')}, respaldo={})
+    started = time.monotonic()
+    result = utils._race_weather_providers('Madrid', ['primero', 'respaldo'], 5.0, 2)
+    assert result['source'] == 'respaldo'
+    assert time.monotonic() - started < 1.0
+
+
+def test_all_providers_fail(fakes):
+    register(fakes, a={'success': False}, b={'error': RuntimeError('caído')})
+    assert utils._race_weather_providers('Madrid', ['a', 'b'], 0, 2) is None
+    assert utils._race_weather_providers('Madrid', ['a', 'b'], 0.01, 2) is None
+
+
+def test_fetch_falls_back_to_simulated_data(monkeypatch, fakes):
+    register(fakes, a={'success': False})
+    monkeypatch.setattr(Config, 'WEATHER_PROVIDERS', ['a', 'desconocido'])
+    monkeypatch.setattr(Config, 'WEATHER_PROVIDER_MODE', 'race')
+    result = utils.fetch_weather_data('Madrid')
+    assert result['fallback'] is True
+    assert fakes.calls == ['a']
+
+
+def test_sequential_mode_tries_in_order(monkeypatch, fakes):
+    register(fakes, a={'success': False}, b={}, c={})
+    monkeypatch.setattr(Config, 'WEATHER_PROVIDERS', ['a', 'b', 'c'])
+    monkeypatch.setattr(Config, 'WEATHER_PROVIDER_MODE', 'sequential')
+    assert utils.fetch_weather_data('Madrid')['source'] == 'b'
+    assert fakes.calls == ['a', 'b']
@@ -0,0 +1,46 @@
+"""Reloj mundial: respuesta memorizada por segundo y búsqueda de ciudades"""
+
+import json
+
+from app.api import world_clock
+
+
+def test_times_are_memoized_per_second():
+    first = world_clock._times_for_second(1_700_000_000)
+    assert world_clock._times_for_second(1_700_000_000) is first
+    second = world_clock._times_for_second(1_700_000_001)
+    assert second is not first
+    assert second[1]['Tokyo']['time'] == '07:13:21'
+    assert json.loads(second[2]) == second[1]
+
+
+def test_get_times_lists_every_city(client):
+    response = client.get('/api/worldclock/')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert sorted(body) == sorted(world_clock.AVAILABLE_CITIES)
+    assert set(body['Madrid']) == {'time', 'date', 'timezone', 'utc_offset'}
+
+
+def test_city_time(client):
+    body = client.get('/api/worldclock/Madrid').get_json()
+    assert body['timezone'] == 'Europe/Madrid' and body['success'] is True
+    assert client.get('/api/worldclock/Europe/Berlin').get_json()['timezone'] == 'Europe/Berlin'
+    assert client.get('/api/worldclock/Atlántida').status_code == 404
+
+
+def test_search_reports_current_offsets(client, monkeypatch):
+    from app import timezones
+    monkeypatch.setattr(timezones, '_tables', {})
+    body = client.get('/api/worldclock/search?q=tokio&limit=3').get_json()
+    assert body['results'][0] == {
+        'city': 'Tokio', 'timezone': 'Asia/Tokyo', 'utc_offset': '+09:00', 'is_dst': False
+    }
+    # La búsqueda no construye tablas de transiciones
+    assert timezones._tables == {}
+
+
+def test_search_limit_is_clamped(client):
+    body = client.get('/api/worldclock/search?q=a&limit=500').get_json()
+    assert body['count'] == world_clock.SEARCH_LIMIT
+    assert client.get('/api/worldclock/search?q=').get_json()['count'] == 0
@@ -0,0 +1,67 @@
+"""Catálogo IANA con alias y búsqueda por prefijo"""
+
+from app.zone_catalog import ZoneCatalog, city_from_zone, get_catalog, normalize
+
+ZONES = {'Europe/Madrid', 'America/New_York', 'America/Bogota', 'America/Argentina/Buenos_Aires',
+         'Asia/Tokyo', 'UTC', 'US/Pacific'}
+ALIASES = {'Nueva York': 'America/New_York', 'Bogotá': 'America/Bogota', 'Tokio': 'Asia/Tokyo',
+           'Atlántida': 'Atlantis/Capital'}
+
+
+def test_normalize_and_city_from_zone():
+    assert normalize('  Bogotá_D.C. ') == 'bogota d.c.'
+    assert city_from_zone('America/Argentina/Buenos_Aires') == 'Buenos Aires'
+
+
+def test_entries_skip_aliases_of_missing_zones():
+    catalog = ZoneCatalog(ZONES, ALIASES)
+    names = [name for name, _ in catalog.entries]
+    assert 'Atlántida' not in names
+    # Zonas sin ciudad se listan con su identificador
+    assert 'UTC' in names and 'US/Pacific' in names
+    assert 'Buenos Aires' in names
+
+
+def test_resolve():
+    catalog = ZoneCatalog(ZONES, ALIASES)
+    assert catalog.resolve('nueva york') == 'America/New_York'
+    assert catalog.resolve('TOKIO') == 'Asia/Tokyo'
+    assert catalog.resolve('bogota') == 'America/Bogota'
+    assert catalog.resolve('europe/madrid') == 'Europe/Madrid'
+    assert catalog.resolve('Atlántida') is None
+    assert catalog.resolve('') is None
+
+
+def test_search_ranks_exact_then_prefix_then_word():
+    catalog = ZoneCatalog({'America/New_York', 'Europe/Newcastle', 'Asia/Tokyo'},
+                          {'New York': 'America/New_York', 'York': 'Europe/Newcastle'})
+    results = catalog.search('york')
+    assert results[0] == ('York', 'Europe/Newcastle')
+    assert ('New York', 'America/New_York') in results
+    # A igual relevancia gana el nombre más corto
+    assert catalog.search('new', 1) == [('New York', 'America/New_York')]
+
+
+def test_search_matches_later_words_and_zone_ids():
+    catalog = ZoneCatalog(ZONES, ALIASES)
+    assert ('Buenos Aires', 'America/Argentina/Buenos_Aires') in catalog.search('aires')
+    assert sorted(catalog.search('asia/')) == [('Tokio', 'Asia/Tokyo'), ('Tokyo', 'Asia/Tokyo')]
+
+
+def test_search_merges_accent_variants():
+    catalog = ZoneCatalog(ZONES, ALIASES)
+    results = catalog.search('bogo')
+    assert len(results) == 1 and results[0][1] == 'America/Bogota'
+
+
+def test_search_edge_cases():
+    catalog = ZoneCatalog(ZONES, ALIASES)
+    assert catalog.search('') == []
+    assert catalog.search('tok', 0) == []
+    assert catalog.search('zzz') == []
+
+
+def test_shared_catalog_is_built_once():
+    catalog = get_catalog()
+    assert get_catalog() is catalog
+    assert catalog.resolve('Madrid') == 'Europe/Madrid'
@@ -1,39 +1,35 @@
 // Lógica de UI para alarmas
 const api = '/api/alarms/';
 
-// Almacena las alarmas que ya han sonado
-const triggeredAlarms = new Set();
-
 // Variable para mantener la lista de alarmas actual
 let currentAlarms = [];
 
-// Función para verificar si una alarma debe sonar
-function checkAlarm(alarm) {
-  const now = new Date();
-  const [hours, minutes] = alarm.time.split(':');
-  const alarmTime = new Date();
-  alarmTime.setHours(parseInt(hours), parseInt(minutes), 0, 0);
-  
-  // Si la alarma ya sonó hoy, no la volvemos a disparar
-  const alarmKey = `${alarm.id}-${now.toDateString()}`;
-  if (triggeredAlarms.has(alarmKey)) {
-    return;
-  }
-  
-  // Verificar si es hora de la alarma (con un margen de 1 segundo)
-  const nowWithoutMs = new Date(now);
-  nowWithoutMs.setMilliseconds(0);
-  
-  const timeDiff = Math.abs(nowWithoutMs - alarmTime);
-  if (timeDiff < 1000) {
-    showNotification('¡Alarma!', 
-      alarm.label ? 
-      `¡Es hora de ${alarm.label}!` : 
-      '¡Es hora de tu alarma!',
-      'warning'
-    );
-    triggeredAlarms.add(alarmKey);
-  }
+// Último evento de alarma disparada recibido del servidor (null = sin sincronizar)
+let lastFiredSeq = null;
+
+// Las alarmas se disparan en el servidor (rueda de tiempo); el cliente solo
+// consulta los eventos nuevos en lugar de revisar todas las alarmas.
+function pollFiredAlarms() {
+  const since = lastFiredSeq === null ? 0 : lastFiredSeq;
+  fetch(api + 'fired?since=' + since)
+    .then(r => r.json())
+    .then(data => {
+      // En la primera consulta solo sincronizamos el cursor
+      if (lastFiredSeq !== null) {
+        data.events.forEach(event => {
+          showNotification('¡Alarma!', 
+            event.label ? 
+            `¡Es hora de ${event.label}!` : 
+            '¡Es hora de tu alarma!',
+            'warning'
+          );
+        });
+      }
+      // Si la secuencia retrocede el servidor se reinició: todos sus eventos
+      // son nuevos, así que el cursor vuelve a 0 para recibirlos
+      lastFiredSeq = data.last_seq < since ? 0 : data.last_seq;
+    })
+    .catch(error => console.error('Error checking fired alarms:', error));
 }
 
 function renderAlarms() {
@@ -55,7 +51,15 @@ function renderAlarms() {
         del.textContent = 'Eliminar';
         del.className = 'component-button';
         del.onclick = () => {
-          fetch(api + alarm.id, {method: 'DELETE'}).then(renderAlarms);
+          // Quitar solo este elemento en lugar de volver a pedir toda la lista
+          fetch(api + alarm.id, {method: 'DELETE'}).then(response => {
+            if (response.ok) {
+              li.remove();
+              currentAlarms = currentAlarms.filter(a => a.id !== alarm.id);
+            } else {
+              renderAlarms();
+            }
+          });
         };
         li.appendChild(del);
         ul.appendChild(li);
@@ -65,17 +69,8 @@ function renderAlarms() {
 
 // Iniciar el verificador de alarmas solo una vez
 if (!window.alarmChecker) {
-  window.alarmChecker = setInterval(() => {
-    const now = new Date();
-    // Limpiar alarmas disparadas de días anteriores
-    for (const key of triggeredAlarms) {
-      if (!key.includes(now.toDateString())) {
-        triggeredAlarms.delete(key);
-      }
-    }
-    // Verificar alarmas usando la lista actual
-    currentAlarms.forEach(checkAlarm);
-  }, 1000);
+  pollFiredAlarms();
+  window.alarmChecker = setInterval(pollFiredAlarms, 1000);
 }
 
 function initAlarms() {
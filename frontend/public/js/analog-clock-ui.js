@@ -152,8 +152,10 @@ function toggleClockMode() {
  */
 async function loadAnalogClock() {
   try {
-    const response = await fetch('/components/analog-clock.html');
-    const html = await response.text();
+    // Sale del paquete de componentes ya descargado por main.js
+    const html = typeof loadComponent === 'function'
+      ? await loadComponent('analog-clock')
+      : await (await fetch('/components/analog-clock.html')).text();
     
     const clockContainer = document.getElementById('clock-center-container');
     if (!clockContainer) return;
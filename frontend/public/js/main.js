@@ -192,22 +192,47 @@ window.addEventListener('DOMContentLoaded', async () => {
   // Cargar fondo animado SVG
   const bgContainer = document.getElementById('animated-bg-container');
   if (bgContainer) {
-    const resp = await fetch('/components/animated-bg.html');
-    const html = await resp.text();
-    bgContainer.innerHTML = html;
+    bgContainer.innerHTML = await loadComponent('animated-bg');
   }
   const btn = document.getElementById('theme-toggle');
   if (btn) btn.addEventListener('click', toggleTheme);
   startClock();
 });
 
-const components = {
-  alarm: '/components/alarm.html',
-  stopwatch: '/components/stopwatch.html',
-  timer: '/components/timer.html',
-  worldclock: '/components/worldclock.html',
-  envclock: '/components/envclock.html'
-};
+// Todos los componentes HTML llegan en una sola petición (/api/components);
+// si el paquete no está disponible se pide cada fragmento por separado
+let componentBundle = null;
+
+function fetchComponentBundle() {
+  if (!componentBundle) {
+    componentBundle = fetch('/api/components')
+      .then(r => {
+        if (!r.ok) {
+          throw new Error(`HTTP ${r.status}: ${r.statusText}`);
+        }
+        return r.json();
+      })
+      .then(data => data.components)
+      .catch(err => {
+        console.warn('⚠️ Paquete de componentes no disponible:', err);
+        componentBundle = null;
+        return {};
+      });
+  }
+  return componentBundle;
+}
+
+async function loadComponent(name) {
+  const bundle = await fetchComponentBundle();
+  if (name in bundle) {
+    return bundle[name];
+  }
+  const r = await fetch(`/components/${name}.html`);
+  if (!r.ok) {
+    throw new Error(`HTTP ${r.status}: ${r.statusText}`);
+  }
+  return r.text();
+}
 
 // Función para cargar un script dinámicamente
 function loadScript(src) {
@@ -230,13 +255,7 @@ function showComponent(name) {
   const mainContent = document.getElementById('main-content');
   mainContent.innerHTML = '<div style="padding: 20px; text-align: center;">🔄 Cargando...</div>';
   
-  fetch(components[name])
-    .then(r => {
-      if (!r.ok) {
-        throw new Error(`HTTP ${r.status}: ${r.statusText}`);
-      }
-      return r.text();
-    })
+  loadComponent(name)
     .then(html => {
       mainContent.innerHTML = html;
       
@@ -348,3 +367,4 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // Hacer la función disponible globalmente para onclick
 window.showComponent = showComponent;
+window.loadComponent = loadComponent;
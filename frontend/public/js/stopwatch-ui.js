@@ -1,13 +1,44 @@
 // Lógica de UI para cronómetro
 const stopwatchApi = '/api/stopwatch/';
+const stopwatchEventsApi = '/api/events/?topics=stopwatch';
 let interval = null;
+let stopwatchEvents = null;
+
+// Último estado recibido del servidor; el display se interpola localmente
+let stopwatchState = {running: false, elapsed: 0, receivedAt: 0};
+
+function renderStopwatch() {
+  const display = document.getElementById('stopwatch-display');
+  if (!display) return;
+  let elapsed = stopwatchState.elapsed;
+  if (stopwatchState.running) {
+    elapsed += (performance.now() - stopwatchState.receivedAt) / 1000;
+  }
+  display.textContent = formatTimeHHMMSSMS(elapsed);
+}
+
+function applyStopwatchState(data) {
+  stopwatchState = {running: data.running, elapsed: data.elapsed, receivedAt: performance.now()};
+  if (data.running && !interval) {
+    interval = setInterval(renderStopwatch, 100);
+  } else if (!data.running && interval) {
+    clearInterval(interval);
+    interval = null;
+  }
+  renderStopwatch();
+}
 
 function updateDisplay() {
   fetch(stopwatchApi)
     .then(r => r.json())
-    .then(data => {
-      document.getElementById('stopwatch-display').textContent = formatTimeHHMMSSMS(data.elapsed);
-    });
+    .then(applyStopwatchState);
+}
+
+// Recibir cambios de estado por SSE en lugar de hacer polling
+function subscribeStopwatch() {
+  if (!window.EventSource || stopwatchEvents) return;
+  stopwatchEvents = new EventSource(stopwatchEventsApi);
+  stopwatchEvents.addEventListener('stopwatch', e => applyStopwatchState(JSON.parse(e.data)));
 }
 
 function initStopwatch() {
@@ -18,40 +49,28 @@ function initStopwatch() {
   if (startBtn && stopBtn && resetBtn) {
     startBtn.onclick = () => {
       fetch(stopwatchApi + 'start', {method: 'POST'})
-        .then(response => {
-          if (response.ok && !interval) {
-            interval = setInterval(updateDisplay, 100);
-          }
-        })
+        .then(response => response.ok && response.json())
+        .then(data => data && applyStopwatchState(data))
         .catch(error => console.error('Error starting stopwatch:', error));
     };
 
     stopBtn.onclick = () => {
       fetch(stopwatchApi + 'stop', {method: 'POST'})
-        .then(response => {
-          if (response.ok) {
-            clearInterval(interval);
-            interval = null;
-            updateDisplay();
-          }
-        })
+        .then(response => response.ok && response.json())
+        .then(data => data && applyStopwatchState(data))
         .catch(error => console.error('Error stopping stopwatch:', error));
     };
 
     resetBtn.onclick = () => {
       fetch(stopwatchApi + 'reset', {method: 'POST'})
-        .then(response => {
-          if (response.ok) {
-            clearInterval(interval);
-            interval = null;
-            updateDisplay();
-          }
-        })
+        .then(response => response.ok && response.json())
+        .then(data => data && applyStopwatchState(data))
         .catch(error => console.error('Error resetting stopwatch:', error));
     };
 
-    // Inicializar display
+    // Inicializar display y suscribirse a los cambios
     updateDisplay();
+    subscribeStopwatch();
   }
 }
 
@@ -2,6 +2,7 @@
 const worldclockApi = '/api/worldclock/';
 let selectedCities = ['Madrid', 'New York', 'Tokyo']; // Ciudades por defecto
 let allCities = [];
+let worldclockEvents = null;
 
 function loadAvailableCities() {
   console.log('🌍 Cargando ciudades disponibles...');
@@ -66,6 +67,7 @@ function renderSelectedCities() {
         console.log(`✅ Datos para ${city}:`, data);
         const cityDiv = document.createElement('div');
         cityDiv.className = 'city-clock';
+        cityDiv.dataset.city = city;
         cityDiv.innerHTML = `
           <div class="city-info">
             <h4>${data.city}</h4>
@@ -119,6 +121,23 @@ function renderAllCities() {
     .catch(err => console.error('Error loading all cities:', err));
 }
 
+// Actualiza las horas mostradas con un evento SSE (todas las ciudades a la vez)
+function applyWorldClockTimes(times) {
+  document.querySelectorAll('#worldclock-list .city-clock').forEach(cityDiv => {
+    const data = times[cityDiv.dataset.city];
+    if (!data) return;
+    cityDiv.querySelector('.time-display').textContent = data.time;
+    cityDiv.querySelector('.date-display').textContent = data.date;
+  });
+}
+
+function subscribeWorldClock() {
+  if (!window.EventSource || worldclockEvents) return false;
+  worldclockEvents = new EventSource('/api/events/?topics=worldclock');
+  worldclockEvents.addEventListener('worldclock', e => applyWorldClockTimes(JSON.parse(e.data)));
+  return true;
+}
+
 function addCity() {
   const select = document.getElementById('city-select');
   const city = select.value;
@@ -175,10 +194,12 @@ function initWorldClock() {
   renderSelectedCities();
   renderAllCities();
   
-  // Actualizar cada 10 segundos
-  setInterval(() => {
-    renderSelectedCities();
-  }, 10000);
+  // Recibir la hora por SSE; sin soporte, actualizar cada 10 segundos
+  if (!worldclockEvents && !subscribeWorldClock()) {
+    setInterval(() => {
+      renderSelectedCities();
+    }, 10000);
+  }
 }
 
 // Hacer la función disponible globalmente
@@ -16,23 +16,41 @@ if not backend_dir.exists():
     print(f"❌ Error: No se encuentra el directorio backend en {backend_dir}")
     sys.exit(1)
 
+def parse_args():
+    import argparse
+    parser = argparse.ArgumentParser(description='Servidor unificado del reloj web')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '5000')))
+    parser.add_argument(
+        '--workers', type=int, default=int(os.environ.get('SERVER_WORKERS', '1')),
+        help='Procesos worker (pre-fork, estado compartido en SQLite). 1 = un solo proceso'
+    )
+    return parser.parse_args()
+
 # Importar y ejecutar la aplicación Flask
 if __name__ == '__main__':
+    args = parse_args()
     try:
-        from app.main import app
-
         print("=" * 50)
         print("🚀 Servidor Unificado - Reloj Web")
         print("=" * 50)
-        print(f"📱 Frontend + Backend: http://localhost:5000/")
-        print(f"🔧 API endpoints: http://localhost:5000/api/")
+        print(f"📱 Frontend + Backend: http://localhost:{args.port}/")
+        print(f"🔧 API endpoints: http://localhost:{args.port}/api/")
         print("=" * 50)
         print("Presiona Ctrl+C para detener")
         print()
-        
+
+        if args.workers > 1 and hasattr(os, 'fork'):
+            # Modo producción: varios procesos con estado compartido
+            from app.prefork import serve
+            sys.exit(serve(host='0.0.0.0', port=args.port, workers=args.workers))
+        if args.workers > 1:
+            print("⚠️ os.fork no disponible en este sistema: se usa un solo proceso")
+
+        from app.main import app
+
         # Desactivar debug para evitar reinicios automáticos
         # Cambiar a debug=True si necesitas debugging
-        app.run(host='0.0.0.0', port=5000, debug=False)
+        app.run(host='0.0.0.0', port=args.port, debug=False, threaded=True)
     except ImportError as e:
         print(f"❌ Error al importar la aplicación: {e}")
         print(f"📂 Directorio actual: {current_dir}")